@@ -1,5 +1,6 @@
 import sqlite3
 from datetime import datetime, timedelta
+from database_manager import create_engine, add_flight_time_columns
 
 def analyze_database(db_path):
     conn = sqlite3.connect(db_path)
@@ -16,10 +17,12 @@ def analyze_database(db_path):
     print(f"Date range of flights: from {min_date} to {max_date}")
 
     # Count flights per day
+    # Grouping on the indexed epoch-minute column avoids evaluating DATE() on every row
     cursor.execute("""
-        SELECT DATE(scheduled_departure) as date, COUNT(*) as flight_count
+        SELECT DATE((scheduled_departure_minute / 1440) * 86400, 'unixepoch') as date, COUNT(*) as flight_count
         FROM flights
-        GROUP BY DATE(scheduled_departure)
+        WHERE scheduled_departure_minute IS NOT NULL
+        GROUP BY scheduled_departure_minute / 1440
         ORDER BY date
     """)
     daily_counts = cursor.fetchall()
@@ -42,9 +45,9 @@ def analyze_database(db_path):
     # Check for null values in important columns
     columns_to_check = ['id', 'airline', 'aircraft_registration', 'origin', 'destination', 
                         'scheduled_departure', 'scheduled_arrival', 'passenger_count']
-    for column in columns_to_check:
-        cursor.execute(f"SELECT COUNT(*) FROM flights WHERE {column} IS NULL")
-        null_count = cursor.fetchone()[0]
+    # One pass over the table for all columns
+    cursor.execute(f"SELECT {', '.join(f'COUNT(*) - COUNT({column})' for column in columns_to_check)} FROM flights")
+    for column, null_count in zip(columns_to_check, cursor.fetchone()):
         print(f"\nNull values in {column}: {null_count}")
 
     # Check for flights with invalid times (arrival before departure)
@@ -65,4 +68,5 @@ def analyze_database(db_path):
 
 if __name__ == "__main__":
     db_path = 'igi_airport.db'  # Update this path if necessary
+    add_flight_time_columns(create_engine(f'sqlite:///{db_path}'))
     analyze_database(db_path)
\ No newline at end of file
@@ -0,0 +1,84 @@
+import random
+import sqlite3
+import sys
+import time
+from datetime import datetime, timedelta
+
+from ortools.sat.python import cp_model
+from database_manager import create_engine, add_flight_time_columns
+from model import FORMULATIONS, TRANSIT_FORMULATIONS, load_gate_data, build_gate_assignment_model
+
+
+def model_size(model):
+    proto = model.Proto()
+    return len(proto.variables), len(proto.constraints)
+
+
+def day_window(db_path):
+    conn = sqlite3.connect(db_path)
+    earliest = conn.execute("SELECT MIN(scheduled_departure) FROM flights").fetchone()[0]
+    conn.close()
+    start_time = datetime.fromisoformat(earliest)
+    return start_time.isoformat(sep=' '), (start_time + timedelta(hours=24)).isoformat(sep=' ')
+
+
+def benchmark_formulations(db_path, solve_seconds=0):
+    start_time, end_time = day_window(db_path)
+    data = load_gate_data(db_path, start_time, end_time)
+
+    print(f"{'formulation':<12} {'layout':<8} {'build (s)':>10} {'variables':>10} {'constraints':>12} {'status':>10} {'objective':>14}")
+    for formulation in FORMULATIONS:
+        for sparse in (False, True):
+            build_start = time.perf_counter()
+            model, _ = build_gate_assignment_model(*data, formulation=formulation, sparse=sparse)
+            build_seconds = time.perf_counter() - build_start
+            num_variables, num_constraints = model_size(model)
+
+            status, objective = '-', '-'
+            if solve_seconds:
+                solver = cp_model.CpSolver()
+                solver.parameters.max_time_in_seconds = solve_seconds
+                result = solver.Solve(model)
+                status = solver.StatusName(result)
+                if result in (cp_model.OPTIMAL, cp_model.FEASIBLE):
+                    objective = f"{solver.ObjectiveValue():.0f}"
+
+            layout = 'sparse' if sparse else 'dense'
+            print(f"{formulation:<12} {layout:<8} {build_seconds:>10.2f} {num_variables:>10} {num_constraints:>12} "
+                  f"{status:>10} {objective:>14}")
+
+
+def with_connections(flights, num_connections, seed=0):
+    """Copy of `flights` where `num_connections` random flights connect onward to a later departure."""
+    rng = random.Random(seed)
+    flights = [list(flight) for flight in flights]
+    order = sorted(range(len(flights)), key=lambda i: flights[i][6])
+    for i in rng.sample(order[:-1], k=min(num_connections, len(order) - 1)):
+        later = order[order.index(i) + 1:]
+        flights[i][9] = flights[rng.choice(later)][0]
+    return [tuple(flight) for flight in flights]
+
+
+def benchmark_transit(db_path, connection_counts=(0, 25, 50, 100, 200), formulation='interval', sparse=True):
+    start_time, end_time = day_window(db_path)
+    flights, gates, gate_aircraft_compatibility, transit_times = load_gate_data(db_path, start_time, end_time)
+
+    print(f"{'connections':>11} {'transit':<11} {'build (s)':>10} {'variables':>10} {'constraints':>12}")
+    for num_connections in connection_counts:
+        connected_flights = with_connections(flights, num_connections)
+        for transit in TRANSIT_FORMULATIONS:
+            build_start = time.perf_counter()
+            model, _ = build_gate_assignment_model(connected_flights, gates, gate_aircraft_compatibility,
+                                                   transit_times, formulation=formulation, sparse=sparse,
+                                                   transit=transit)
+            build_seconds = time.perf_counter() - build_start
+            num_variables, num_constraints = model_size(model)
+            print(f"{num_connections:>11} {transit:<11} {build_seconds:>10.2f} {num_variables:>10} {num_constraints:>12}")
+
+
+if __name__ == "__main__":
+    db_path = sys.argv[1] if len(sys.argv) > 1 else 'igi_airport.db'
+    solve_seconds = float(sys.argv[2]) if len(sys.argv) > 2 else 0
+    add_flight_time_columns(create_engine(f'sqlite:///{db_path}'))
+    benchmark_formulations(db_path, solve_seconds)
+    benchmark_transit(db_path)
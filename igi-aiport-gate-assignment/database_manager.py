@@ -1,6 +1,8 @@
 import json
 import random
+import time
 from datetime import datetime, timedelta
+import numpy as np
 from sqlalchemy import create_engine, Column, Integer, String, Float, DateTime, ForeignKey, Table, Boolean
 from sqlalchemy.orm import relationship, sessionmaker, declarative_base
 from sqlalchemy.exc import IntegrityError
@@ -8,6 +10,25 @@ from sqlalchemy.orm.exc import NoResultFound
 
 Base = declarative_base()
 
+EPOCH = datetime(1970, 1, 1)
+MAX_STAND_MINUTES = 24 * 60  # Longest scheduled span from a flight's arrival to its departure that queries look back for
+
+FLIGHT_NUMBERS = range(1000, 10000)  # Four-digit numbers after the airline code
+REGISTRATION_LETTERS = 'ABCDEFGHIJKLMNOPQRSTUVWXYZ'  # Registrations are VT- and three letters
+
+# Actual distances and speeds (in km and km/h)
+TRANSIT_DISTANCES = {
+    ('T1', 'T2'): 1.5, ('T1', 'T3'): 2.0, ('T2', 'T3'): 1.8,
+    ('T1', 'RW10-28'): 2.0, ('T2', 'RW10-28'): 2.5, ('T3', 'RW10-28'): 2.2,
+    ('T1', 'RW11-29'): 2.2, ('T2', 'RW11-29'): 2.3, ('T3', 'RW11-29'): 2.0,
+    ('T1', 'RW09-27'): 1.8, ('T2', 'RW09-27'): 2.1, ('T3', 'RW09-27'): 1.9
+}
+TRANSIT_SPEEDS = {
+    'PASSENGER': 5,  # 5 km/h walking speed
+    'SHUTTLE': 20,   # 20 km/h shuttle speed
+    'AIRCRAFT': 25   # 25 km/h aircraft taxiing speed
+}
+
 
 # Association table for many-to-many relationship between gates and aircraft types
 gate_aircraft_compatibility = Table('gate_aircraft_compatibility', Base.metadata,
@@ -70,12 +91,15 @@ class Flight(Base):
     aircraft_registration = Column(String, ForeignKey('aircraft.registration'))
     origin = Column(String, ForeignKey('airports.id'))
     destination = Column(String, ForeignKey('airports.id'))
-    scheduled_departure = Column(DateTime)
-    scheduled_arrival = Column(DateTime)
+    scheduled_departure = Column(DateTime, index=True)
+    scheduled_arrival = Column(DateTime, index=True)
     actual_departure = Column(DateTime)
     actual_arrival = Column(DateTime)
     passenger_count = Column(Integer)
     connecting_flight_id = Column(String, ForeignKey('flights.id'))
+    # Integer minutes since the Unix epoch, kept alongside the timestamps for indexed window queries
+    scheduled_departure_minute = Column(Integer, index=True)
+    scheduled_arrival_minute = Column(Integer, index=True)
 
 class GroundService(Base):
     __tablename__ = 'ground_services'
@@ -110,8 +134,33 @@ class TransitTime(Base):
     transport_type = Column(String)  # 'PASSENGER', 'SHUTTLE', 'AIRCRAFT'
     time_minutes = Column(Float)
 
+def epoch_minutes(timestamp):
+    """Whole minutes since 1970-01-01 for a naive datetime or an ISO 'YYYY-MM-DD HH:MM[:SS]' string."""
+    if isinstance(timestamp, str):
+        timestamp = datetime.fromisoformat(timestamp)
+    return (timestamp - EPOCH) // timedelta(minutes=1)
+
+def add_flight_time_columns(engine):
+    """
+    Bring a flights table created before the epoch-minute columns up to date: add the
+    columns, backfill them from the timestamps and create the time-window indexes.
+    Safe to run repeatedly.
+    """
+    with engine.begin() as conn:
+        existing = {row[1] for row in conn.exec_driver_sql("PRAGMA table_info(flights)")}
+        for column in ('scheduled_departure', 'scheduled_arrival'):
+            minute_column = f'{column}_minute'
+            if minute_column not in existing:
+                conn.exec_driver_sql(f"ALTER TABLE flights ADD COLUMN {minute_column} INTEGER")
+            conn.exec_driver_sql(f"""
+                UPDATE flights SET {minute_column} = CAST(strftime('%s', {column}) AS INTEGER) / 60
+                WHERE {minute_column} IS NULL AND {column} IS NOT NULL
+            """)
+            for indexed in (column, minute_column):
+                conn.exec_driver_sql(f"CREATE INDEX IF NOT EXISTS ix_flights_{indexed} ON flights ({indexed})")
+
 def create_database():
-    engine = create_engine('sqlite:///igi_airport.db', echo=True)
+    engine = create_engine('sqlite:///igi_airport.db')
     Base.metadata.create_all(engine)
     return engine
 
@@ -200,6 +249,7 @@ def generate_sample_data(session, params):
 
     # Flights for a single day
     existing_flights = set(flight.id for flight in session.query(Flight).all())
+    free_numbers = {}
     new_flights = []
     start_date = datetime.now().replace(hour=0, minute=0, second=0, microsecond=0)
     for _ in range(params['number_of_flights']):
@@ -227,11 +277,14 @@ def generate_sample_data(session, params):
         actual_departure = scheduled_departure + delay
         actual_arrival = scheduled_arrival + delay
 
-        while True:
-            flight_id = f"{airline.iata_code}{random.randint(1000, 9999)}"
-            if flight_id not in existing_flights:
-                existing_flights.add(flight_id)
-                break
+        # Draw from the numbers the airline has not used yet
+        if airline.iata_code not in free_numbers:
+            free_numbers[airline.iata_code] = [number for number in FLIGHT_NUMBERS
+                                               if f"{airline.iata_code}{number}" not in existing_flights]
+        numbers = free_numbers[airline.iata_code]
+        if not numbers:
+            raise ValueError(f"Airline {airline.iata_code} has used all {len(FLIGHT_NUMBERS)} flight numbers")
+        flight_id = f"{airline.iata_code}{numbers.pop(random.randrange(len(numbers)))}"
 
         new_flights.append(Flight(
             id=flight_id,
@@ -243,7 +296,9 @@ def generate_sample_data(session, params):
             scheduled_arrival=scheduled_arrival,
             actual_departure=actual_departure,
             actual_arrival=actual_arrival,
-            passenger_count=random.randint(50, max_passengers)
+            passenger_count=random.randint(50, max_passengers),
+            scheduled_departure_minute=epoch_minutes(scheduled_departure),
+            scheduled_arrival_minute=epoch_minutes(scheduled_arrival)
         ))
     session.add_all(new_flights)
 
@@ -277,18 +332,8 @@ def generate_sample_data(session, params):
 def generate_transit_times(session):
     locations = session.query(AirportLocation).all()
     
-    # Actual distances and speeds (in km and km/h)
-    distances = {
-        ('T1', 'T2'): 1.5, ('T1', 'T3'): 2.0, ('T2', 'T3'): 1.8,
-        ('T1', 'RW10-28'): 2.0, ('T2', 'RW10-28'): 2.5, ('T3', 'RW10-28'): 2.2,
-        ('T1', 'RW11-29'): 2.2, ('T2', 'RW11-29'): 2.3, ('T3', 'RW11-29'): 2.0,
-        ('T1', 'RW09-27'): 1.8, ('T2', 'RW09-27'): 2.1, ('T3', 'RW09-27'): 1.9
-    }
-    speeds = {
-        'PASSENGER': 5,  # 5 km/h walking speed
-        'SHUTTLE': 20,   # 20 km/h shuttle speed
-        'AIRCRAFT': 25   # 25 km/h aircraft taxiing speed
-    }
+    distances = TRANSIT_DISTANCES
+    speeds = TRANSIT_SPEEDS
 
     for from_loc in locations:
         for to_loc in locations:
@@ -317,6 +362,190 @@ def generate_transit_times(session):
                     if created:
                         print(f"Created transit time: {from_loc.id} to {to_loc.id} via {transport_type}: {time_minutes:.2f} minutes")
                         
+def transit_time_rows(location_ids, location_x, location_y):
+    """Transit-time rows for every ordered pair of distinct locations, computed as one distance matrix."""
+    location_ids = np.asarray(location_ids)
+    xy = np.column_stack([location_x, location_y])
+
+    # Assume 100 units = 1 km, then overlay the predefined distances
+    distance = np.sqrt(((xy[:, None, :] - xy[None, :, :]) ** 2).sum(axis=-1)) / 100
+    positions = {location_id: n for n, location_id in enumerate(location_ids)}
+    for (a, b), km in TRANSIT_DISTANCES.items():
+        if a in positions and b in positions:
+            distance[positions[a], positions[b]] = distance[positions[b], positions[a]] = km
+
+    from_idx, to_idx = np.nonzero(~np.eye(len(location_ids), dtype=bool))
+    from_ids = location_ids[from_idx].tolist()
+    to_ids = location_ids[to_idx].tolist()
+    pair_distance = distance[from_idx, to_idx]
+
+    rows = []
+    for transport_type, speed in TRANSIT_SPEEDS.items():
+        minutes = (pair_distance / speed * 60).tolist()
+        rows.extend({'from_location': f, 'to_location': t, 'transport_type': transport_type, 'time_minutes': m}
+                    for f, t, m in zip(from_ids, to_ids, minutes))
+    return rows
+
+
+def generate_sample_data_bulk(session, params, seed=None):
+    """
+    Fast path of `generate_sample_data` for large airports.
+
+    All rows are built in memory (random draws and the transit-time distance matrix
+    vectorised with NumPy) and written with bulk inserts in a single transaction, so it
+    expects freshly created tables. Returns the number of rows written per table.
+    """
+    rng = np.random.default_rng(seed)
+    started = time.perf_counter()
+    start_date = datetime.now().replace(hour=0, minute=0, second=0, microsecond=0)
+    rows = {}
+
+    airport = params['airport_details']
+    rows[Airport] = [airport]
+    rows[Terminal] = [dict(airport_id=airport['id'], **terminal_data) for terminal_data in params['terminal_details']]
+
+    # Gates and Airport Locations
+    gate_ids = [f"{terminal_data['id']}-{i}" for terminal_data in params['terminal_details']
+                for i in range(1, params['gates_per_terminal'] + 1)]
+    gate_terminals = [terminal_data['id'] for terminal_data in params['terminal_details']
+                      for _ in range(params['gates_per_terminal'])]
+    boarding_bridge = rng.choice(params['gate_types']['boarding_bridge'], size=len(gate_ids)).tolist()
+    max_passengers = rng.choice(params['gate_types']['max_passengers'], size=len(gate_ids)).tolist()
+    rows[Gate] = [dict(id=gate_id, terminal_id=terminal_id, number=gate_id.split('-')[-1],
+                       is_boarding_bridge=bool(bridge), max_passengers=int(capacity))
+                  for gate_id, terminal_id, bridge, capacity in zip(gate_ids, gate_terminals, boarding_bridge,
+                                                                    max_passengers)]
+
+    # Hangars and Remote Stands
+    location_ids = list(gate_ids)
+    location_types = ['GATE'] * len(gate_ids)
+    for i in range(params.get('number_of_hangars', 5)):
+        location_ids.append(f"HANGAR-{i+1}")
+        location_types.append('HANGAR')
+    for i in range(params.get('number_of_remote_stands', 10)):
+        location_ids.append(f"REMOTE-{i+1}")
+        location_types.append('REMOTE_STAND')
+    location_x = rng.uniform(0, 1000, size=len(location_ids))
+    location_y = rng.uniform(0, 1000, size=len(location_ids))
+    rows[AirportLocation] = [dict(id=location_id, type=location_type, location_x=x, location_y=y)
+                             for location_id, location_type, x, y in zip(location_ids, location_types,
+                                                                         location_x.tolist(), location_y.tolist())]
+
+    # Aircraft Types, and the compatible aircraft types of each gate
+    aircraft_types = [aircraft_type_data['type'] for aircraft_type_data in params['aircraft_types']]
+    type_capacity = {data['type']: data['max_passengers'] for data in params['aircraft_types']}
+    rows[AircraftType] = params['aircraft_types']
+    compatibility_rows = []
+    for gate_id in gate_ids:
+        k = int(rng.integers(2, min(4, len(aircraft_types)) + 1))
+        compatibility_rows.extend({'gate_id': gate_id, 'aircraft_type': aircraft_type}
+                                  for aircraft_type in rng.choice(aircraft_types, size=k, replace=False).tolist())
+
+    # Airlines
+    airlines = params['airlines']
+    rows[Airline] = airlines
+
+    # Aircraft, with unique registrations
+    number_of_registrations = len(REGISTRATION_LETTERS) ** 3
+    if params['number_of_aircraft'] > number_of_registrations:
+        raise ValueError(f"{params['number_of_aircraft']} aircraft need more than the "
+                         f"{number_of_registrations} VT- registrations")
+    codes = rng.choice(number_of_registrations, size=params['number_of_aircraft'], replace=False).tolist()
+    registrations = sorted("VT-" + "".join(REGISTRATION_LETTERS[code // len(REGISTRATION_LETTERS) ** k %
+                                                                len(REGISTRATION_LETTERS)] for k in (2, 1, 0))
+                           for code in codes)
+    aircraft_type_of = rng.choice(aircraft_types, size=len(registrations)).tolist()
+    aircraft_airline = rng.choice([airline['iata_code'] for airline in airlines], size=len(registrations)).tolist()
+    maintenance_days = rng.integers(1, 366, size=len(registrations)).tolist()
+    now = datetime.now()
+    rows[Aircraft] = [dict(registration=registration, type=aircraft_type, airline=airline_code,
+                           next_maintenance_due=now + timedelta(days=days))
+                      for registration, aircraft_type, airline_code, days in zip(registrations, aircraft_type_of,
+                                                                                aircraft_airline, maintenance_days)]
+
+    # Flights for a single day
+    number_of_flights = params['number_of_flights']
+    flight_airline = rng.integers(0, len(airlines), size=number_of_flights)
+    flight_aircraft = rng.integers(0, len(registrations), size=number_of_flights)
+    departure_minutes = rng.integers(0, 24 * 60, size=number_of_flights).tolist()
+    duration_minutes = rng.integers(60, 601, size=number_of_flights).tolist()
+    delay_minutes = rng.integers(-30, 121, size=number_of_flights).tolist()
+    from_del = (rng.random(size=number_of_flights) < 0.5).tolist()
+    route_pick = rng.integers(0, 2**31, size=number_of_flights).tolist()
+    passenger_share = rng.random(size=number_of_flights).tolist()
+
+    flight_numbers = np.empty(number_of_flights, dtype=int)
+    for a in range(len(airlines)):
+        members = np.flatnonzero(flight_airline == a)
+        if len(members) > len(FLIGHT_NUMBERS):
+            raise ValueError(f"Airline {airlines[a]['iata_code']} has {len(members)} flights but only "
+                             f"{len(FLIGHT_NUMBERS)} flight numbers")
+        flight_numbers[members] = rng.choice(np.array(FLIGHT_NUMBERS), size=len(members), replace=False)
+
+    flight_rows = []
+    for n in range(number_of_flights):
+        airline = airlines[flight_airline[n]]
+        registration = registrations[flight_aircraft[n]]
+        max_passengers = type_capacity.get(aircraft_type_of[flight_aircraft[n]], 200)
+        destinations = params['domestic_airports'] if airline['is_domestic'] else params['international_airports']
+        other_end = destinations[route_pick[n] % len(destinations)]
+        scheduled_departure = start_date + timedelta(minutes=departure_minutes[n])
+        scheduled_arrival = scheduled_departure + timedelta(minutes=duration_minutes[n])
+        delay = timedelta(minutes=delay_minutes[n])
+        flight_rows.append(dict(
+            id=f"{airline['iata_code']}{flight_numbers[n]}",
+            airline=airline['iata_code'],
+            aircraft_registration=registration,
+            origin='DEL' if from_del[n] else other_end,
+            destination=other_end if from_del[n] else 'DEL',
+            scheduled_departure=scheduled_departure,
+            scheduled_arrival=scheduled_arrival,
+            actual_departure=scheduled_departure + delay,
+            actual_arrival=scheduled_arrival + delay,
+            passenger_count=50 + int(passenger_share[n] * (max_passengers - 50 + 1)),
+            scheduled_departure_minute=epoch_minutes(scheduled_departure),
+            scheduled_arrival_minute=epoch_minutes(scheduled_arrival)
+        ))
+    rows[Flight] = flight_rows
+
+    # Ground Services
+    rows[GroundService] = params['ground_services']
+
+    # Weather Conditions for a single day
+    rows[WeatherCondition] = [dict(
+        airport_id='DEL',
+        timestamp=start_date + timedelta(hours=hour),
+        temperature=float(rng.uniform(15, 40)),
+        wind_speed=float(rng.uniform(0, 30)),
+        visibility=float(rng.uniform(1, 10)),
+        condition=str(rng.choice(['Clear', 'Partly Cloudy', 'Cloudy', 'Rain', 'Fog']))
+    ) for hour in range(24)]
+
+    # Transit Times
+    rows[TransitTime] = transit_time_rows(location_ids, location_x, location_y)
+    built = time.perf_counter()
+
+    try:
+        for model, mappings in rows.items():
+            session.bulk_insert_mappings(model, mappings)
+        session.execute(gate_aircraft_compatibility.insert(), compatibility_rows)
+        session.commit()
+    except IntegrityError as e:
+        session.rollback()
+        print(f"Error generating sample data: {e}")
+        return None
+
+    elapsed = time.perf_counter() - started
+    counts = {model.__tablename__: len(mappings) for model, mappings in rows.items()}
+    counts[gate_aircraft_compatibility.name] = len(compatibility_rows)
+    total_rows = sum(counts.values())
+    print(f"Bulk-generated {total_rows} rows in {elapsed:.2f}s ({total_rows / elapsed:,.0f} rows/s; "
+          f"build {built - started:.2f}s, insert {elapsed - (built - started):.2f}s)")
+    for table, count in counts.items():
+        print(f"  {table}: {count}")
+
+    return counts
+
 def drop_all_tables(engine):
     Base.metadata.drop_all(engine)
     print("All tables dropped.")
@@ -327,7 +556,7 @@ def main():
         with open('igi-aiport-gate-assignment/igi-airport-params-json.json', 'r') as f:
             params = json.load(f)
 
-        engine = create_engine('sqlite:///igi_airport.db', echo=True)
+        engine = create_engine('sqlite:///igi_airport.db')
         
         # Drop all existing tables
         drop_all_tables(engine)
@@ -338,10 +567,9 @@ def main():
         Session = sessionmaker(bind=engine)
         session = Session()
 
-        generate_sample_data(session, params)
+        generate_sample_data_bulk(session, params)
 
         session.close()
-        print("Sample data generated successfully.")
     except Exception as e:
         print(f"An error occurred: {str(e)}")
         import traceback
@@ -0,0 +1,58 @@
+import sqlite3
+import numpy as np
+import pandas as pd
+from database_manager import MAX_STAND_MINUTES, epoch_minutes
+
+# Columns returned by read_flight_window, in order
+FLIGHT_WINDOW_COLUMNS = ('id', 'airline', 'aircraft_registration', 'origin', 'destination',
+                         'scheduled_arrival_minute', 'scheduled_departure_minute', 'passenger_count',
+                         'connecting_flight_id')
+
+WINDOW_QUERY = f"""
+    SELECT {', '.join(FLIGHT_WINDOW_COLUMNS)}
+    FROM flights
+    WHERE (scheduled_arrival_minute BETWEEN :start AND :end)
+       OR (scheduled_departure_minute BETWEEN :start AND :end)
+       OR (scheduled_arrival_minute BETWEEN :start - :max_stand AND :start AND scheduled_departure_minute >= :end)
+    ORDER BY scheduled_departure_minute
+"""
+
+
+def read_flight_window(db_path, start_time, end_time, as_frame=False):
+    """
+    Read every flight whose scheduled arrival or departure falls in [start_time, end_time],
+    or that is scheduled to span it, in one indexed query. Spans are looked for up to
+    MAX_STAND_MINUTES back, so every clause is a bounded index range.
+
+    Returns a DataFrame when `as_frame` is set, otherwise a dict of NumPy column arrays
+    (integer minutes since the epoch for the two time columns, and floats with NaN for
+    missing passenger counts) sorted by departure.
+    """
+    params = {'start': epoch_minutes(start_time), 'end': epoch_minutes(end_time), 'max_stand': MAX_STAND_MINUTES}
+    conn = sqlite3.connect(db_path)
+    try:
+        if as_frame:
+            return pd.read_sql_query(WINDOW_QUERY, conn, params=params)
+        rows = conn.execute(WINDOW_QUERY, params).fetchall()
+    finally:
+        conn.close()
+
+    columns = list(zip(*rows)) if rows else [()] * len(FLIGHT_WINDOW_COLUMNS)
+    flights = {name: np.array(values, dtype=object) for name, values in zip(FLIGHT_WINDOW_COLUMNS, columns)}
+    for name in ('scheduled_arrival_minute', 'scheduled_departure_minute'):
+        flights[name] = flights[name].astype(np.int64)
+    flights['passenger_count'] = flights['passenger_count'].astype(np.float64)
+    return flights
+
+
+def slice_flight_window(flights, start_time, end_time):
+    """
+    Cut a sub-window out of arrays already returned by read_flight_window, e.g. one day out
+    of a month-long history, without going back to the database.
+    """
+    start, end = epoch_minutes(start_time), epoch_minutes(end_time)
+    arrival = flights['scheduled_arrival_minute']
+    departure = flights['scheduled_departure_minute']
+    mask = (((arrival >= start) & (arrival <= end)) | ((departure >= start) & (departure <= end)) |
+            ((arrival >= start - MAX_STAND_MINUTES) & (arrival <= start) & (departure >= end)))
+    return {name: values[mask] for name, values in flights.items()}
@@ -1,33 +1,80 @@
 import csv
+import math
 import sqlite3
 from ortools.sat.python import cp_model
 from datetime import datetime, timedelta
 import logging
-from database_manager import create_engine, sessionmaker, Flight
+from database_manager import (create_engine, sessionmaker, Flight, MAX_STAND_MINUTES, epoch_minutes,
+                              add_flight_time_columns)
 
 logging.basicConfig(level=logging.DEBUG, format='%(asctime)s - %(levelname)s - %(message)s')
 
-
-def create_gate_assignment_model(db_path, start_time, end_time):
-    conn = sqlite3.connect(db_path)
-    cursor = conn.cursor()
-
-    # Fetch flights, gates, and compatibility data
-    cursor.execute("""
+# Gate conflict formulations that can be selected when building the model
+FORMULATIONS = ('pairwise', 'interval')
+
+# Connecting-passenger transit cost formulations
+TRANSIT_FORMULATIONS = ('gate_pairs', 'linear')
+
+AIRPORT_CODE = 'DEL'
+TURNAROUND_MINUTES = 45  # A departing aircraft boards at its gate before pushback, an arriving one deplanes after
+MAX_TIME_DEVIATION_MINUTES = 180  # Furthest an actual time is looked for from its scheduled time
+
+AIRLINE_PREFERENCES = {
+    'AI': 'T3',  # Air India prefers Terminal 3
+    '6E': 'T1',  # IndiGo prefers Terminal 1
+    'UK': 'T3',  # Vistara prefers Terminal 3
+    'SG': 'T1',  # SpiceJet prefers Terminal 1
+}
+
+
+def load_flights(cursor, start_time, end_time, use_actual_times=False):
+    """
+    Fetch the flights whose gate window touches [start_time, end_time]. Each row carries the
+    arrival and departure both as text (positions 5 and 6) and as epoch minutes (10 and 11).
+
+    With `use_actual_times` the actual times are used where recorded. Rows are still found
+    through the indexed scheduled minute columns, searched MAX_TIME_DEVIATION_MINUTES wider,
+    and only then filtered on their actual times. Flights spanning the window are looked
+    for up to MAX_STAND_MINUTES back, so that every clause is a bounded index range.
+    """
+    arrival, departure = 'f.scheduled_arrival', 'f.scheduled_departure'
+    arrival_minute, departure_minute = 'f.scheduled_arrival_minute', 'f.scheduled_departure_minute'
+    start_minute, end_minute = epoch_minutes(start_time), epoch_minutes(end_time)
+    margin = 0
+    actual_filter = ''
+    parameters = []
+    if use_actual_times:
+        # Operational re-solves follow the latest known times where they have been recorded
+        arrival = 'COALESCE(f.actual_arrival, f.scheduled_arrival)'
+        departure = 'COALESCE(f.actual_departure, f.scheduled_departure)'
+        arrival_minute = f"(CAST(strftime('%s', {arrival}) AS INTEGER) / 60)"
+        departure_minute = f"(CAST(strftime('%s', {departure}) AS INTEGER) / 60)"
+        margin = MAX_TIME_DEVIATION_MINUTES
+        actual_filter = f"""
+          AND (({arrival_minute} BETWEEN ? AND ?)
+               OR ({departure_minute} BETWEEN ? AND ?)
+               OR ({arrival_minute} <= ? AND {departure_minute} >= ?))"""
+        parameters = [start_minute, end_minute] * 3
+
+    cursor.execute(f"""
         SELECT f.id, f.airline, f.aircraft_registration, f.origin, f.destination,
-               strftime('%Y-%m-%d %H:%M:%S', f.scheduled_arrival) as scheduled_arrival, 
-               strftime('%Y-%m-%d %H:%M:%S', f.scheduled_departure) as scheduled_departure, 
-               f.passenger_count, a.type, f.connecting_flight_id
+               strftime('%Y-%m-%d %H:%M:%S', {arrival}) as scheduled_arrival,
+               strftime('%Y-%m-%d %H:%M:%S', {departure}) as scheduled_departure,
+               f.passenger_count, a.type, f.connecting_flight_id,
+               {arrival_minute} as arrival_minute, {departure_minute} as departure_minute
         FROM flights f
         JOIN aircraft a ON f.aircraft_registration = a.registration
-        WHERE (f.scheduled_arrival BETWEEN ? AND ?)
-           OR (f.scheduled_departure BETWEEN ? AND ?)
-           OR (f.scheduled_arrival <= ? AND f.scheduled_departure >= ?)
-        ORDER BY f.scheduled_departure
-    """, (start_time, end_time, start_time, end_time, start_time, end_time))
-    
-    flights = cursor.fetchall()
+        WHERE ((f.scheduled_arrival_minute BETWEEN ? AND ?)
+               OR (f.scheduled_departure_minute BETWEEN ? AND ?)
+               OR (f.scheduled_arrival_minute BETWEEN ? AND ? AND f.scheduled_departure_minute >= ?)){actual_filter}
+        ORDER BY departure_minute
+    """, [start_minute - margin, end_minute + margin] * 2 +
+        [start_minute - margin - MAX_STAND_MINUTES, start_minute + margin, end_minute - margin] + parameters)
+
+    return cursor.fetchall()
 
+
+def load_airport_data(cursor):
     cursor.execute("SELECT id, terminal_id, max_passengers FROM gates")
     gates = cursor.fetchall()
 
@@ -38,49 +85,248 @@ def create_gate_assignment_model(db_path, start_time, end_time):
     cursor.execute("SELECT from_location, to_location, transport_type, time_minutes FROM transit_times")
     transit_times = {(row[0], row[1], row[2]): row[3] for row in cursor.fetchall()}
 
+    return gates, gate_aircraft_compatibility, transit_times
+
+
+def load_gate_data(db_path, start_time, end_time):
+    conn = sqlite3.connect(db_path)
+    cursor = conn.cursor()
+
+    # Fetch flights, gates, and compatibility data
+    flights = load_flights(cursor, start_time, end_time)
+    gates, gate_aircraft_compatibility, transit_times = load_airport_data(cursor)
+
+    conn.close()
+
     logging.info(f"Fetched {len(flights)} flights and {len(gates)} gates.")
 
-    # Create compatibility dictionary
-    compatible_gates = {flight[8]: set() for flight in flights}
+    return flights, gates, gate_aircraft_compatibility, transit_times
+
+
+def find_conflict_clusters(windows):
+    """
+    Sweep-line pass over (start, end) occupancy windows given in integer minutes.
+
+    Returns groups of indices whose windows chain together through overlaps. A flight
+    that ends up alone in its group can never share a gate with another flight, so it
+    needs no conflict constraint at all. Windows that merely touch do not overlap; a
+    window that does not end after it starts raises ValueError.
+    """
+    for i, (start, end) in enumerate(windows):
+        if end <= start:
+            raise ValueError(f"Occupancy window {i} ends at {end}, not after its start {start}")
+    order = sorted(range(len(windows)), key=lambda i: windows[i][0])
+
+    clusters = []
+    current = []
+    current_end = None
+    for i in order:
+        start, end = windows[i]
+        if current and start < current_end:
+            current.append(i)
+            current_end = max(current_end, end)
+        else:
+            if len(current) > 1:
+                clusters.append(current)
+            current = [i]
+            current_end = end
+    if len(current) > 1:
+        clusters.append(current)
+
+    return clusters
+
+
+def index_compatible_gates(gates, gate_aircraft_compatibility):
+    """Map each aircraft type to the positions in `gates` of the gates that can serve it."""
+    gate_positions = {gate[0]: j for j, gate in enumerate(gates)}
+    type_gates = {}
     for gate_id, aircraft_type in gate_aircraft_compatibility:
-        if aircraft_type in compatible_gates:
-            compatible_gates[aircraft_type].add(gate_id)
+        if gate_id in gate_positions:
+            type_gates.setdefault(aircraft_type, []).append(gate_positions[gate_id])
+    for gate_list in type_gates.values():
+        gate_list.sort()
+    return type_gates
+
+
+def gate_window(flight):
+    """
+    The (start, end) epoch minutes during which a flight holds its gate at AIRPORT_CODE:
+    the turnaround before it departs from here, or after it arrives here.
+    """
+    if flight[3] == AIRPORT_CODE:
+        return flight[11] - TURNAROUND_MINUTES, flight[11]
+    if flight[4] == AIRPORT_CODE:
+        return flight[10], flight[10] + TURNAROUND_MINUTES
+    raise ValueError(f"Flight {flight[0]} ({flight[3]} -> {flight[4]}) does not use {AIRPORT_CODE}")
+
+
+def find_gate_overlaps(flights, assigned_gates):
+    """
+    Check an assignment, a map of flight positions to gate positions, for flights whose gate
+    windows overlap on the same gate. Returns (gate, flight, flight) position triples.
+    """
+    gate_windows = {}
+    for i, j in assigned_gates.items():
+        gate_windows.setdefault(j, []).append(gate_window(flights[i]) + (i,))
+
+    overlaps = []
+    for j, windows in gate_windows.items():
+        windows.sort()
+        latest_end, latest = None, None
+        for start, end, i in windows:
+            if latest is not None and start < latest_end:
+                overlaps.append((j, latest, i))
+            if latest is None or end > latest_end:
+                latest_end, latest = end, i
+    return overlaps
+
+
+def add_pairwise_conflicts(model, flights, gate_flights, gate_assignments):
+    windows = [gate_window(flight) for flight in flights]
+
+    # Each gate can be assigned to at most one flight at a time
+    for j, candidates in gate_flights.items():
+        for n, i1 in enumerate(candidates):
+            for i2 in candidates[n + 1:]:
+                (start1, end1), (start2, end2) = windows[i1], windows[i2]
+                if start1 < end2 and start2 < end1:  # Overlap check
+                    model.Add(gate_assignments[(i1, j)] + gate_assignments[(i2, j)] <= 1)
+
+
+def add_interval_conflicts(model, flights, flight_gates, gate_assignments):
+    windows = [gate_window(flight) for flight in flights]
+    clusters = find_conflict_clusters(windows)
+
+    logging.info(f"Sweep-line pass kept {sum(len(c) for c in clusters)} of {len(flights)} flights "
+                 f"in {len(clusters)} conflict clusters.")
+
+    gate_intervals = {}
+    for cluster in clusters:
+        for i in cluster:
+            start, end = windows[i]
+            for j in flight_gates[i]:
+                gate_intervals.setdefault(j, []).append(model.NewOptionalFixedSizeIntervalVar(
+                    start, end - start, gate_assignments[(i, j)], f'interval_f{i}_g{j}'))
+
+    # Each gate can be assigned to at most one flight at a time
+    for j, intervals in gate_intervals.items():
+        if len(intervals) > 1:
+            model.AddNoOverlap(intervals)
+
+
+def find_connections(flights):
+    """Return (flight, connecting flight) position pairs, resolved through an id -> position index."""
+    flight_positions = {flight[0]: i for i, flight in enumerate(flights)}
+    return [(i, flight_positions[flight[9]]) for i, flight in enumerate(flights)
+            if flight[9] and flight[9] in flight_positions]
+
+
+def gate_transit_minutes(transit_times, from_gate, to_gate):
+    # Get the transit time between gates, default to 30 minutes if not found
+    return math.ceil(transit_times.get((from_gate, to_gate, 'PASSENGER'), 30))
+
+
+def add_gate_pair_transit(model, connections, gates, flight_gates, gate_assignments, transit_times):
+    # One transit variable per gate pair of every connection
+    transit_times_list = []
+    for i, k in connections:
+        for j1 in flight_gates[i]:
+            for j2 in flight_gates[k]:
+                transit_time = model.NewIntVar(0, 1000, f'transit_time_{i}_{k}_{j1}_{j2}')
+                transit_times_list.append(transit_time)
+
+                time_between_gates = gate_transit_minutes(transit_times, gates[j1][0], gates[j2][0])
+
+                model.Add(transit_time >= time_between_gates).OnlyEnforceIf(
+                    [gate_assignments[(i, j1)], gate_assignments[(k, j2)]]
+                )
+                model.Add(transit_time == 0).OnlyEnforceIf(
+                    [gate_assignments[(i, j1)].Not(), gate_assignments[(k, j2)].Not()]
+                )
+    return transit_times_list
+
+
+def add_linear_transit(model, connections, gates, flight_gates, gate_assignments, transit_times):
+    """
+    One transit variable per connection, bounded below by one linear constraint per candidate
+    gate of the arriving flight:
+
+        transit >= sum_j2 time(j1, j2) * x[k, j2]    if x[i, j1]
+
+    Since the connecting flight sits at exactly one gate, the right-hand side is the walking
+    time from j1 to wherever it ends up, and minimising the objective makes the bound tight.
+    """
+    transit_times_list = []
+    for i, k in connections:
+        times = {(j1, j2): gate_transit_minutes(transit_times, gates[j1][0], gates[j2][0])
+                 for j1 in flight_gates[i] for j2 in flight_gates[k]}
+        transit_time = model.NewIntVar(0, max(times.values(), default=0), f'transit_time_{i}_{k}')
+        transit_times_list.append(transit_time)
+
+        for j1 in flight_gates[i]:
+            model.Add(transit_time >= sum(times[(j1, j2)] * gate_assignments[(k, j2)] for j2 in flight_gates[k])
+                      ).OnlyEnforceIf(gate_assignments[(i, j1)])
+    return transit_times_list
+
+
+def build_gate_assignment_model(flights, gates, gate_aircraft_compatibility, transit_times,
+                                formulation='pairwise', sparse=False, transit='gate_pairs'):
+    """
+    Build the CP-SAT gate assignment model.
+
+    With `sparse=True` a (flight, gate) variable is only created when the gate accepts the
+    flight's aircraft type, so the model grows with the number of feasible assignments
+    instead of flights x gates. Otherwise every pair gets a variable and the incompatible
+    ones are fixed to zero.
+
+    `transit` selects how connecting-passenger walking time is costed, see
+    `add_gate_pair_transit` and `add_linear_transit`.
+    """
+    if formulation not in FORMULATIONS:
+        raise ValueError(f"Unknown formulation '{formulation}', expected one of {FORMULATIONS}")
+    if transit not in TRANSIT_FORMULATIONS:
+        raise ValueError(f"Unknown transit formulation '{transit}', expected one of {TRANSIT_FORMULATIONS}")
+
+    type_gates = index_compatible_gates(gates, gate_aircraft_compatibility)
+    compatible_flight_gates = {i: type_gates.get(flight[8], []) for i, flight in enumerate(flights)}
+    all_gates = list(range(len(gates)))
 
     model = cp_model.CpModel()
 
     # Create variables
     gate_assignments = {}
-    for i, flight in enumerate(flights):
-        for j, gate in enumerate(gates):
+    flight_gates = compatible_flight_gates if sparse else {i: all_gates for i in range(len(flights))}
+    gate_flights = {j: [] for j in all_gates}
+    for i in range(len(flights)):
+        for j in flight_gates[i]:
             gate_assignments[(i, j)] = model.NewBoolVar(f'f{i}_g{j}')
+            gate_flights[j].append(i)
 
     # Constraints
-    # Each flight must be assigned to exactly one gate
+    # Each flight is assigned to at most one gate; the objective assigns as many as fit
     for i in range(len(flights)):
-        model.Add(sum(gate_assignments[(i, j)] for j in range(len(gates))) == 1)
+        model.Add(sum(gate_assignments[(i, j)] for j in flight_gates[i]) <= 1)
 
-    # Each gate can be assigned to at most one flight at a time
-    for j in range(len(gates)):
-        for i1 in range(len(flights)):
-            for i2 in range(i1 + 1, len(flights)):
-                flight1 = flights[i1]
-                flight2 = flights[i2]
-                if (flight1[5] < flight2[6] and flight2[5] < flight1[6]):  # Overlap check
-                    model.Add(gate_assignments[(i1, j)] + gate_assignments[(i2, j)] <= 1)
+    if formulation == 'interval':
+        add_interval_conflicts(model, flights, compatible_flight_gates, gate_assignments)
+    else:
+        add_pairwise_conflicts(model, flights, gate_flights, gate_assignments)
 
     # Compatibility constraints
-    for i, flight in enumerate(flights):
-        for j, gate in enumerate(gates):
-            if gate[0] not in compatible_gates.get(flight[8], set()):
-                model.Add(gate_assignments[(i, j)] == 0)
+    if not sparse:
+        for i in range(len(flights)):
+            compatible = set(compatible_flight_gates[i])
+            for j in all_gates:
+                if j not in compatible:
+                    model.Add(gate_assignments[(i, j)] == 0)
 
     # Terminal balancing
     terminal_usage = {}
     for terminal in set(gate[1] for gate in gates):
         terminal_usage[terminal] = model.NewIntVar(0, len(flights), f'usage_{terminal}')
         model.Add(terminal_usage[terminal] == sum(gate_assignments[(i, j)]
-                                                  for i in range(len(flights))
-                                                  for j, gate in enumerate(gates) if gate[1] == terminal))
+                                                  for j, gate in enumerate(gates) if gate[1] == terminal
+                                                  for i in gate_flights[j]))
 
     max_terminal_usage = model.NewIntVar(0, len(flights), 'max_terminal_usage')
     min_terminal_usage = model.NewIntVar(0, len(flights), 'min_terminal_usage')
@@ -91,9 +337,9 @@ def create_gate_assignment_model(db_path, start_time, end_time):
     model.Add(terminal_usage_difference == max_terminal_usage - min_terminal_usage)
 
     # Gate usage balancing
-    gate_usage = [model.NewIntVar(0, len(flights), f'gate_usage_{j}') for j in range(len(gates))]
-    for j in range(len(gates)):
-        model.Add(gate_usage[j] == sum(gate_assignments[(i, j)] for i in range(len(flights))))
+    gate_usage = [model.NewIntVar(0, len(flights), f'gate_usage_{j}') for j in all_gates]
+    for j in all_gates:
+        model.Add(gate_usage[j] == sum(gate_assignments[(i, j)] for i in gate_flights[j]))
 
     max_gate_usage = model.NewIntVar(0, len(flights), 'max_gate_usage')
     min_gate_usage = model.NewIntVar(0, len(flights), 'min_gate_usage')
@@ -104,58 +350,63 @@ def create_gate_assignment_model(db_path, start_time, end_time):
     model.Add(gate_usage_difference == max_gate_usage - min_gate_usage)
 
     # Airline preferences (soft constraint)
-    airline_preferences = {
-        'AI': 'T3',  # Air India prefers Terminal 3
-        '6E': 'T1',  # IndiGo prefers Terminal 1
-        'UK': 'T3',  # Vistara prefers Terminal 3
-        'SG': 'T1',  # SpiceJet prefers Terminal 1
-    }
     preference_violations = []
     for i, flight in enumerate(flights):
         airline = flight[1]
-        if airline in airline_preferences:
-            preferred_terminal = airline_preferences[airline]
-            for j, gate in enumerate(gates):
-                if not gate[1].startswith(preferred_terminal):
+        if airline in AIRLINE_PREFERENCES:
+            preferred_terminal = AIRLINE_PREFERENCES[airline]
+            for j in flight_gates[i]:
+                if not gates[j][1].startswith(preferred_terminal):
                     violation = model.NewBoolVar(f'pref_violation_{i}_{j}')
                     model.Add(gate_assignments[(i, j)] <= violation)
                     preference_violations.append(violation)
 
     # Transit time constraints
     total_transit_time = model.NewIntVar(0, 10000000, 'total_transit_time')  # Arbitrary large upper bound
-    transit_times_list = []
-    for i, flight in enumerate(flights):
-        if flight[9]:  # If there's a connecting flight
-            connecting_flight_index = next((idx for idx, f in enumerate(flights) if f[0] == flight[9]), None)
-            if connecting_flight_index is not None:
-                for j1, gate1 in enumerate(gates):
-                    for j2, gate2 in enumerate(gates):
-                        transit_time = model.NewIntVar(0, 1000, f'transit_time_{i}_{connecting_flight_index}_{j1}_{j2}')
-                        transit_times_list.append(transit_time)
-                        
-                        # Get the transit time between gates, default to 30 minutes if not found
-                        time_between_gates = transit_times.get((gate1[0], gate2[0], 'PASSENGER'), 30)
-                        
-                        model.Add(transit_time >= time_between_gates).OnlyEnforceIf(
-                            [gate_assignments[(i, j1)], gate_assignments[(connecting_flight_index, j2)]]
-                        )
-                        model.Add(transit_time == 0).OnlyEnforceIf(
-                            [gate_assignments[(i, j1)].Not(), gate_assignments[(connecting_flight_index, j2)].Not()]
-                        )
+    connections = find_connections(flights)
+    if transit == 'linear':
+        transit_times_list = add_linear_transit(model, connections, gates, flight_gates, gate_assignments,
+                                                transit_times)
+    else:
+        transit_times_list = add_gate_pair_transit(model, connections, gates, flight_gates, gate_assignments,
+                                                   transit_times)
 
     model.Add(total_transit_time == sum(transit_times_list))
 
     # Passenger count considerations
     total_passengers = model.NewIntVar(0, sum(flight[7] for flight in flights), 'total_passengers')
-    model.Add(total_passengers == sum(gate_assignments[(i, j)] * flight[7] for i, flight in enumerate(flights) for j in range(len(gates))))
+    model.Add(total_passengers == sum(assigned * flights[i][7] for (i, j), assigned in gate_assignments.items()))
 
     # Objective function components
-    total_assigned = sum(gate_assignments[(i, j)] for i in range(len(flights)) for j in range(len(gates)))
+    total_assigned = sum(gate_assignments.values())
     total_preference_violations = sum(preference_violations)
 
     # Objective: Maximize assignments, minimize usage differences, maximize passengers, minimize preference violations and transit times
-    model.Maximize(1000000 * total_assigned + 10000 * total_passengers - 1000 * terminal_usage_difference - 
-                   100 * gate_usage_difference - 500 * total_preference_violations - total_transit_time)
+    objective = (1000000 * total_assigned + 10000 * total_passengers - 1000 * terminal_usage_difference -
+                 100 * gate_usage_difference - 500 * total_preference_violations - total_transit_time)
+    model.Maximize(objective)
+
+    variables = {
+        'gate_assignments': gate_assignments,
+        'terminal_usage': terminal_usage,
+        'terminal_usage_difference': terminal_usage_difference,
+        'gate_usage_difference': gate_usage_difference,
+        'total_preference_violations': total_preference_violations,
+        'total_transit_time': total_transit_time,
+        'total_passengers': total_passengers,
+        'objective': objective,
+    }
+
+    return model, variables
+
+
+def create_gate_assignment_model(db_path, start_time, end_time, formulation='pairwise', sparse=False,
+                                 transit='gate_pairs'):
+    flights, gates, gate_aircraft_compatibility, transit_times = load_gate_data(db_path, start_time, end_time)
+
+    model, variables = build_gate_assignment_model(flights, gates, gate_aircraft_compatibility, transit_times,
+                                                   formulation=formulation, sparse=sparse, transit=transit)
+    gate_assignments = variables['gate_assignments']
 
     # Solve the model
     solver = cp_model.CpSolver()
@@ -164,22 +415,21 @@ def create_gate_assignment_model(db_path, start_time, end_time):
 
     if status == cp_model.OPTIMAL or status == cp_model.FEASIBLE:
         logging.info(f'Solution found with status: {solver.StatusName(status)}')
-        assignments = [(flight[0], flight[1], gates[j][0], flight[5], flight[6], flight[7])
-                       for i, flight in enumerate(flights)
-                       for j in range(len(gates))
-                       if solver.Value(gate_assignments[(i, j)]) == 1]
-        
+        assignments = [(flights[i][0], flights[i][1], gates[j][0], flights[i][5], flights[i][6], flights[i][7])
+                       for (i, j), assigned in gate_assignments.items()
+                       if solver.Value(assigned) == 1]
+
         # Log results
         logging.info(f"Total flights assigned: {len(assignments)}")
-        logging.info(f"Total passengers accommodated: {solver.Value(total_passengers)}")
-        logging.info(f"Terminal usage difference: {solver.Value(terminal_usage_difference)}")
-        logging.info(f"Gate usage difference: {solver.Value(gate_usage_difference)}")
-        logging.info(f"Airline preference violations: {solver.Value(total_preference_violations)}")
-        logging.info(f"Total transit time: {solver.Value(total_transit_time)}")
-        
-        for terminal, usage in terminal_usage.items():
+        logging.info(f"Total passengers accommodated: {solver.Value(variables['total_passengers'])}")
+        logging.info(f"Terminal usage difference: {solver.Value(variables['terminal_usage_difference'])}")
+        logging.info(f"Gate usage difference: {solver.Value(variables['gate_usage_difference'])}")
+        logging.info(f"Airline preference violations: {solver.Value(variables['total_preference_violations'])}")
+        logging.info(f"Total transit time: {solver.Value(variables['total_transit_time'])}")
+
+        for terminal, usage in variables['terminal_usage'].items():
             logging.info(f"Terminal {terminal} usage: {solver.Value(usage)}")
-        
+
         # Generate CSV file
         csv_filename = 'gate_assignments.csv'
         with open(csv_filename, 'w', newline='') as csvfile:
@@ -187,19 +437,20 @@ def create_gate_assignment_model(db_path, start_time, end_time):
             csvwriter.writerow(['Flight ID', 'Airline', 'Gate', 'Arrival Time', 'Departure Time', 'Passengers'])
             for assignment in assignments:
                 csvwriter.writerow(assignment)
-        
+
         logging.info(f"Gate assignments saved to {csv_filename}")
-        
+
         return assignments
     else:
         logging.warning(f'No solution found. Status: {solver.StatusName(status)}')
         return None
-    
-def main():
+
+def main(formulation='pairwise', sparse=False, transit='gate_pairs'):
     db_path = 'igi_airport.db'
-    
+
     # Connect to the database
     engine = create_engine(f'sqlite:///{db_path}')
+    add_flight_time_columns(engine)
     Session = sessionmaker(bind=engine)
     session = Session()
 
@@ -213,9 +464,11 @@ def main():
         # Set the end time to 24 hours after the start time
         end_time = start_time + timedelta(hours=24)
 
-        print(f"Analyzing flights from {start_time} to {end_time}")
+        print(f"Analyzing flights from {start_time} to {end_time} ({formulation} formulation)")
 
-        assignments = create_gate_assignment_model(db_path, start_time.isoformat(), end_time.isoformat())
+        # SQLite stores timestamps with a space separator, so compare against the same format
+        assignments = create_gate_assignment_model(db_path, start_time.isoformat(sep=' '), end_time.isoformat(sep=' '),
+                                                   formulation=formulation, sparse=sparse, transit=transit)
 
         if assignments:
             print(f"Gate assignments have been saved to gate_assignments.csv")
@@ -228,4 +481,4 @@ def main():
     session.close()
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
@@ -0,0 +1,138 @@
+import csv
+import sqlite3
+import time
+import logging
+from datetime import datetime, timedelta
+from ortools.sat.python import cp_model
+from database_manager import create_engine, epoch_minutes, add_flight_time_columns
+from model import (TURNAROUND_MINUTES, load_flights, load_airport_data, build_gate_assignment_model, gate_window,
+                   find_gate_overlaps)
+
+
+def load_plan(csv_filename):
+    """Read a flight id -> gate id plan from a gate_assignments.csv written by model.py."""
+    with open(csv_filename, newline='') as csvfile:
+        return {row['Flight ID']: row['Gate'] for row in csv.DictReader(csvfile)}
+
+
+class GateReoptimizer:
+    """
+    Incremental gate re-optimisation over a sliding look-ahead window.
+
+    Gates, compatibility and transit times are read once. Every call to `reoptimize` only
+    loads the flights that touch [now, now + lookahead] using their actual times where
+    recorded, seeds CP-SAT with the previous plan as a solution hint and penalises moving
+    anyone: `change_penalty` for flights not yet on stand and `freeze_penalty`, above any
+    one flight's share of the objective, for flights that are already on stand (or about
+    to be). Those only move when delays leave two of them overlapping on one gate. The
+    result is the list of gate changes against the previous plan, with None as the new
+    gate of flights left without one. Raises RuntimeError when no plan is found.
+    """
+
+    def __init__(self, db_path, plan=None, lookahead_hours=4, freeze_minutes=15, time_limit=8.0,
+                 num_workers=8, change_penalty=2000, freeze_penalty=100000000):
+        self.db_path = db_path
+        self.plan = dict(plan or {})
+        self.lookahead = timedelta(hours=lookahead_hours)
+        self.freeze = timedelta(minutes=freeze_minutes)
+        self.time_limit = time_limit
+        self.num_workers = num_workers
+        self.change_penalty = change_penalty
+        self.freeze_penalty = freeze_penalty
+
+        conn = sqlite3.connect(db_path)
+        self.gates, self.gate_aircraft_compatibility, self.transit_times = load_airport_data(conn.cursor())
+        conn.close()
+
+    def reoptimize(self, now):
+        started = time.perf_counter()
+
+        conn = sqlite3.connect(self.db_path)
+        window_start = now.isoformat(sep=' ', timespec='seconds')
+        # A flight departing just after the window already holds its gate inside it
+        window_end = (now + self.lookahead + timedelta(minutes=TURNAROUND_MINUTES)).isoformat(
+            sep=' ', timespec='seconds')
+        flights = load_flights(conn.cursor(), window_start, window_end, use_actual_times=True)
+        conn.close()
+
+        if not flights:
+            logging.info(f"No flights between {window_start} and {window_end}.")
+            return []
+
+        model, variables = build_gate_assignment_model(flights, self.gates, self.gate_aircraft_compatibility,
+                                                       self.transit_times, formulation='interval', sparse=True,
+                                                       transit='linear')
+        gate_assignments = variables['gate_assignments']
+
+        # Every flight is hinted towards its gate and pays a penalty for being moved, a
+        # prohibitive one if it is on stand (or about to be)
+        freeze_cutoff = epoch_minutes(now + self.freeze)
+        frozen = set()
+        moves, frozen_moves = [], []
+        for (i, j), assigned in gate_assignments.items():
+            previous_gate = self.plan.get(flights[i][0])
+            if previous_gate is None:
+                continue
+            on_previous_gate = self.gates[j][0] == previous_gate
+            model.AddHint(assigned, on_previous_gate)
+            if not on_previous_gate:
+                continue
+            if gate_window(flights[i])[0] < freeze_cutoff:
+                frozen_moves.append(1 - assigned)
+                frozen.add(i)
+            else:
+                moves.append(1 - assigned)
+
+        model.Maximize(variables['objective'] - self.change_penalty * sum(moves) -
+                       self.freeze_penalty * sum(frozen_moves))
+
+        solver = cp_model.CpSolver()
+        solver.parameters.max_time_in_seconds = self.time_limit
+        solver.parameters.num_workers = self.num_workers
+        status = solver.Solve(model)
+
+        if status not in (cp_model.OPTIMAL, cp_model.FEASIBLE):
+            raise RuntimeError(f"Re-optimisation at {window_start} found no solution. "
+                               f"Status: {solver.StatusName(status)}")
+
+        assigned_gates = {i: j for (i, j), assigned in gate_assignments.items() if solver.Value(assigned) == 1}
+        overlaps = find_gate_overlaps(flights, assigned_gates)
+        if overlaps:
+            raise RuntimeError("Re-optimised plan puts overlapping flights on one gate: " +
+                               ", ".join(f"{flights[i1][0]} and {flights[i2][0]} at {self.gates[j][0]}"
+                                         for j, i1, i2 in overlaps))
+
+        delta, frozen_moved = [], 0
+        for i, flight in enumerate(flights):
+            flight_id = flight[0]
+            previous_gate = self.plan.get(flight_id)
+            new_gate = self.gates[assigned_gates[i]][0] if i in assigned_gates else None
+            if previous_gate != new_gate:
+                delta.append((flight_id, previous_gate, new_gate))
+                frozen_moved += i in frozen
+            if new_gate is None:
+                self.plan.pop(flight_id, None)
+            else:
+                self.plan[flight_id] = new_gate
+
+        logging.info(f"Re-optimised {len(flights)} flights ({len(frozen)} frozen, {frozen_moved} of them moved) in "
+                     f"{time.perf_counter() - started:.2f}s with status {solver.StatusName(status)}; "
+                     f"{len(delta)} gate changes.")
+
+        return delta
+
+
+def main():
+    db_path = 'igi_airport.db'
+    add_flight_time_columns(create_engine(f'sqlite:///{db_path}'))
+    reoptimizer = GateReoptimizer(db_path, plan=load_plan('gate_assignments.csv'))
+
+    delta = reoptimizer.reoptimize(datetime.now())
+
+    print(f"{len(delta)} gate changes")
+    for flight_id, previous_gate, new_gate in delta:
+        print(f"{flight_id}: {previous_gate or 'unassigned'} -> {new_gate or 'unassigned'}")
+
+
+if __name__ == "__main__":
+    main()
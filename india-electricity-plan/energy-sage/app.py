@@ -2,8 +2,7 @@ import streamlit as st
 import pandas as pd
 import plotly.express as px
 from data_loader import load_data
-from model import create_model
-from optimizer import optimize_model
+from scenarios import solve_scenario, scenario_grid, run_sweep
 import config
 
 
@@ -58,16 +57,58 @@ def run_app():
     # Run optimization
     if st.button("Run Optimization"):
         with st.spinner("Optimizing energy transition strategy..."):
-            model, investment, capacity_slack, total_capacity_var, total_capacity_slack, source_used, total_production = create_model(
-                data, params)
-            results = optimize_model(model, data, investment, capacity_slack, total_capacity_var,
-                                     total_capacity_slack, source_used, total_production, params)
+            results = solve_scenario(data, params)
 
         if results:
             display_results(results, data, params)
         else:
             st.error("No optimal solution found. Try adjusting the parameters.")
 
+    # Scenario sweep
+    st.header("Scenario Sweep")
+    st.write("Solve every combination of the values below, with the other parameters as set above.")
+    col1, col2, col3 = st.columns(3)
+    budgets = col1.text_input("Total Budgets (lakh crore ₹)", "40, 50, 60, 70, 80")
+    renewable_targets = col2.text_input("Renewable Energy Targets (%)", "35, 40, 45, 50")
+    emission_limits = col3.text_input("Emissions Increase Limits (%)", "0, 5, 10")
+
+    if st.button("Run Sweep"):
+        scenarios = scenario_grid(
+            params,
+            TOTAL_BUDGET=[float(v) * 1e11 for v in budgets.split(',')],
+            RENEWABLE_TARGET=[float(v) / 100 for v in renewable_targets.split(',')],
+            EMISSIONS_INCREASE_LIMIT=[float(v) / 100 for v in emission_limits.split(',')])
+        with st.spinner(f"Solving {len(scenarios)} scenarios..."):
+            results = run_sweep(data, scenarios)
+        display_sweep(scenarios, results)
+
+
+def display_sweep(scenarios, results):
+    rows = []
+    for params, result in zip(scenarios, results):
+        rows.append({
+            'Budget (lakh crore ₹)': params['TOTAL_BUDGET'] / 1e11,
+            'Renewable Target (%)': params['RENEWABLE_TARGET'] * 100,
+            'Emissions Limit (%)': params['EMISSIONS_INCREASE_LIMIT'] * 100,
+            'Investment (lakh crore ₹)': result['total_investment'] / 1e11 if result else None,
+            'Total Capacity (MW)': result['total_capacity'] if result else None,
+            'Renewable (%)': result['renewable_capacity'] / result['total_capacity'] * 100 if result else None,
+            'Emissions Change (%)': result['emissions_change'] if result else None,
+        })
+    df_sweep = pd.DataFrame(rows)
+    st.dataframe(df_sweep)
+
+    fig_sweep = px.line(
+        df_sweep,
+        x='Budget (lakh crore ₹)',
+        y='Total Capacity (MW)',
+        color='Renewable Target (%)',
+        facet_col='Emissions Limit (%)',
+        markers=True,
+        title="Total Capacity by Budget"
+    )
+    st.plotly_chart(fig_sweep)
+
 
 def display_results(results, data, params):
     st.header("Optimization Results")
@@ -1,40 +1,34 @@
 # data_loader.py
 
-import pandas as pd
+import os
+import sys
 from config import *
 
-def load_data():
-    emissions_data = pd.read_csv(EMISSIONS_DATA_PATH)
-    capacity_bounds_data = pd.read_csv(CAPACITY_BOUNDS_PATH)
-    capital_costs_data = pd.read_csv(CAPITAL_COSTS_PATH)
+# The parsed source/year tables are shared with the scripts one directory up
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from energy_data import SOURCES_FILE, CAPACITY_BOUNDS_FILE, CAPITAL_COSTS_FILE, load_energy_data
 
-    sources = emissions_data["Source"].tolist()
-    years = list(range(START_YEAR, END_YEAR + 1))
-    current_capacity = dict(zip(emissions_data["Source"], emissions_data["Current Production (MW)"]))
-    emission_factors = dict(zip(emissions_data["Source"], emissions_data["Emission Factor (kg CO2/kWh)"]))
-    capacity_factors = dict(zip(emissions_data["Source"], emissions_data["Capacity Factor (%)"] / 100))
 
-    # Process capital costs (convert million rupees to rupees)
-    capital_cost = {source: {} for source in sources}
-    for _, row in capital_costs_data.iterrows():
-        source = row['Source']
-        for year in range(START_YEAR, 2029):
-            capital_cost[source][year] = row[str(year)] * 1e6  # Convert million rupees to rupees
-        # Extend to 2029 and 2030 with the same value as 2028
-        capital_cost[source][2029] = capital_cost[source][2028]
-        capital_cost[source][2030] = capital_cost[source][2028]
+def load_data(start_year=START_YEAR, end_year=END_YEAR):
+    # The configured tables replace the shared ones; the other tables sit next to the sources table
+    energy = load_energy_data(start_year, end_year, os.path.dirname(EMISSIONS_DATA_PATH), paths={
+        SOURCES_FILE: EMISSIONS_DATA_PATH,
+        CAPACITY_BOUNDS_FILE: CAPACITY_BOUNDS_PATH,
+        CAPITAL_COSTS_FILE: CAPITAL_COSTS_PATH,
+    })
+    years = energy.years.tolist()
 
-    # Capacity bounds
-    min_capacity = {row["Source"]: row["Min Capacity (GW)"] * 1000 for _, row in capacity_bounds_data.iterrows()}
-    max_capacity = {row["Source"]: row["Max Capacity (GW)"] * 1000 for _, row in capacity_bounds_data.iterrows()}
+    # Capital costs are projected per year in rupees
+    capital_cost = {source: dict(zip(years, costs.tolist()))
+                    for source, costs in zip(energy.sources, energy.projected_capital_cost)}
 
     return {
-        'sources': sources,
+        'sources': list(energy.sources),
         'years': years,
-        'current_capacity': current_capacity,
-        'emission_factors': emission_factors,
-        'capacity_factors': capacity_factors,
+        'current_capacity': energy.by_source(energy.current_capacity),
+        'emission_factors': energy.by_source(energy.emission_factors),
+        'capacity_factors': energy.by_source(energy.capacity_factors),
         'capital_cost': capital_cost,
-        'min_capacity': min_capacity,
-        'max_capacity': max_capacity
-    }
\ No newline at end of file
+        'min_capacity': energy.by_source(energy.min_capacity),
+        'max_capacity': energy.by_source(energy.max_capacity)
+    }
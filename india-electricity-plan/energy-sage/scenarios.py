@@ -0,0 +1,232 @@
+# scenarios.py
+
+import os
+import json
+import pickle
+import tempfile
+import hashlib
+import itertools
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from model import create_model
+from optimizer import optimize_model
+import config
+
+SCENARIO_CACHE_DIR = "india-electricity-plan/energy-sage/.scenario_cache"
+MAX_CACHED_FILES = 2000  # Scenario results kept on disk, least recently used removed first
+MAX_CACHED_RESULTS = 500  # Scenario results kept in memory
+
+# Model parameters with their config defaults, as the app passes them to create_model
+DEFAULT_PARAMS = {name: getattr(config, name) for name in [
+    'START_YEAR', 'END_YEAR', 'TOTAL_BUDGET', 'YEARLY_BUDGET_FRACTION', 'MIN_TOTAL_CAPACITY',
+    'MAX_TOTAL_CAPACITY', 'RENEWABLE_TARGET', 'EMISSIONS_INCREASE_LIMIT', 'MIN_SOURCES_USED',
+    'TOTAL_CAPACITY_PENALTY', 'CAPACITY_PENALTY', 'DIVERSITY_INCENTIVE', 'PRODUCTION_WEIGHT',
+    'TIME_LIMIT', 'MIP_GAP']}
+
+# Results of infeasible scenarios are cached as None, so a miss is told apart by this marker
+MISSING = object()
+
+_memory_cache = OrderedDict()
+
+
+class ScenarioModel:
+    """
+    One Gurobi model reused across scenarios.
+
+    The model is built once with create_model; each scenario then only changes
+    right-hand sides, the renewable-target coefficient and objective coefficients, and
+    starts from the previous scenario's solution. Changing the year range changes the
+    model's shape, so it rebuilds.
+    """
+
+    def __init__(self, data, params, quiet=False):
+        self.data = data
+        self.data_key = scenario_key(data)
+        self.quiet = quiet
+        self._build(params)
+
+    def _build(self, params):
+        (self.model, self.investment, self.capacity_slack, self.total_capacity_var, self.total_capacity_slack,
+         self.source_used, self.total_production) = create_model(self.data, params)
+        if self.quiet:
+            self.model.Params.OutputFlag = 0
+        self.model.update()
+        self.params = dict(params)
+        self.current_emissions = sum(self.data['current_capacity'][s] * 1000 * self.data['emission_factors'][s] *
+                                     self.data['capacity_factors'][s] * 8760 for s in self.data['sources'])
+
+    def _constr(self, name):
+        return self.model.getConstrByName(name)
+
+    def update(self, params):
+        """Move the model from the current parameters to `params`."""
+        if (params['START_YEAR'], params['END_YEAR']) != (self.params['START_YEAR'], self.params['END_YEAR']):
+            self._build(params)
+            return
+
+        budget = params['TOTAL_BUDGET']
+        self._constr("Total_Budget").RHS = budget
+        for y in self.data['years']:
+            self._constr(f"Yearly_Budget_{y}").RHS = params['YEARLY_BUDGET_FRACTION'] * budget
+        for s in self.data['sources']:
+            self._constr(f"Max_Investment_{s}").RHS = 0.4 * budget
+        self._constr("Min_Total_Capacity").RHS = params['MIN_TOTAL_CAPACITY']
+        self._constr("Max_Total_Capacity").RHS = params['MAX_TOTAL_CAPACITY']
+        self._constr("Min_Sources_Used").RHS = params['MIN_SOURCES_USED']
+        self.model.chgCoeff(self._constr("Renewable_Target"), self.total_capacity_var, -params['RENEWABLE_TARGET'])
+
+        # The current emissions are folded into the right-hand side, so shift it by the change in the limit
+        emissions = self._constr("Emissions_Limit")
+        emissions.RHS += (params['EMISSIONS_INCREASE_LIMIT'] - self.params['EMISSIONS_INCREASE_LIMIT']) * \
+            self.current_emissions
+
+        self.total_capacity_slack.Obj = params['TOTAL_CAPACITY_PENALTY']
+        for s in self.data['sources']:
+            self.capacity_slack[s].Obj = params['CAPACITY_PENALTY']
+            self.source_used[s].Obj = -params['DIVERSITY_INCENTIVE']
+        self.total_production.Obj = -params['PRODUCTION_WEIGHT']
+
+        self.params = dict(params)
+
+    def solve(self, params):
+        """Solve one scenario, warm-started from the last solution found."""
+        start = self.model.getAttr('X', self.model.getVars()) if self.model.SolCount > 0 else None
+        self.update(params)
+        if start is not None and self.model.NumVars == len(start):
+            self.model.setAttr('Start', self.model.getVars(), start)
+        return optimize_model(self.model, self.data, self.investment, self.capacity_slack, self.total_capacity_var,
+                              self.total_capacity_slack, self.source_used, self.total_production, params)
+
+
+def scenario_key(data, params=None):
+    """Hash of the data and parameters a scenario is solved with."""
+    payload = json.dumps({'data': data, 'params': params}, sort_keys=True, default=str)
+    return hashlib.sha256(payload.encode()).hexdigest()
+
+
+def _remember(key, results):
+    _memory_cache[key] = results
+    _memory_cache.move_to_end(key)
+    if len(_memory_cache) > MAX_CACHED_RESULTS:
+        _memory_cache.popitem(last=False)
+
+
+def cached_result(key):
+    """A scenario's results from memory or disk, or MISSING if it was never solved."""
+    if key in _memory_cache:
+        _memory_cache.move_to_end(key)
+        return _memory_cache[key]
+    path = os.path.join(SCENARIO_CACHE_DIR, f"{key}.pkl")
+    try:
+        with open(path, 'rb') as f:
+            results = pickle.load(f)
+        os.utime(path)  # Marks the file as recently used for evict_cache_files
+    except (FileNotFoundError, EOFError, pickle.UnpicklingError):
+        return MISSING  # Never solved, evicted meanwhile, or unreadable: solve it again
+    _remember(key, results)
+    return results
+
+
+def evict_cache_files(max_files=MAX_CACHED_FILES):
+    """Remove the least recently used result files until at most `max_files` are left."""
+    paths = [os.path.join(SCENARIO_CACHE_DIR, name) for name in os.listdir(SCENARIO_CACHE_DIR)
+             if name.endswith('.pkl')]
+    for path in sorted(paths, key=os.path.getmtime)[:max(0, len(paths) - max_files)]:
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass  # Removed by another process
+
+
+def store_result(key, results):
+    _remember(key, results)
+    os.makedirs(SCENARIO_CACHE_DIR, exist_ok=True)
+    # Written under a temporary name and moved into place, so other sessions never read a partial file
+    descriptor, temporary_path = tempfile.mkstemp(dir=SCENARIO_CACHE_DIR, suffix='.tmp')
+    with os.fdopen(descriptor, 'wb') as f:
+        pickle.dump(results, f)
+    os.replace(temporary_path, os.path.join(SCENARIO_CACHE_DIR, f"{key}.pkl"))
+    evict_cache_files()
+
+
+_scenario_model = None
+
+
+def solve_scenario(data, params):
+    """Solve one scenario, reusing the process's model and the results cache."""
+    global _scenario_model
+    key = scenario_key(data, params)
+    results = cached_result(key)
+    if results is MISSING:
+        if _scenario_model is None or _scenario_model.data_key != scenario_key(data):
+            _scenario_model = ScenarioModel(data, params)
+        results = _scenario_model.solve(params)
+        store_result(key, results)
+    return results
+
+
+def _solve_batch(data, batch):
+    scenario_model = ScenarioModel(data, batch[0], quiet=True)
+    return [scenario_model.solve(params) for params in batch]
+
+
+def scenario_grid(base_params, **values):
+    """Every combination of the given parameter values, on top of `base_params`."""
+    names = list(values)
+    return [{**base_params, **dict(zip(names, combination))} for combination in itertools.product(*values.values())]
+
+
+def run_sweep(data, scenarios, workers=None):
+    """
+    Solve many scenarios, returning their results in the same order.
+
+    Cached scenarios are returned directly; the rest are split into one batch per worker
+    process, and each process builds its model once and solves its batch in order, so
+    neighbouring scenarios warm-start each other.
+    """
+    keys = [scenario_key(data, params) for params in scenarios]
+    results = [cached_result(key) for key in keys]
+    todo = [i for i, result in enumerate(results) if result is MISSING]
+    if not todo:
+        return results
+
+    size = -(-len(todo) // (workers or os.cpu_count()))
+    batches = [todo[k:k + size] for k in range(0, len(todo), size)]
+    with ProcessPoolExecutor(max_workers=len(batches)) as executor:
+        solved = executor.map(_solve_batch, [data] * len(batches), [[scenarios[i] for i in batch] for batch in batches])
+        for batch, batch_results in zip(batches, solved):
+            for i, result in zip(batch, batch_results):
+                store_result(keys[i], result)
+                results[i] = result
+    return results
+
+
+if __name__ == "__main__":
+    import sys
+    import time
+    import pandas as pd
+    from data_loader import load_data
+
+    # Sweep budget, renewable target and emission limit: python scenarios.py [workers]
+    workers = int(sys.argv[1]) if len(sys.argv) > 1 else None
+    data = load_data()
+    scenarios = scenario_grid(DEFAULT_PARAMS,
+                              TOTAL_BUDGET=[b * 1e11 for b in (40, 50, 60, 70, 80)],
+                              RENEWABLE_TARGET=[0.35, 0.4, 0.45, 0.5],
+                              EMISSIONS_INCREASE_LIMIT=[0.0, 0.05, 0.1])
+
+    started = time.perf_counter()
+    results = run_sweep(data, scenarios, workers)
+    print(f"Solved {len(scenarios)} scenarios in {time.perf_counter() - started:.2f}s")
+
+    rows = []
+    for params, result in zip(scenarios, results):
+        rows.append({
+            'budget (lakh crore)': params['TOTAL_BUDGET'] / 1e11,
+            'renewable target': params['RENEWABLE_TARGET'],
+            'emissions limit': params['EMISSIONS_INCREASE_LIMIT'],
+            'investment (lakh crore)': result['total_investment'] / 1e11 if result else None,
+            'capacity (MW)': result['total_capacity'] if result else None,
+            'emissions change (%)': result['emissions_change'] if result else None,
+        })
+    print(pd.DataFrame(rows).to_string(index=False))
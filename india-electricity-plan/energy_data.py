@@ -0,0 +1,150 @@
+import os
+import pickle
+from dataclasses import dataclass
+import numpy as np
+import pandas as pd
+
+DATA_DIR = "india-electricity-plan"
+CACHE_DIR = os.path.join(DATA_DIR, ".energy_data_cache")
+
+SOURCES_FILE = "indian_electricity_sources_with_emissions.csv"
+CAPACITY_BOUNDS_FILE = "source_based_capacity_bounds.csv"
+CAPITAL_COSTS_FILE = "projected_capital_costs_2024_2028_million_inr_per_mw.csv"
+POTENTIAL_PLANTS_FILE = "potential_energy_plants_india.csv"
+GOALS_FILE = "final_government_goals_2030_with_percent.csv"
+DATA_FILES = [SOURCES_FILE, CAPACITY_BOUNDS_FILE, CAPITAL_COSTS_FILE, POTENTIAL_PLANTS_FILE, GOALS_FILE]
+
+
+@dataclass
+class EnergyData:
+    """
+    The source and year tables as arrays indexed by source (in the order of the sources
+    table) and, for projected costs, by year. Values missing for a source are NaN.
+    """
+    sources: list
+    years: np.ndarray
+    source_type: np.ndarray
+    capital_cost: np.ndarray  # ₹/MW, from the sources table
+    current_capacity: np.ndarray  # MW
+    emission_factors: np.ndarray  # kg CO2/kWh
+    capacity_factors: np.ndarray  # Fraction of the year at full output
+    projected_capital_cost: np.ndarray  # ₹/MW, source × year
+    min_capacity: np.ndarray  # MW
+    max_capacity: np.ndarray  # MW
+    min_plants: np.ndarray
+    max_plants: np.ndarray
+    goals: dict  # Goal name -> 2030 target value
+
+    def index(self, source):
+        return self.sources.index(source)
+
+    def by_source(self, values):
+        """A {source: value} dict of one per-source array, leaving out missing values."""
+        return {s: v.item() for s, v in zip(self.sources, values) if not np.isnan(v)}
+
+
+def _by_source(table, sources, column, scale=1.0):
+    values = table.set_index("Source")[column].reindex(sources)
+    return values.to_numpy(dtype=float) * scale
+
+
+def data_paths(data_dir=DATA_DIR, paths=None):
+    """The path of every file in DATA_FILES: `paths[name]` where given, otherwise `name` in `data_dir`."""
+    paths = paths or {}
+    return {name: paths.get(name, os.path.join(data_dir, name)) for name in DATA_FILES}
+
+
+def parse_energy_data(start_year, end_year, data_dir=DATA_DIR, paths=None):
+    """Read and validate the CSV tables for the years start_year to end_year, located as in data_paths."""
+    paths = data_paths(data_dir, paths)
+    sources_table = pd.read_csv(paths[SOURCES_FILE])
+    bounds_table = pd.read_csv(paths[CAPACITY_BOUNDS_FILE])
+    costs_table = pd.read_csv(paths[CAPITAL_COSTS_FILE])
+    plants_table = pd.read_csv(paths[POTENTIAL_PLANTS_FILE])
+    goals_table = pd.read_csv(paths[GOALS_FILE])
+
+    sources = sources_table["Source"].tolist()
+    years = np.arange(start_year, end_year + 1)
+
+    # Projected costs (million ₹/MW) hold their first or last projection outside the projected years
+    projected_years = np.array([int(c) for c in costs_table.columns if c != "Source"])
+    columns = projected_years[np.searchsorted(projected_years, np.clip(years, projected_years[0], projected_years[-1]))]
+    projected = costs_table.set_index("Source").reindex(sources)[[str(y) for y in columns]]
+
+    data = EnergyData(
+        sources=sources,
+        years=years,
+        source_type=sources_table["Type"].to_numpy(dtype=str),
+        capital_cost=_by_source(sources_table, sources, "Capital Cost (₹/MW)"),
+        current_capacity=_by_source(sources_table, sources, "Current Production (MW)"),
+        emission_factors=_by_source(sources_table, sources, "Emission Factor (kg CO2/kWh)"),
+        capacity_factors=_by_source(sources_table, sources, "Capacity Factor (%)") / 100,
+        projected_capital_cost=projected.to_numpy(dtype=float) * 1e6,
+        min_capacity=_by_source(bounds_table, sources, "Min Capacity (GW)", 1000),
+        max_capacity=_by_source(bounds_table, sources, "Max Capacity (GW)", 1000),
+        min_plants=_by_source(plants_table, sources, "Min Plants"),
+        max_plants=_by_source(plants_table, sources, "Max Plants"),
+        goals=dict(zip(goals_table["Goal"], goals_table["Target Value"])),
+    )
+    validate_energy_data(data, [bounds_table, costs_table, plants_table])
+    return data
+
+
+def validate_energy_data(data, tables=()):
+    """Raise ValueError if the tables are inconsistent."""
+    if len(set(data.sources)) != len(data.sources):
+        raise ValueError("duplicate sources in the sources table")
+    for table in tables:
+        unknown = set(table["Source"]) - set(data.sources)
+        if unknown:
+            raise ValueError(f"sources missing from the sources table: {sorted(unknown)}")
+    for name in ["capital_cost", "current_capacity", "emission_factors", "capacity_factors"]:
+        values = getattr(data, name)
+        if np.isnan(values).any() or (values < 0).any():
+            raise ValueError(f"{name} must be given and non-negative for every source")
+    if np.isnan(data.projected_capital_cost).any() or (data.projected_capital_cost <= 0).any():
+        raise ValueError("projected capital costs must be positive for every source and year")
+    if (data.capacity_factors > 1).any():
+        raise ValueError("capacity factors must be at most 100%")
+    if (data.min_capacity > data.max_capacity).any():
+        raise ValueError("minimum capacity above maximum capacity")
+
+
+_memory_cache = {}
+
+
+def _fingerprint(paths):
+    return tuple(os.stat(path).st_mtime_ns for path in paths)
+
+
+def load_energy_data(start_year=2024, end_year=2030, data_dir=DATA_DIR, cache_dir=CACHE_DIR, paths=None):
+    """
+    The parsed tables for the years start_year to end_year, parsed at most once.
+
+    Files are located as in data_paths. Results are kept in memory and as a pickle
+    snapshot in `cache_dir`; both are discarded as soon as any CSV's modification time
+    changes.
+    """
+    files = tuple(os.path.abspath(path) for path in data_paths(data_dir, paths).values())
+    key = (files, start_year, end_year)
+    fingerprint = _fingerprint(files)
+    cached = _memory_cache.get(key)
+    if cached and cached[0] == fingerprint:
+        return cached[1]
+
+    path = os.path.join(cache_dir, f"energy_data_{start_year}_{end_year}.pkl")
+    data = None
+    if os.path.exists(path):
+        with open(path, "rb") as f:
+            snapshot = pickle.load(f)
+        if snapshot.get("files") == files and snapshot["fingerprint"] == fingerprint:
+            data = snapshot["data"]
+
+    if data is None:
+        data = parse_energy_data(start_year, end_year, data_dir, paths)
+        os.makedirs(cache_dir, exist_ok=True)
+        with open(path, "wb") as f:
+            pickle.dump({"files": files, "fingerprint": fingerprint, "data": data}, f)
+
+    _memory_cache[key] = (fingerprint, data)
+    return data
@@ -1,8 +1,8 @@
 import gurobipy as gp
 from gurobipy import GRB
-import pandas as pd
 import time
 import logging
+from energy_data import load_energy_data
 
 # Set up logging
 logging.basicConfig(level=logging.DEBUG, format='%(asctime)s - %(levelname)s - %(message)s')
@@ -23,29 +23,25 @@ def format_inr(amount):
 log("Initiating India's Energy Transition Optimization Model")
 
 log("Loading data from CSV files...")
-emissions_data = pd.read_csv("india-electricity-plan/indian_electricity_sources_with_emissions.csv")
-potential_plants_data = pd.read_csv("india-electricity-plan/potential_energy_plants_india.csv")
-goals_data = pd.read_csv("india-electricity-plan/final_government_goals_2030_with_percent.csv")
+energy = load_energy_data(2024, 2030)
 log("Data loading complete. Proceeding to model initialization.")
 
-# Import capacity bounds from CSV
-capacity_bounds_data = pd.read_csv("india-electricity-plan/source_based_capcity_bounds.csv")
-capacity_bounds = {
-    row["Source"]: {"min": row["Min Capacity (GW)"], "max": row["Max Capacity (GW)"]}
-    for _, row in capacity_bounds_data.iterrows()
-}
+# Capacity bounds in GW
+min_capacity_gw = energy.by_source(energy.min_capacity / 1000)
+max_capacity_gw = energy.by_source(energy.max_capacity / 1000)
+capacity_bounds = {source: {"min": min_capacity_gw[source], "max": max_capacity_gw[source]} for source in min_capacity_gw}
 
 log("Initializing Gurobi optimization model...")
 model = gp.Model("India's Energy Transition Strategy")
 
 log("Extracting and processing relevant data...")
-sources = emissions_data["Source"].tolist()
-years = list(range(2024, 2031))
+sources = energy.sources
+years = energy.years.tolist()
 log(f"Planning horizon: {years[0]} to {years[-1]}")
 
-capital_cost = dict(zip(emissions_data["Source"], emissions_data["Capital Cost (₹/MW)"]))
-current_capacity = dict(zip(emissions_data["Source"], emissions_data["Current Production (MW)"]))
-emission_factors = dict(zip(emissions_data["Source"], emissions_data["Emission Factor (kg CO2/kWh)"]))
+capital_cost = energy.by_source(energy.capital_cost)
+current_capacity = energy.by_source(energy.current_capacity)
+emission_factors = energy.by_source(energy.emission_factors)
 capacity_factors = {
     "Solar": 0.2, "Wind": 0.3, "Hydropower": 0.4, "Biomass": 0.7,
     "Nuclear": 0.9, "Coal": 0.8, "Natural Gas": 0.5,
@@ -66,13 +62,13 @@ goal_mappings = {
 }
 
 target_capacity = {
-    goal_mappings[row["Goal"]]: row["Target Value"] * 1000
-    for _, row in goals_data.iterrows()
-    if row["Goal"] in goal_mappings
+    goal_mappings[goal]: target * 1000
+    for goal, target in energy.goals.items()
+    if goal in goal_mappings
 }
 
-max_plants = dict(zip(potential_plants_data["Source"], potential_plants_data["Max Plants"]))
-min_plants = dict(zip(potential_plants_data["Source"], potential_plants_data["Min Plants"]))
+max_plants = energy.by_source(energy.max_plants)
+min_plants = energy.by_source(energy.min_plants)
 
 filtered_sources = [source for source in sources if source in target_capacity]
 log(f"Energy sources considered in the model: {', '.join(filtered_sources)}")
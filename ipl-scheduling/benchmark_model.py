@@ -0,0 +1,125 @@
+import sys
+import time
+import pandas as pd
+from collections import defaultdict
+from ortools.sat.python import cp_model
+from model import load_season, build_fixtures, build_schedule_model
+
+# Build time, model size and time to first feasible schedule of the pairing-first model
+# against the original (team pair, stadium, day) model.
+# Usage (from the repository root): python ipl-scheduling/benchmark_model.py [max_seconds] [num_days ...]
+
+
+def build_legacy_model(season):
+    """
+    The original formulation: a BoolVar for every (team pair, stadium, day).
+
+    Kept as it was for comparison, including its rest-day lists, which add each match
+    twice on its own day and so cannot be satisfied by any match.
+    """
+    rules = season["rules"]
+    num_days = rules["num_days"]
+    num_teams = len(season["teams"])
+    num_stadiums = len(season["stadiums"])
+    home_stadiums = season["home_stadiums"]
+    distance_matrix = season["distance_matrix"]
+    team_index = {team: i for i, team in enumerate(season["teams"])}
+    group_a = [team_index[team] for team in rules["groups"]["group_a"]]
+    group_b = [team_index[team] for team in rules["groups"]["group_b"]]
+
+    model = cp_model.CpModel()
+    matches = {}
+    team_availability = defaultdict(list)
+    venue_availability = defaultdict(list)
+    home_matches = defaultdict(list)
+    travel_distance_constraints = defaultdict(list)
+    total_travel_distance = [model.NewIntVar(0, 100000, f"total_travel_distance_{t}") for t in range(num_teams)]
+
+    for t1 in range(num_teams):
+        for t2 in range(t1 + 1, num_teams):
+            for s in range(num_stadiums):
+                for d in range(num_days):
+                    match = matches[(t1, t2, s, d)] = model.NewBoolVar(f"match_{t1}_{t2}_{s}_{d}")
+                    team_availability[t1, d].append(match)
+                    team_availability[t2, d].append(match)
+                    for r in range(rules["rest_days_between_matches"]):
+                        if d + r < num_days:
+                            team_availability[t1, d + r].append(match)
+                            team_availability[t2, d + r].append(match)
+                    venue_availability[s, d].append(match)
+                    if s == home_stadiums[t1]:
+                        home_matches[t1].append(match)
+                    if s == home_stadiums[t2]:
+                        home_matches[t2].append(match)
+                    travel_distance_constraints[t1].append(match * int(distance_matrix[home_stadiums[t1], s]))
+                    travel_distance_constraints[t2].append(match * int(distance_matrix[home_stadiums[t2], s]))
+
+    for match_vars in team_availability.values():
+        model.Add(sum(match_vars) <= rules["max_matches_per_day"])
+    for match_vars in venue_availability.values():
+        model.Add(sum(match_vars) <= rules["max_matches_per_day"])
+    for match_vars in home_matches.values():
+        model.Add(sum(match_vars) == rules["home_matches_per_team"])
+
+    def pair_matches(t1, t2):
+        return [matches[(min(t1, t2), max(t1, t2), s, d)] for s in range(num_stadiums) for d in range(num_days)]
+
+    for group in [group_a, group_b]:
+        for i, t1 in enumerate(group):
+            for t2 in group[i + 1:]:
+                model.Add(sum(pair_matches(t1, t2)) == 2)
+    for t1, t2 in zip(group_a, group_b):
+        model.Add(sum(pair_matches(t1, t2)) == 1)
+    for i, t1 in enumerate(group_a):
+        for j, t2 in enumerate(group_b):
+            if i != j:
+                model.Add(sum(pair_matches(t1, t2)) == 1)
+
+    for t, match_vars in travel_distance_constraints.items():
+        model.Add(total_travel_distance[t] == sum(match_vars))
+    total_distance_sum = model.NewIntVar(0, 1000000, "total_distance_sum")
+    model.Add(total_distance_sum == sum(total_travel_distance))
+    model.Minimize(total_distance_sum)
+    return model
+
+
+def build_pairing_model(season):
+    fixtures = build_fixtures(season["teams"], season["rules"])
+    model, _, _ = build_schedule_model(season, fixtures)
+    return model
+
+
+def benchmark_model(name, build, season, max_seconds):
+    started = time.perf_counter()
+    model = build(season)
+    build_s = time.perf_counter() - started
+
+    solver = cp_model.CpSolver()
+    solver.parameters.max_time_in_seconds = max_seconds
+    solver.parameters.stop_after_first_solution = True
+    status = solver.Solve(model)
+
+    proto = model.Proto()
+    found = status in (cp_model.OPTIMAL, cp_model.FEASIBLE)
+    return {
+        "model": name,
+        "days": season["rules"]["num_days"],
+        "variables": len(proto.variables),
+        "constraints": len(proto.constraints),
+        "build (s)": build_s,
+        "status": solver.StatusName(status),
+        "first feasible (s)": solver.WallTime() if found else float("nan"),
+    }
+
+
+if __name__ == "__main__":
+    max_seconds = float(sys.argv[1]) if len(sys.argv) > 1 else 60
+    season = load_season()
+    day_counts = [int(n) for n in sys.argv[2:]] or [season["rules"]["num_days"], 74]
+
+    rows = []
+    for num_days in day_counts:
+        season["rules"]["num_days"] = num_days
+        for name, build in [("pair x stadium x day", build_legacy_model), ("pairing-first", build_pairing_model)]:
+            rows.append(benchmark_model(name, build, season, max_seconds))
+    print(pd.DataFrame(rows).to_string(index=False, float_format=lambda v: f"{v:.2f}"))
@@ -0,0 +1,44 @@
+import sys
+import time
+import pandas as pd
+from model import load_season, build_fixtures
+from sequencing import plan_season, schedule_travel, reoptimise_window, improve_schedule
+
+# Team travel and wall time of the two-phase planner against one CP-SAT call over the
+# whole season (the same travel model, from the same phase-one start), for each seed.
+# Usage (from the repository root): python ipl-scheduling/benchmark_sequencing.py [full_season_seconds] [seeds ...]
+
+
+def benchmark_sequencing(seed, full_season_seconds=300, num_workers=8):
+    season = load_season()
+    fixtures = build_fixtures(season["teams"], season["rules"])
+
+    started = time.perf_counter()
+    hosts, days = plan_season(season, fixtures, seed, num_workers)
+    phase_one_s = time.perf_counter() - started
+
+    started = time.perf_counter()
+    full_days = reoptimise_window(season, fixtures, hosts, days, 0, season["rules"]["num_days"], seed,
+                                  num_workers, full_season_seconds)
+    full_s = time.perf_counter() - started
+
+    started = time.perf_counter()
+    lns_days = improve_schedule(season, fixtures, hosts, days, seed=seed, num_workers=num_workers)
+    lns_s = time.perf_counter() - started
+
+    return {
+        "seed": seed,
+        "phase one (km)": schedule_travel(season, fixtures, hosts, days),
+        "phase one (s)": phase_one_s,
+        "full season (km)": schedule_travel(season, fixtures, hosts, full_days),
+        "full season (s)": full_s,
+        "window LNS (km)": schedule_travel(season, fixtures, hosts, lns_days),
+        "window LNS (s)": lns_s,
+    }
+
+
+if __name__ == "__main__":
+    full_season_seconds = float(sys.argv[1]) if len(sys.argv) > 1 else 300
+    seeds = [int(s) for s in sys.argv[2:]] or [0, 1, 2]
+    results = pd.DataFrame([benchmark_sequencing(seed, full_season_seconds) for seed in seeds])
+    print(results.to_string(index=False, float_format=lambda v: f"{v:.2f}"))
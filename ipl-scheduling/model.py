@@ -3,201 +3,178 @@ from ortools.sat.python import cp_model
 import json
 from collections import defaultdict
 
-# Load data
-teams_home_df = pd.read_csv("ipl-scheduling/teams_home.csv")
-venues_df = pd.read_csv("ipl-scheduling/venues.csv")
-distance_df = pd.read_csv("ipl-scheduling/distance_matrix.csv", index_col=0)
-
-# Load rules
-with open("ipl-scheduling/ipl_rules.json", "r") as f:
-    rules = json.load(f)
-
-# Parameters
-num_days = rules["num_days"]
-home_matches_per_team = rules["home_matches_per_team"]
-rest_days_between_matches = rules["rest_days_between_matches"]
-max_matches_per_day = rules["max_matches_per_day"]
-
-
-teams = teams_home_df["Team"].tolist()
-num_teams = len(teams)
-num_stadiums = len(venues_df)
-
-# Create team and stadium mappings
-team_index = {team: i for i, team in enumerate(teams)}
-stadium_index = {row["Stadium"]: i for i, row in venues_df.iterrows()}
-home_stadiums = {
-    team_index[row["Team"]]: stadium_index[row["Home_Stadium"]]
-    for i, row in teams_home_df.iterrows()
-}
-
-
-# Create team name to index mapping
-team_name_to_index = {team: i for i, team in enumerate(teams)}
-
-group_a = [team_name_to_index[team] for team in rules["groups"]["group_a"]]
-group_b = [team_name_to_index[team] for team in rules["groups"]["group_b"]]
-
-# Define model
-model = cp_model.CpModel()
-
-# Variables and Constraints
-matches = {}
-team_availability = defaultdict(list)
-venue_availability = defaultdict(list)
-home_matches = defaultdict(list)
-group_stage_constraints = defaultdict(list)
-inter_group_constraints = defaultdict(list)
-travel_distance_constraints = defaultdict(list)
-
-total_travel_distance = [
-    model.NewIntVar(0, 100000, f"total_travel_distance_{t}") for t in range(num_teams)
-]
-
-distance_matrix = distance_df.values
-
-for t1 in range(num_teams):
-    for t2 in range(t1 + 1, num_teams):
-        for s in range(num_stadiums):
+DATA_DIR = "ipl-scheduling"
+
+
+def load_season(data_dir=DATA_DIR):
+    """
+    Load teams, venues, distances and rules into one dict.
+
+    `home_stadiums` maps team index to stadium index, and `distance_matrix` holds the km
+    between venues in the order of venues.csv.
+    """
+    teams_home_df = pd.read_csv(f"{data_dir}/teams_home.csv")
+    venues_df = pd.read_csv(f"{data_dir}/venues.csv")
+    distance_df = pd.read_csv(f"{data_dir}/distance_matrix.csv", index_col=0)
+
+    with open(f"{data_dir}/ipl_rules.json", "r") as f:
+        rules = json.load(f)
+
+    teams = teams_home_df["Team"].tolist()
+    stadium_index = {row["Stadium"]: i for i, row in venues_df.iterrows()}
+    home_stadiums = {i: stadium_index[stadium] for i, stadium in enumerate(teams_home_df["Home_Stadium"])}
+
+    # Distances are indexed by city, in the same order as the venues
+    distance_matrix = distance_df.loc[venues_df["Location"], venues_df["Location"]].values
+
+    return {
+        "teams": teams,
+        "stadiums": venues_df["Stadium"].tolist(),
+        "home_stadiums": home_stadiums,
+        "distance_matrix": distance_matrix,
+        "rules": rules,
+    }
+
+
+def fixture_counts(teams, rules):
+    """
+    Number of matches each pair of teams plays, keyed by (t1, t2) with t1 < t2.
+
+    Teams play every team in their own group `matches_within_group` times, the team in
+    the same position of the other group `matches_against_paired_team` times and the
+    rest of the other group `matches_against_other_group` times.
+    """
+    team_index = {team: i for i, team in enumerate(teams)}
+    group_a = [team_index[team] for team in rules["groups"]["group_a"]]
+    group_b = [team_index[team] for team in rules["groups"]["group_b"]]
+    if set(group_a) & set(group_b) or len(group_a) != len(group_b):
+        raise ValueError("groups must be disjoint and of equal size")
+
+    counts = {}
+    for group in (group_a, group_b):
+        for i, t1 in enumerate(group):
+            for t2 in group[i + 1:]:
+                counts[(min(t1, t2), max(t1, t2))] = rules.get("matches_within_group", 2)
+    for i, t1 in enumerate(group_a):
+        for j, t2 in enumerate(group_b):
+            key = "matches_against_paired_team" if i == j else "matches_against_other_group"
+            counts[(min(t1, t2), max(t1, t2))] = rules.get(key, 1)
+    return counts
+
+
+def build_fixtures(teams, rules):
+    """
+    List every match as (t1, t2, home), where home is the hosting team's index or None
+    when the model decides.
+
+    A pair that meets an even number of times splits its home games evenly; a pair with
+    an odd count leaves the last match's venue open.
+    """
+    fixtures = []
+    for (t1, t2), count in sorted(fixture_counts(teams, rules).items()):
+        for leg in range(count):
+            if count % 2 and leg == count - 1:
+                fixtures.append((t1, t2, None))
+            else:
+                fixtures.append((t1, t2, t1 if leg % 2 == 0 else t2))
+    return fixtures
+
+
+def build_schedule_model(season, fixtures):
+    """
+    Build the pairing-first CP-SAT model.
+
+    A match is always at one of its two teams' home stadiums, so each fixture gets a
+    single home/away variable (when its venue is open) and one day variable per day.
+    Teams play at most `max_matches_per_day` matches in any `rest_days_between_matches`
+    consecutive days. Two matches at the same stadium on the same day would mean the
+    home team plays twice that day, so this also keeps venues to one match a day.
+
+    Returns (model, day_vars, hosts_first) where day_vars[f][d] is fixture f on day d and
+    hosts_first[f] is true when the fixture's first team is at home.
+    """
+    rules = season["rules"]
+    num_days = rules["num_days"]
+    num_teams = len(season["teams"])
+    window = max(1, rules["rest_days_between_matches"])
+
+    model = cp_model.CpModel()
+    day_vars, hosts_first = [], []
+    team_days = defaultdict(list)
+    home_matches = defaultdict(list)
+
+    for f, (t1, t2, home) in enumerate(fixtures):
+        days = [model.NewBoolVar(f"match_{f}_{t1}_{t2}_{d}") for d in range(num_days)]
+        model.AddExactlyOne(days)
+        day_vars.append(days)
+
+        if home is None:
+            first_home = model.NewBoolVar(f"home_{f}_{t1}_{t2}")
+            home_matches[t1].append(first_home)
+            home_matches[t2].append(first_home.Not())
+        else:
+            first_home = model.NewConstant(int(home == t1))
+            home_matches[home].append(1)
+        hosts_first.append(first_home)
+
+        for t in (t1, t2):
             for d in range(num_days):
-                matches[(min(t1, t2), max(t1, t2), s, d)] = model.NewBoolVar(
-                    f"match_{t1}_{t2}_{s}_{d}"
-                )
-
-                # Team availability constraints
-                team_availability[t1, d].append(
-                    matches[(min(t1, t2), max(t1, t2), s, d)]
-                )
-                team_availability[t2, d].append(
-                    matches[(min(t1, t2), max(t1, t2), s, d)]
-                )
-
-                # Rest days between matches
-                for r in range(rest_days_between_matches):
-                    if d + r < num_days:
-                        team_availability[t1, d + r].append(
-                            matches[(min(t1, t2), max(t1, t2), s, d)]
-                        )
-                        team_availability[t2, d + r].append(
-                            matches[(min(t1, t2), max(t1, t2), s, d)]
-                        )
-
-                # Venue availability constraints
-                venue_availability[s, d].append(
-                    matches[(min(t1, t2), max(t1, t2), s, d)]
-                )
-
-                # Home matches constraints
-                if s == home_stadiums[t1]:
-                    home_matches[t1].append(matches[(min(t1, t2), max(t1, t2), s, d)])
-                if s == home_stadiums[t2]:
-                    home_matches[t2].append(matches[(min(t1, t2), max(t1, t2), s, d)])
-
-                # Travel distance constraints
-                travel_distance_constraints[t1].append(
-                    matches[(min(t1, t2), max(t1, t2), s, d)]
-                    * distance_matrix[home_stadiums[t1], s]
-                )
-                travel_distance_constraints[t2].append(
-                    matches[(min(t1, t2), max(t1, t2), s, d)]
-                    * distance_matrix[home_stadiums[t2], s]
-                )
-
-for (t, d), match_vars in team_availability.items():
-    model.Add(sum(match_vars) <= max_matches_per_day)
-
-for (s, d), match_vars in venue_availability.items():
-    model.Add(sum(match_vars) <= max_matches_per_day)
-
-for t, match_vars in home_matches.items():
-    model.Add(sum(match_vars) == home_matches_per_team)
-
-# Matches within the same group
-for group in [group_a, group_b]:
-    for i, t1 in enumerate(group):
-        for j, t2 in enumerate(group):
-            if i < j:
-                match_vars = [
-                    matches[(min(t1, t2), max(t1, t2), s, d)]
-                    for s in range(num_stadiums)
-                    for d in range(num_days)
-                    if (min(t1, t2), max(t1, t2), s, d) in matches
-                ]
-                if match_vars:
-                    model.Add(sum(match_vars) == 2)
-
-# Matches against the team in the same row in the other group
-for i in range(len(group_a)):
-    t1 = group_a[i]
-    t2 = group_b[i]
-    match_vars = [
-        matches[(min(t1, t2), max(t1, t2), s, d)]
-        for s in range(num_stadiums)
-        for d in range(num_days)
-        if (min(t1, t2), max(t1, t2), s, d) in matches
-    ]
-    if match_vars:
-        model.Add(sum(match_vars) == 1)
-
-# Matches against the remaining four teams in the other group
-for t1 in group_a:
-    remaining_teams = [t for t in group_b if t != group_b[group_a.index(t1)]]
-    for t2 in remaining_teams:
-        match_vars = [
-            matches[(min(t1, t2), max(t1, t2), s, d)]
-            for s in range(num_stadiums)
-            for d in range(num_days)
-            if (min(t1, t2), max(t1, t2), s, d) in matches
-        ]
-        if match_vars:
-            model.Add(sum(match_vars) == 1)
-
-for t1 in group_b:
-    remaining_teams = [t for t in group_a if t != group_a[group_b.index(t1)]]
-    for t2 in remaining_teams:
-        match_vars = [
-            matches[(min(t1, t2), max(t1, t2), s, d)]
-            for s in range(num_stadiums)
-            for d in range(num_days)
-            if (min(t1, t2), max(t1, t2), s, d) in matches
-        ]
-        if match_vars:
-            model.Add(sum(match_vars) == 1)
-
-for t, match_vars in travel_distance_constraints.items():
-    model.Add(total_travel_distance[t] == sum(match_vars))
-
-
-total_distance_sum = model.NewIntVar(0, 1000000, "total_distance_sum")
-model.Add(total_distance_sum == sum(total_travel_distance))
-average_distance = model.NewIntVar(0, 100000, "average_distance")
-# model.AddDivisionEquality(average_distance, total_distance_sum, num_teams)
-# for t in range(num_teams):
-#     model.Add(total_travel_distance[t] <= average_distance + 1000)
-#     model.Add(total_travel_distance[t] >= average_distance - 1000)
-
-# Objective
-model.Minimize(total_distance_sum)
-
-# Solve
-solver = cp_model.CpSolver()
-solver.parameters.log_search_progress = True
-solver.parameters.max_time_in_seconds = 300
-status = solver.Solve(model)
-
-# Output results
-if status in [cp_model.OPTIMAL, cp_model.FEASIBLE]:
-    print("Schedule found!")
+                team_days[t, d].append(days[d])
+
+    # Rest days: a sliding window of days per team
+    for t in range(num_teams):
+        for start in range(num_days - window + 1):
+            model.Add(sum(var for d in range(start, start + window) for var in team_days[t, d])
+                      <= rules["max_matches_per_day"])
+
+    for t in range(num_teams):
+        model.Add(sum(home_matches[t]) == rules["home_matches_per_team"])
+
+    # Legs of the same pair are played in fixture order
+    for f in range(len(fixtures) - 1):
+        if fixtures[f][:2] == fixtures[f + 1][:2]:
+            model.Add(sum(d * var for d, var in enumerate(day_vars[f])) <
+                      sum(d * var for d, var in enumerate(day_vars[f + 1])))
+
+    return model, day_vars, hosts_first
+
+
+def extract_schedule(solver, season, fixtures, day_vars, hosts_first):
+    """Read the solved schedule as a DataFrame of home team, away team, stadium and day."""
+    teams, stadiums = season["teams"], season["stadiums"]
     schedule = []
-    for t1 in range(num_teams):
-        for t2 in range(t1 + 1, num_teams):
-            for s in range(num_stadiums):
-                for d in range(num_days):
-                    if solver.BooleanValue(matches[(t1, t2, s, d)]):
-                        schedule.append(
-                            [teams[t1], teams[t2], venues_df.iloc[s]["Stadium"], d]
-                        )
+    for f, (t1, t2, _) in enumerate(fixtures):
+        day = next(d for d, var in enumerate(day_vars[f]) if solver.BooleanValue(var))
+        home, away = (t1, t2) if solver.BooleanValue(hosts_first[f]) else (t2, t1)
+        schedule.append([teams[home], teams[away], stadiums[season["home_stadiums"][home]], day])
     schedule_df = pd.DataFrame(schedule, columns=["Team1", "Team2", "Stadium", "Day"])
-    schedule_df.to_csv("ipl_schedule.csv", index=False)
-else:
-    print("No feasible solution found.")
+    return schedule_df.sort_values(["Day", "Team1"], ignore_index=True)
+
+
+def travel_distance(schedule_df, season):
+    """Total km the away teams travel from their home stadium to each match."""
+    stadium_index = {stadium: i for i, stadium in enumerate(season["stadiums"])}
+    away_home = [season["home_stadiums"][season["teams"].index(team)] for team in schedule_df["Team2"]]
+    venue = schedule_df["Stadium"].map(stadium_index)
+    return int(season["distance_matrix"][away_home, venue].sum())
+
+
+if __name__ == "__main__":
+    season = load_season()
+    fixtures = build_fixtures(season["teams"], season["rules"])
+    model, day_vars, hosts_first = build_schedule_model(season, fixtures)
+
+    # Solve
+    solver = cp_model.CpSolver()
+    solver.parameters.log_search_progress = True
+    solver.parameters.max_time_in_seconds = 300
+    status = solver.Solve(model)
+
+    # Output results
+    if status in [cp_model.OPTIMAL, cp_model.FEASIBLE]:
+        print("Schedule found!")
+        schedule_df = extract_schedule(solver, season, fixtures, day_vars, hosts_first)
+        print(f"Total travel distance: {travel_distance(schedule_df, season)} km")
+        schedule_df.to_csv("ipl_schedule.csv", index=False)
+    else:
+        print("No feasible solution found.")
@@ -0,0 +1,190 @@
+import random
+import pandas as pd
+from collections import defaultdict
+from ortools.sat.python import cp_model
+from model import load_season, build_fixtures, build_schedule_model
+
+# Two-phase season planner with true team travel: every team travels from home to each
+# of its matches in day order and back home at the end of the season.
+# Phase one fixes the fixture list and home/away pattern (with a first feasible set of
+# days); phase two moves fixtures between days, one time window at a time, to cut travel.
+
+
+def plan_season(season, fixtures, seed=0, num_workers=8, max_time_in_seconds=60):
+    """
+    Phase one: decide who hosts each fixture and a first feasible set of days.
+
+    Returns (hosts, days) with hosts[f] the hosting team and days[f] the day of fixture f.
+    """
+    model, day_vars, hosts_first = build_schedule_model(season, fixtures)
+
+    solver = cp_model.CpSolver()
+    solver.parameters.random_seed = seed
+    solver.parameters.num_workers = num_workers
+    solver.parameters.max_time_in_seconds = max_time_in_seconds
+    solver.parameters.stop_after_first_solution = True
+    status = solver.Solve(model)
+    if status not in (cp_model.OPTIMAL, cp_model.FEASIBLE):
+        raise RuntimeError(f"no feasible season found: {solver.StatusName(status)}")
+
+    hosts = [t1 if solver.BooleanValue(hosts_first[f]) else t2 for f, (t1, t2, _) in enumerate(fixtures)]
+    days = [next(d for d, var in enumerate(day_vars[f]) if solver.BooleanValue(var)) for f in range(len(fixtures))]
+    return hosts, days
+
+
+def team_trips(season, fixtures, hosts, days):
+    """Per team, the (day, fixture, stadium) of each of its matches in day order."""
+    trips = defaultdict(list)
+    for f, (t1, t2, _) in enumerate(fixtures):
+        venue = season["home_stadiums"][hosts[f]]
+        trips[t1].append((days[f], f, venue))
+        trips[t2].append((days[f], f, venue))
+    for matches in trips.values():
+        matches.sort()
+    return trips
+
+
+def schedule_travel(season, fixtures, hosts, days):
+    """Total km all teams travel: home, then every match venue in day order, then home."""
+    distance = season["distance_matrix"]
+    total = 0
+    for t, matches in team_trips(season, fixtures, hosts, days).items():
+        route = [season["home_stadiums"][t]] + [venue for _, _, venue in matches] + [season["home_stadiums"][t]]
+        total += sum(int(distance[a, b]) for a, b in zip(route, route[1:]))
+    return total
+
+
+def reoptimise_window(season, fixtures, hosts, days, start, end, seed=0, num_workers=8, max_time_in_seconds=5):
+    """
+    Phase two step: move the fixtures played in days [start, end) to the days in the
+    window that minimise travel, keeping every other fixture where it is.
+
+    Each team with matches in the window gets a circuit through them: the depot stands
+    for where the team is before the window (its last venue, or home) and where it goes
+    next, and an arc from one match to another forces the second to a later day. Returns
+    the new days, or the given ones when nothing better was found.
+    """
+    rules = season["rules"]
+    rest = max(1, rules["rest_days_between_matches"])
+    distance = season["distance_matrix"]
+    free = [f for f, d in enumerate(days) if start <= d < end]
+    if not free:
+        return days
+
+    model = cp_model.CpModel()
+    day_vars, day_of = {}, {}
+    for f in free:
+        t1, t2, _ = fixtures[f]
+        allowed = []
+        for d in range(start, end):
+            clash = any(abs(days[g] - d) < rest for g, fixture in enumerate(fixtures)
+                        if not start <= days[g] < end and {t1, t2} & set(fixture[:2]))
+            if not clash:
+                allowed.append(d)
+        day_vars[f] = {d: model.NewBoolVar(f"match_{f}_{d}") for d in allowed}
+        model.AddExactlyOne(day_vars[f].values())
+        day_of[f] = model.NewIntVar(start, end - 1, f"day_{f}")
+        model.Add(day_of[f] == sum(d * var for d, var in day_vars[f].items()))
+        for d, var in day_vars[f].items():
+            model.AddHint(var, d == days[f])
+
+    # Legs of the same pair keep their order
+    for f in range(len(fixtures) - 1):
+        g = f + 1
+        if fixtures[f][:2] == fixtures[g][:2] and (f in day_of or g in day_of):
+            model.Add((day_of[f] if f in day_of else days[f]) < (day_of[g] if g in day_of else days[g]))
+
+    trips = team_trips(season, fixtures, hosts, days)
+    costs = []
+    for t, matches in trips.items():
+        window_matches = [(f, venue) for d, f, venue in matches if f in day_of]
+        if not window_matches:
+            continue
+
+        # Rest days between the team's matches inside the window
+        for first in range(start, end - rest + 1):
+            model.Add(sum(day_vars[f].get(d, 0) for f, _ in window_matches for d in range(first, first + rest))
+                      <= rules["max_matches_per_day"])
+
+        before = [venue for d, _, venue in matches if d < start]
+        after = [venue for d, _, venue in matches if d >= end]
+        origin = before[-1] if before else season["home_stadiums"][t]
+        destination = after[0] if after else season["home_stadiums"][t]
+
+        # Node 0 is the depot; the hint follows the current day order
+        order = [f for f, _ in sorted(window_matches, key=lambda m: days[m[0]])]
+        hinted = set(zip([None] + order, order + [None]))
+        arcs = []
+        nodes = [(None, destination, origin)] + [(f, venue, venue) for f, venue in window_matches]
+        for i, (f, _, leave) in enumerate(nodes):
+            for j, (g, arrive, _) in enumerate(nodes):
+                if i == j:
+                    continue
+                arc = model.NewBoolVar(f"travel_{t}_{i}_{j}")
+                arcs.append((i, j, arc))
+                model.AddHint(arc, (f, g) in hinted)
+                costs.append(int(distance[leave, arrive]) * arc)
+                if i and j:
+                    model.Add(day_of[g] > day_of[f]).OnlyEnforceIf(arc)
+        model.AddCircuit(arcs)
+
+    model.Minimize(sum(costs))
+
+    solver = cp_model.CpSolver()
+    solver.parameters.random_seed = seed
+    solver.parameters.num_workers = num_workers
+    solver.parameters.max_time_in_seconds = max_time_in_seconds
+    status = solver.Solve(model)
+    if status not in (cp_model.OPTIMAL, cp_model.FEASIBLE):
+        return days
+
+    new_days = list(days)
+    for f in free:
+        new_days[f] = solver.Value(day_of[f])
+    if schedule_travel(season, fixtures, hosts, new_days) > schedule_travel(season, fixtures, hosts, days):
+        return days
+    return new_days
+
+
+def improve_schedule(season, fixtures, hosts, days, round_days=7, window_rounds=2, iterations=20, seed=0,
+                     num_workers=8, max_time_in_seconds=5):
+    """
+    Phase two: re-optimise the season round by round, then in randomly placed windows.
+
+    The season is cut into rounds of `round_days` days. The first pass re-optimises each
+    window of `window_rounds` consecutive rounds in turn; the remaining `iterations`
+    windows start at random days drawn from `seed`. Returns the improved days.
+    """
+    num_days = season["rules"]["num_days"]
+    width = round_days * window_rounds
+    rng = random.Random(seed)
+
+    starts = list(range(0, max(1, num_days - width + round_days), round_days))
+    starts += [rng.randrange(max(1, num_days - width + 1)) for _ in range(iterations)]
+    for k, start in enumerate(starts):
+        days = reoptimise_window(season, fixtures, hosts, days, start, min(start + width, num_days),
+                                 seed + k, num_workers, max_time_in_seconds)
+    return days
+
+
+def schedule_frame(season, fixtures, hosts, days):
+    """The schedule as a DataFrame of home team, away team, stadium and day."""
+    teams, stadiums = season["teams"], season["stadiums"]
+    schedule = []
+    for f, (t1, t2, _) in enumerate(fixtures):
+        away = t2 if hosts[f] == t1 else t1
+        schedule.append([teams[hosts[f]], teams[away], stadiums[season["home_stadiums"][hosts[f]]], days[f]])
+    schedule_df = pd.DataFrame(schedule, columns=["Team1", "Team2", "Stadium", "Day"])
+    return schedule_df.sort_values(["Day", "Team1"], ignore_index=True)
+
+
+if __name__ == "__main__":
+    season = load_season()
+    fixtures = build_fixtures(season["teams"], season["rules"])
+
+    hosts, days = plan_season(season, fixtures)
+    print(f"Phase one: {schedule_travel(season, fixtures, hosts, days)} km")
+    days = improve_schedule(season, fixtures, hosts, days)
+    print(f"Phase two: {schedule_travel(season, fixtures, hosts, days)} km")
+
+    schedule_frame(season, fixtures, hosts, days).to_csv("ipl_schedule.csv", index=False)
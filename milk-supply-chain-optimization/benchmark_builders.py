@@ -0,0 +1,38 @@
+import sys
+import time
+from datetime import datetime, timedelta
+from model import (DEMAND_PATH, log_message, load_demand, build_period_model, build_incidence,
+                   build_period_model_matrix)
+
+# Compare model build time of the quicksum and matrix builders on the same arcs.csv/units.csv.
+# Usage: python benchmark_builders.py [demand.csv] [days]
+
+def time_build(build):
+    started = time.perf_counter()
+    model, *_ = build()
+    model.update()
+    return time.perf_counter() - started, model.NumVars, model.NumConstrs, model.NumNZs
+
+def benchmark_builders(demand_path=DEMAND_PATH, days=1):
+    start_date = datetime(2025, 1, 1)
+    demand = load_demand(start_date, start_date + timedelta(days=days - 1), demand_path)
+    log_message(f"Benchmarking builders on {len(demand)} demand rows")
+
+    started = time.perf_counter()
+    incidence = build_incidence()
+    incidence_seconds = time.perf_counter() - started
+
+    results = {
+        'quicksum': time_build(lambda: build_period_model(demand)),
+        'matrix': time_build(lambda: build_period_model_matrix(demand, incidence)),
+    }
+
+    print(f"{'builder':<10} {'build (s)':>10} {'variables':>10} {'constraints':>12} {'nonzeros':>10}")
+    for builder, (seconds, num_vars, num_constrs, num_nzs) in results.items():
+        print(f"{builder:<10} {seconds:>10.2f} {num_vars:>10} {num_constrs:>12} {num_nzs:>10}")
+    print(f"Incidence precomputation (once per network): {incidence_seconds:.2f}s")
+
+if __name__ == "__main__":
+    demand_path = sys.argv[1] if len(sys.argv) > 1 else DEMAND_PATH
+    days = int(sys.argv[2]) if len(sys.argv) > 2 else 1
+    benchmark_builders(demand_path, days)
@@ -0,0 +1,46 @@
+import sys
+import json
+import time
+import numpy as np
+import pandas as pd
+from create_links import JSON_PATH, UNITS_PATH, LINK_COLUMNS, create_links, create_links_kdtree, link_families
+
+# Compare the pairwise create_links loop with the KD-tree link builder on every link family.
+# The pairwise loop only sees a sample of the sources per family so that it finishes;
+# its time is scaled up to the full source count.
+# Usage: python benchmark_links.py [units.csv] [data.json] [sample_sources]
+
+def benchmark_links(units_path=UNITS_PATH, json_path=JSON_PATH, sample_sources=50):
+    with open(json_path, 'r') as f:
+        json_data = json.load(f)
+    units_df = pd.read_csv(units_path)
+
+    print(f"{'source':<26} {'target':<26} {'pairs':>10} {'links':>8} {'pairwise (s)':>13} {'kdtree (s)':>11} {'match':>6}")
+    for source_df, target_df, min_distance, max_distance in link_families(units_df, json_data):
+        if source_df.empty or target_df.empty:
+            continue
+
+        started = time.perf_counter()
+        links_df = create_links_kdtree(source_df, target_df, min_distance, max_distance)
+        kdtree_seconds = time.perf_counter() - started
+
+        sample = source_df.iloc[:sample_sources]
+        started = time.perf_counter()
+        expected = pd.DataFrame(create_links(sample, target_df, min_distance, max_distance), columns=LINK_COLUMNS)
+        pairwise_seconds = (time.perf_counter() - started) * len(source_df) / len(sample)
+
+        actual = links_df[links_df['SourceID'].isin(sample['UnitID'])]
+        match = (len(actual) == len(expected) and
+                 (actual['SourceID'].to_numpy() == expected['SourceID'].to_numpy()).all() and
+                 (actual['TargetID'].to_numpy() == expected['TargetID'].to_numpy()).all() and
+                 np.allclose(actual['Distance'].to_numpy(), expected['Distance'].to_numpy().astype(float)))
+
+        print(f"{'/'.join(source_df['UnitType'].unique()):<26} {'/'.join(target_df['UnitType'].unique()):<26} "
+              f"{len(source_df) * len(target_df):>10} {len(links_df):>8} {pairwise_seconds:>13.2f} "
+              f"{kdtree_seconds:>11.3f} {str(match):>6}")
+
+if __name__ == "__main__":
+    units_path = sys.argv[1] if len(sys.argv) > 1 else UNITS_PATH
+    json_path = sys.argv[2] if len(sys.argv) > 2 else JSON_PATH
+    sample_sources = int(sys.argv[3]) if len(sys.argv) > 3 else 50
+    benchmark_links(units_path, json_path, sample_sources)
@@ -2,17 +2,18 @@ import pandas as pd
 import numpy as np
 import json
 from math import radians, sin, cos, sqrt, atan2
+from scipy.spatial import cKDTree
 
-# Load the JSON data
-with open('milk-supply-chain-optimization/data/amul-dairy-supply-chain-comprehensive-data.json', 'r') as f:
-    json_data = json.load(f)
+JSON_PATH = 'milk-supply-chain-optimization/data/amul-dairy-supply-chain-comprehensive-data.json'
+UNITS_PATH = 'milk-supply-chain-optimization/data/supply_chain_units.csv'
+LINKS_PATH = 'milk-supply-chain-optimization/data/supply_chain_links.csv'
+LINK_COLUMNS = ['SourceID', 'SourceType', 'TargetID', 'TargetType', 'Distance']
 
-# Load the supply chain units data
-units_df = pd.read_csv('milk-supply-chain-optimization/data/supply_chain_units.csv')
+EARTH_RADIUS = 6371  # Earth's radius in kilometers
 
 # Haversine formula to calculate distance between two points
 def haversine_distance(lat1, lon1, lat2, lon2):
-    R = 6371  # Earth's radius in kilometers
+    R = EARTH_RADIUS
 
     lat1, lon1, lat2, lon2 = map(radians, [lat1, lon1, lat2, lon2])
     dlat = lat2 - lat1
@@ -41,39 +42,85 @@ def create_links(source_df, target_df, min_distance, max_distance):
                 })
     return links
 
-# Create links for each type of connection
-cooperatives = units_df[units_df['UnitType'] == 'VillageCooperative']
-district_centers = units_df[units_df['UnitType'] == 'DistrictCenter']
-plants = units_df[units_df['UnitType'] == 'Plant']
-storage_units = units_df[units_df['UnitType'].isin(['BMC', 'ColdStorage', 'Warehouse'])]
-retailers = units_df[units_df['UnitType'] == 'Retail']
-
-# Get connection radii from JSON
-coop_to_dc_range = json_data['connectionRadii']['villageCooperativesToDistrictCenters']
-dc_to_plant_range = json_data['connectionRadii']['districtCentersToPlants']
-plant_to_storage_range = json_data['connectionRadii']['plantsToStorageUnits']
-storage_to_retail_range = json_data['connectionRadii']['storageUnitsToRetailCenters']
-
-# Generate links
-coop_to_dc_links = create_links(cooperatives, district_centers, coop_to_dc_range['min'], coop_to_dc_range['max'])
-coop_to_plant_links = create_links(cooperatives, plants, coop_to_dc_range['min'], dc_to_plant_range['max'])
-dc_to_plant_links = create_links(district_centers, plants, dc_to_plant_range['min'], dc_to_plant_range['max'])
-plant_to_storage_links = create_links(plants, storage_units, plant_to_storage_range['min'], plant_to_storage_range['max'])
-storage_to_retail_links = create_links(storage_units, retailers, storage_to_retail_range['min'], storage_to_retail_range['max'])
-plant_to_retail_links = create_links(plants, retailers, storage_to_retail_range['min'], storage_to_retail_range['max'])
-
-# Combine all links
-all_links = (coop_to_dc_links + coop_to_plant_links + dc_to_plant_links +
-             plant_to_storage_links + storage_to_retail_links + plant_to_retail_links)
-
-# Convert to DataFrame and save to CSV
-links_df = pd.DataFrame(all_links)
-links_df.to_csv('milk-supply-chain-optimization/data/supply_chain_links.csv', index=False)
-
-print(f"Total links generated: {len(all_links)}")
-print("Supply chain links data saved to 'supply_chain_links.csv'")
-
-# Display summary of links
-link_types = links_df.groupby(['SourceType', 'TargetType']).size().reset_index(name='Count')
-print("\nSummary of link types:")
-print(link_types)
\ No newline at end of file
+# Vectorised haversine over arrays of coordinates in degrees
+def haversine_distances(lat1, lon1, lat2, lon2):
+    lat1, lon1, lat2, lon2 = map(np.radians, [lat1, lon1, lat2, lon2])
+    a = np.sin((lat2 - lat1) / 2)**2 + np.cos(lat1) * np.cos(lat2) * np.sin((lon2 - lon1) / 2)**2
+    return EARTH_RADIUS * 2 * np.arctan2(np.sqrt(a), np.sqrt(1 - a))
+
+# Points on the unit sphere, so that straight-line (chord) distance is monotone in great-circle distance
+def unit_vectors(df):
+    lat, lon = np.radians(df['Latitude'].to_numpy()), np.radians(df['Longitude'].to_numpy())
+    return np.column_stack([np.cos(lat) * np.cos(lon), np.cos(lat) * np.sin(lon), np.sin(lat)])
+
+# Same links as create_links, found with a KD-tree radius query instead of testing every pair
+def create_links_kdtree(source_df, target_df, min_distance, max_distance):
+    # Units without coordinates never fall inside a ring
+    source_df = source_df.dropna(subset=['Latitude', 'Longitude'])
+    target_df = target_df.dropna(subset=['Latitude', 'Longitude'])
+    if source_df.empty or target_df.empty:
+        return pd.DataFrame(columns=LINK_COLUMNS)
+
+    # Query slightly past the outer ring and apply the exact haversine test to the candidates
+    chord = 2 * np.sin(min(max_distance / EARTH_RADIUS, np.pi) / 2) * (1 + 1e-9) + 1e-12
+    tree = cKDTree(unit_vectors(target_df))
+    pairs = cKDTree(unit_vectors(source_df)).query_ball_tree(tree, chord)
+    sources = np.repeat(np.arange(len(source_df)), [len(p) for p in pairs])
+    targets = np.fromiter((t for p in pairs for t in sorted(p)), dtype=int, count=len(sources))
+
+    distance = haversine_distances(source_df['Latitude'].to_numpy()[sources], source_df['Longitude'].to_numpy()[sources],
+                                   target_df['Latitude'].to_numpy()[targets], target_df['Longitude'].to_numpy()[targets])
+    in_ring = (distance >= min_distance) & (distance <= max_distance)
+    sources, targets = sources[in_ring], targets[in_ring]
+
+    return pd.DataFrame({
+        'SourceID': source_df['UnitID'].to_numpy()[sources],
+        'SourceType': source_df['UnitType'].to_numpy()[sources],
+        'TargetID': target_df['UnitID'].to_numpy()[targets],
+        'TargetType': target_df['UnitType'].to_numpy()[targets],
+        'Distance': distance[in_ring],
+    }, columns=LINK_COLUMNS)
+
+# Source/target unit types and connection radii of every link family, in output order
+def link_families(units_df, json_data):
+    cooperatives = units_df[units_df['UnitType'] == 'VillageCooperative']
+    district_centers = units_df[units_df['UnitType'] == 'DistrictCenter']
+    plants = units_df[units_df['UnitType'] == 'Plant']
+    storage_units = units_df[units_df['UnitType'].isin(['BMC', 'ColdStorage', 'Warehouse'])]
+    retailers = units_df[units_df['UnitType'] == 'Retail']
+
+    # Get connection radii from JSON
+    coop_to_dc_range = json_data['connectionRadii']['villageCooperativesToDistrictCenters']
+    dc_to_plant_range = json_data['connectionRadii']['districtCentersToPlants']
+    plant_to_storage_range = json_data['connectionRadii']['plantsToStorageUnits']
+    storage_to_retail_range = json_data['connectionRadii']['storageUnitsToRetailCenters']
+
+    return [
+        (cooperatives, district_centers, coop_to_dc_range['min'], coop_to_dc_range['max']),
+        (cooperatives, plants, coop_to_dc_range['min'], dc_to_plant_range['max']),
+        (district_centers, plants, dc_to_plant_range['min'], dc_to_plant_range['max']),
+        (plants, storage_units, plant_to_storage_range['min'], plant_to_storage_range['max']),
+        (storage_units, retailers, storage_to_retail_range['min'], storage_to_retail_range['max']),
+        (plants, retailers, storage_to_retail_range['min'], storage_to_retail_range['max']),
+    ]
+
+if __name__ == "__main__":
+    # Load the JSON data
+    with open(JSON_PATH, 'r') as f:
+        json_data = json.load(f)
+
+    # Load the supply chain units data
+    units_df = pd.read_csv(UNITS_PATH)
+
+    # Generate links for each type of connection and save to CSV
+    links_df = pd.concat([create_links_kdtree(*family) for family in link_families(units_df, json_data)],
+                         ignore_index=True)
+    links_df.to_csv(LINKS_PATH, index=False)
+
+    print(f"Total links generated: {len(links_df)}")
+    print("Supply chain links data saved to 'supply_chain_links.csv'")
+
+    # Display summary of links
+    link_types = links_df.groupby(['SourceType', 'TargetType']).size().reset_index(name='Count')
+    print("\nSummary of link types:")
+    print(link_types)
@@ -2,9 +2,11 @@ import gurobipy as gp
 from gurobipy import GRB
 import pandas as pd
 import numpy as np
+import scipy.sparse as sp
 import json
 import os
 from datetime import datetime, timedelta
+from concurrent.futures import ProcessPoolExecutor, as_completed
 import time
 
 def log_message(message):
@@ -57,6 +59,17 @@ shelf_life = {product['name']: product['shelfLife']['duration'] for product in d
 
 transport_cost_per_km_kg = 0.01
 
+DEMAND_PATH = 'data/input/demand.csv'
+OUTPUT_DIR = 'data/output'
+
+# Output tables written per rolling-horizon window, with their columns
+RESULT_COLUMNS = {
+    'flow': ['Date', 'SourceID', 'TargetID', 'Product', 'Amount'],
+    'storage': ['Date', 'UnitID', 'Product', 'Amount'],
+    'production': ['Date', 'PlantID', 'Product', 'Amount'],
+    'unmet_demand': ['Date', 'RetailUnitID', 'Product', 'UnmetDemand'],
+}
+
 # Sets
 ARCS = list(zip(arcs['SourceID'], arcs['TargetID']))
 UNITS = units['UnitID'].tolist()
@@ -66,13 +79,7 @@ DAIRY_PRODUCTS = [product for product in PRODUCTS if product != 'Milk']
 STORAGE_UNITS = list(storage_cost.keys())
 CAPACITY_UNITS = list(capacity.keys())
 
-def solve_period(start_date, end_date):
-    log_message(f"Solving for period: {start_date} to {end_date}")
-    
-    demand = pd.read_csv('data/input/demand.csv', parse_dates=['Date'])
-    demand = demand[(demand['Date'] >= start_date) & (demand['Date'] <= end_date)]
-    validate_data(demand, "demand")
-    
+def build_period_model(demand):
     model = gp.Model("Amul_Supply_Chain_Optimization")
     
     # Create variables
@@ -122,11 +129,136 @@ def solve_period(start_date, end_date):
             gp.quicksum(flow[i,u,'Milk'] for (i,j) in ARCS if j == u)
         )
     
+    return model, flow, storage, production, slack
+
+def build_incidence():
+    """
+    Sparse structure of the network, computed once and shared by every period.
+
+    Variables are laid out product-minor: flow column a*|P| + p is product p on arc a,
+    storage column u*|P| + p is product p at unit u, and production column k*|D| + d is
+    dairy product d at the k-th plant.
+    """
+    n_arcs, n_units, n_products = len(ARCS), len(UNITS), len(PRODUCTS)
+    unit_pos = {u: k for k, u in enumerate(UNITS)}
+    product_pos = {p: k for k, p in enumerate(PRODUCTS)}
+    source = np.array([unit_pos[i] for i, _ in ARCS])
+    target = np.array([unit_pos[j] for _, j in ARCS])
+    arc_ids = np.arange(n_arcs)
+    ones = np.ones(n_arcs)
+    identity = sp.identity(n_products, format='csr')
+
+    # Unit x arc incidence, expanded to (unit, product) x (arc, product)
+    into = sp.csr_matrix((ones, (target, arc_ids)), shape=(n_units, n_arcs))
+    out_of = sp.csr_matrix((ones, (source, arc_ids)), shape=(n_units, n_arcs))
+    inflow = sp.kron(into, identity, format='csr')
+    balance = inflow - sp.kron(out_of, identity, format='csr')
+
+    # Plant production enters the balance of the plant's own (unit, product) row
+    plant_units = np.array([unit_pos[u] for u in PLANTS], dtype=int)
+    dairy_products = np.array([product_pos[p] for p in DAIRY_PRODUCTS], dtype=int)
+    production_rows = (plant_units[:, None] * n_products + dairy_products[None, :]).ravel()
+    n_production = len(production_rows)
+    production_in = sp.csr_matrix((np.ones(n_production), (production_rows, np.arange(n_production))),
+                                  shape=(n_units * n_products, n_production))
+
+    # Milk needed per plant: row k sums production[k, d] * milk_required[d]
+    milk_per_unit = np.array([milk_required[p] for p in DAIRY_PRODUCTS], dtype=float)
+    milk_use = sp.kron(sp.identity(len(PLANTS)), sp.csr_matrix(milk_per_unit), format='csr')
+    milk_inflow = inflow[plant_units * n_products + product_pos['Milk']]
+
+    # Total storage of the units with a capacity
+    capacity_units = np.array([unit_pos[u] for u in CAPACITY_UNITS], dtype=int)
+    capacity_select = sp.csr_matrix((np.ones(len(capacity_units)), (np.arange(len(capacity_units)), capacity_units)),
+                                    shape=(len(capacity_units), n_units))
+    storage_total = sp.kron(capacity_select, sp.csr_matrix(np.ones(n_products)), format='csr')
+
+    arc_distance = np.array([distance[a] for a in ARCS])
+    unit_storage_cost = np.array([storage_cost.get(u, 0.0) for u in UNITS])
+    return {
+        'unit_pos': unit_pos,
+        'product_pos': product_pos,
+        'inflow': inflow,
+        'balance': balance,
+        'production_in': production_in,
+        'milk_use': milk_use,
+        'milk_inflow': milk_inflow,
+        'storage_total': storage_total,
+        'capacity': np.array([capacity[u] for u in CAPACITY_UNITS], dtype=float),
+        'flow_cost': np.repeat(arc_distance * transport_cost_per_km_kg, n_products),
+        'storage_cost': np.repeat(unit_storage_cost, n_products),
+        'production_cost': np.tile([processing_cost[p] for p in DAIRY_PRODUCTS], len(PLANTS)).astype(float),
+    }
+
+def check_demand_keys(demand):
+    """Raise ValueError naming any retail units or products in `demand` that the network does not have."""
+    for column, known, kind in (('Retail_Unit_ID', UNITS, 'units'), ('Product', PRODUCTS, 'products')):
+        unknown = sorted(map(str, set(demand[column]) - set(known)))
+        if unknown:
+            raise ValueError(f"Demand for {kind} not in the network: {', '.join(unknown)}")
+
+def build_period_model_matrix(demand, incidence, initial_storage=None):
+    """
+    Same model as `build_period_model`, assembled from `build_incidence` with the matrix API.
+
+    `initial_storage` is the (unit, product) inventory carried over from the previous period,
+    laid out like the storage variables; it enters every unit's flow balance as supply.
+    """
+    n_products = len(PRODUCTS)
+    model = gp.Model("Amul_Supply_Chain_Optimization")
+    
+    # Create variables
+    flow = model.addMVar(len(ARCS) * n_products, name="flow")
+    storage = model.addMVar(len(UNITS) * n_products, name="storage")
+    production = model.addMVar(len(PLANTS) * len(DAIRY_PRODUCTS), name="production")
+    slack = model.addMVar(len(demand), name="slack")
+    
+    # Objective function
+    model.setObjective(incidence['flow_cost'] @ flow + incidence['storage_cost'] @ storage +
+                       incidence['production_cost'] @ production + 1000000 * slack.sum(), GRB.MINIMIZE)
+    
+    # Constraints
+    # Flow conservation
+    opening = np.zeros(len(UNITS) * n_products) if initial_storage is None else initial_storage
+    model.addConstr(incidence['balance'] @ flow + incidence['production_in'] @ production - storage == -opening)
+    
+    # Capacity constraints (only for units with defined capacity)
+    model.addConstr(incidence['storage_total'] @ storage <= incidence['capacity'])
+    
+    # Demand satisfaction
+    check_demand_keys(demand)
+    demand_rows = (demand['Retail_Unit_ID'].map(incidence['unit_pos']).to_numpy(dtype=int) * n_products +
+                   demand['Product'].map(incidence['product_pos']).to_numpy(dtype=int))
+    model.addConstr(incidence['inflow'][demand_rows] @ flow + slack >= demand['Demand'].to_numpy())
+    
+    # Milk conversion in plants
+    model.addConstr(incidence['milk_use'] @ production - incidence['milk_inflow'] @ flow <= 0)
+    
+    return model, flow, storage, production, slack
+
+def load_demand(start_date, end_date, path=DEMAND_PATH):
+    demand = pd.read_csv(path, parse_dates=['Date'])
+    return demand[(demand['Date'] >= start_date) & (demand['Date'] <= end_date)]
+
+def solve_period(start_date, end_date, builder='quicksum', incidence=None):
+    log_message(f"Solving for period: {start_date} to {end_date}")
+    
+    demand = load_demand(start_date, end_date)
+    validate_data(demand, "demand")
+    
+    if builder == 'matrix':
+        incidence = incidence if incidence is not None else build_incidence()
+        model, flow, storage, production, slack = build_period_model_matrix(demand, incidence)
+    else:
+        model, flow, storage, production, slack = build_period_model(demand)
+    
     # Solve the model
     model.optimize()
     
     # Return results
     if model.status == GRB.OPTIMAL:
+        if builder == 'matrix':
+            return model.objVal, *matrix_results(demand, flow, storage, production, slack)
         flow_data = [(i, j, p, flow[i,j,p].x) for (i,j) in ARCS for p in PRODUCTS if flow[i,j,p].x > 0]
         storage_data = [(u, p, storage[u,p].x) for u in UNITS for p in PRODUCTS if storage[u,p].x > 0]
         production_data = [(u, p, production[u,p].x) for u in PLANTS for p in DAIRY_PRODUCTS if production[u,p].x > 0]
@@ -137,41 +269,124 @@ def solve_period(start_date, end_date):
         log_message(f"Optimization failed with status: {model.status}")
         return None, None, None, None, None
 
-# Solve the problem using a rolling horizon approach
-start_date = datetime(2025, 1, 1)
-end_date = datetime(2025, 12, 31)
-period_length = timedelta(days=2)  # Solve for one week at a time
+def matrix_results(demand, flow, storage, production, slack):
+    n_products, n_dairy = len(PRODUCTS), len(DAIRY_PRODUCTS)
+    flow_x, storage_x, production_x, slack_x = flow.X, storage.X, production.X, slack.X
+    flow_data = [(*ARCS[k // n_products], PRODUCTS[k % n_products], flow_x[k]) for k in np.flatnonzero(flow_x > 0)]
+    storage_data = [(UNITS[k // n_products], PRODUCTS[k % n_products], storage_x[k]) for k in np.flatnonzero(storage_x > 0)]
+    production_data = [(PLANTS[k // n_dairy], DAIRY_PRODUCTS[k % n_dairy], production_x[k])
+                       for k in np.flatnonzero(production_x > 0)]
+    unmet = np.flatnonzero(slack_x > 0)
+    unmet_demand_data = list(zip(demand['Date'].to_numpy()[unmet], demand['Retail_Unit_ID'].to_numpy()[unmet],
+                                 demand['Product'].to_numpy()[unmet], slack_x[unmet]))
+    return flow_data, storage_data, production_data, unmet_demand_data
+
+def partition_demand(start_date, end_date, period_length, path=DEMAND_PATH):
+    """
+    Read demand once and split it into consecutive windows of `period_length` plus one day,
+    the same windows the serial loop used to walk. Returns (start, end, demand) tuples.
+    """
+    demand = load_demand(start_date, end_date, path)
+    check_demand_keys(demand)
+    window_days = period_length.days + 1
+    window = (demand['Date'] - start_date).dt.days // window_days
+    windows = []
+    for k, window_demand in demand.groupby(window, sort=True):
+        window_start = start_date + timedelta(days=int(k) * window_days)
+        windows.append((window_start, min(window_start + period_length, end_date), window_demand))
+    return windows
 
-all_flow_data = []
-all_storage_data = []
-all_production_data = []
-all_unmet_demand_data = []
-total_cost = 0
+def write_window_results(window_start, results, output_dir=OUTPUT_DIR, fmt='parquet'):
+    """Write one window's result tables to <output_dir>/<table>/<window start>.<fmt>."""
+    for (table, columns), rows in zip(RESULT_COLUMNS.items(), results):
+        if table != 'unmet_demand':
+            rows = [(window_start, *row) for row in rows]
+        frame = pd.DataFrame(rows, columns=columns)
+        os.makedirs(os.path.join(output_dir, table), exist_ok=True)
+        path = os.path.join(output_dir, table, f"{window_start:%Y-%m-%d}.{fmt}")
+        if fmt == 'parquet':
+            frame.to_parquet(path, index=False)
+        else:
+            frame.to_csv(path, index=False)
 
-while start_date <= end_date:
-    period_end = min(start_date + period_length, end_date)
+def solve_window(window_start, window_end, demand, incidence, threads=0, initial_storage=None,
+                 output_dir=OUTPUT_DIR, fmt='parquet', log_to_console=True):
+    """Solve one window, write its results to disk and return (cost, closing storage)."""
+    log_message(f"Solving for period: {window_start} to {window_end}")
+    model, flow, storage, production, slack = build_period_model_matrix(demand, incidence, initial_storage)
+    model.Params.Threads = threads
+    model.Params.LogToConsole = int(log_to_console)
+    model.optimize()
     
-    cost, flow, storage, production, unmet_demand = solve_period(start_date, period_end)
+    if model.status != GRB.OPTIMAL:
+        log_message(f"Optimization failed with status: {model.status}")
+        return None, None
     
-    if cost is not None:
-        total_cost += cost
-        all_flow_data.extend([(start_date, *item) for item in flow])
-        all_storage_data.extend([(start_date, *item) for item in storage])
-        all_production_data.extend([(start_date, *item) for item in production])
-        all_unmet_demand_data.extend(unmet_demand)
-    else:
-        log_message(f"Failed to find optimal solution for period: {start_date} to {period_end}")
+    write_window_results(window_start, matrix_results(demand, flow, storage, production, slack), output_dir, fmt)
+    cost, closing_storage = model.objVal, storage.X
+    model.dispose()
+    return cost, closing_storage
+
+_worker = {}
+
+def _init_worker(threads, output_dir, fmt):
+    # Each pool process builds the network structure once and reuses it for all its windows
+    _worker.update(incidence=build_incidence(), threads=threads, output_dir=output_dir, fmt=fmt)
+
+def _solve_window_task(window_start, window_end, demand):
+    cost, _ = solve_window(window_start, window_end, demand, _worker['incidence'], _worker['threads'],
+                           output_dir=_worker['output_dir'], fmt=_worker['fmt'], log_to_console=False)
+    return cost
+
+def run_rolling_horizon(start_date, end_date, period_length=timedelta(days=2), workers=None, threads_per_worker=1,
+                        chain_inventory=False, output_dir=OUTPUT_DIR, fmt='parquet', demand_path=DEMAND_PATH):
+    """
+    Solve the horizon window by window and return the total cost.
+
+    Independent windows are spread over a pool of `workers` processes (default: as many as fit
+    the machine at `threads_per_worker` Gurobi threads each). With `chain_inventory` each
+    window opens with the previous window's closing storage, so windows are solved in order
+    in this process. Results are written per window as they finish rather than kept in memory.
+    """
+    windows = partition_demand(start_date, end_date, period_length, demand_path)
+    log_message(f"Partitioned demand into {len(windows)} windows")
+    total_cost = 0
+    
+    if chain_inventory or workers == 1:
+        incidence = build_incidence()
+        closing_storage = None
+        for window_start, window_end, demand in windows:
+            cost, storage = solve_window(window_start, window_end, demand, incidence, threads_per_worker,
+                                         closing_storage if chain_inventory else None, output_dir, fmt)
+            if cost is None:
+                log_message(f"Failed to find optimal solution for period: {window_start} to {window_end}")
+                continue
+            total_cost += cost
+            closing_storage = storage
+        return total_cost
     
-    start_date = period_end + timedelta(days=1)
+    workers = workers or max(1, (os.cpu_count() or 1) // max(threads_per_worker, 1))
+    log_message(f"Solving on {workers} processes with {threads_per_worker} solver threads each")
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                             initargs=(threads_per_worker, output_dir, fmt)) as pool:
+        futures = {pool.submit(_solve_window_task, *window): window[:2] for window in windows}
+        for future in as_completed(futures):
+            window_start, window_end = futures[future]
+            cost = future.result()
+            if cost is None:
+                log_message(f"Failed to find optimal solution for period: {window_start} to {window_end}")
+            else:
+                total_cost += cost
+                log_message(f"Solved period: {window_start} to {window_end}")
+    return total_cost
 
-# Save results
-log_message("Saving results")
-os.makedirs('data/output', exist_ok=True)
+if __name__ == "__main__":
+    # Solve the problem using a rolling horizon approach
+    start_date = datetime(2025, 1, 1)
+    end_date = datetime(2025, 12, 31)
+    period_length = timedelta(days=2)  # Each window covers period_length plus one day
 
-pd.DataFrame(all_flow_data, columns=['Date', 'SourceID', 'TargetID', 'Product', 'Amount']).to_csv('data/output/flow.csv', index=False)
-pd.DataFrame(all_storage_data, columns=['Date', 'UnitID', 'Product', 'Amount']).to_csv('data/output/storage.csv', index=False)
-pd.DataFrame(all_production_data, columns=['Date', 'PlantID', 'Product', 'Amount']).to_csv('data/output/production.csv', index=False)
-pd.DataFrame(all_unmet_demand_data, columns=['Date', 'RetailUnitID', 'Product', 'UnmetDemand']).to_csv('data/output/unmet_demand.csv', index=False)
+    total_cost = run_rolling_horizon(start_date, end_date, period_length)
 
-log_message(f"Optimization complete. Total cost: {total_cost}")
-log_message("Script execution completed")
\ No newline at end of file
+    log_message(f"Optimization complete. Total cost: {total_cost}")
+    log_message("Script execution completed")
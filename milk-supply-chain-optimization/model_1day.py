@@ -1,8 +1,8 @@
 import numpy as np
 import highspy as hs
-h= hs.Highs()
 inf = hs.kHighsInf
 import pandas as pd
+import scipy.sparse as sp
 import json
 import os
 from datetime import datetime, timedelta
@@ -69,137 +69,215 @@ DAIRY_PRODUCTS = [product for product in PRODUCTS ]
 Intermediate_Units = units[(units["UnitType"] != "VillageCooperative") & (units["UnitType"] != "Retail")]['UnitID'].tolist()
 STORAGE_UNITS = list(storage_cost.keys())
 CAPACITY_UNITS = list(capacity.keys())
-def solve_period(start_date, end_date):
-    log_message(f"Solving for period: {start_date} to {end_date}")
-    
+Big_M =1000000
+weekly_products = ["Ice Cream", "Cheese","Butter"]
+
+def load_period_demand(start_date, end_date):
     demand = pd.read_csv('data/demand_01.csv', parse_dates=['Date'])
-    demand = demand[(demand['Date'] >= start_date) & (demand['Date'] <= end_date)]
+    demand = demand[(demand['Date'] >= start_date) & (demand['Date'] <= end_date)].copy()
     
     demand.loc[demand['Product'] == 'Ghee', 'Demand'] = demand.loc[demand['Product'] == 'Ghee', 'Demand'] / 30
-    weekly_products = ["Ice Cream", "Cheese","Butter"]
     for wp in weekly_products:
        demand.loc[demand['Product'] == wp, 'Demand'] = demand.loc[demand['Product'] == wp, 'Demand'] / 7
-      
-   
-    validate_data(demand, "demand")
-    t= demand.index
-    flow = {}
-    storage={}
-    production={}
-    slack={}
-    Big_M =1000000
-    i =-1
-     
-    for arc in ARCS:
-       for product in PRODUCTS:
-        var_name = f"flow_{arc[0]}_{arc[1]}_{product}"
-        flow[var_name] = h.addVariable(0, hs.kHighsInf, name=var_name)
-        i+=1
-    flow_end= i   
-     
-    for unit in STORAGE_UNITS:
-       for product in PRODUCTS:
-        var_name = f"storage_{unit}_{product}"
-        storage[var_name] = h.addVariable(0, hs.kHighsInf, name=var_name)
-        i+=1
-    storage_end= i
-     
-    for plant in PLANTS:
-       for dp in DAIRY_PRODUCTS:
-        var_name = f"production_{plant}_{dp}"
-        production[var_name] = h.addVariable(0, hs.kHighsInf, name=var_name)
-        i+=1
-    production_end =i
-     
-    for index in demand.index: 
-        var_name = f"slack_{index}"
-        slack[var_name] = h.addVariable(0, hs.kHighsInf, name=var_name)
-        i+=1
-       
-     
-    objtransport = sum(flow[f"flow_{i}_{j}_{p}"] * distance[i,j] * transport_cost_per_km_kg
-                    for (i,j) in ARCS for p in PRODUCTS)
-    print(f"{time.strftime('%Y-%m-%d %H:%M:%S')}"+" - objtransport")
-    
-    objstorage= sum( storage[f"storage_{u}_{p}"] * storage_cost[u]  for u in STORAGE_UNITS for p in PRODUCTS)
-    objproduction = sum( production[f"production_{p}_{dp}"] *  processing_cost [dp]   for  p in PLANTS for dp in DAIRY_PRODUCTS)
-     
-    objslack = sum(Big_M * slack[f"slack_{index}"]   for index  in demand.index)
-    print(f"{time.strftime('%Y-%m-%d %H:%M:%S')}"+" - object slack")
-     
-    for u in CAPACITY_UNITS: 
-        h.addConstr(sum(  storage[f"storage_{u}_{p}"] for p in PRODUCTS) <= capacity[u])
-    print(f"{time.strftime('%Y-%m-%d %H:%M:%S')}"+" - capacity cnstr defined")
-     
-    for pl in PLANTS:
-         
-        h.addConstr(
-            sum(production[f"production_{pl}_{dp}"] * milk_required[dp] for dp in PRODUCTS) <=
-            sum(flow[f"flow_{i}_{j}_{'Milk'}"] for (i,j) in ARCS if j == pl)
-        )
-    print(f"{time.strftime('%Y-%m-%d %H:%M:%S')}"+" - milk cnvrsn cnstr defined")
-    
-    for idx, row in demand.iterrows():
-        u, p = row['Retail_Unit_ID'], row['Product']
-        h.addConstr(
-           sum( flow[f"flow_{i}_{u}_{p}"] for (i,j) in ARCS if j == u) +   
-            slack[f"slack_{idx}"] >= row['Demand']*1000    #  its metric ton to kgs cnvrsn
-        )
-    print(f"{time.strftime('%Y-%m-%d %H:%M:%S')}"+" - demand cnstr defined")
-    
-    for u in Intermediate_Units:
-        for p in PRODUCTS:
-         
-            outflow = sum(flow[f"flow_{i}_{j}_{p}"] for (i,j) in ARCS if i == u)
-            if u in PLANTS and p != 'Milk':
-              
-                h.addConstr(  production[f"production_{u}_{p}"] == outflow )
-           
-            elif u  not in   PLANTS  :
-               inflow = sum( flow[f"flow_{i}_{j}_{p}"] for (i,j) in ARCS if j == u)
-               h.addConstr(inflow == outflow + storage[f"storage_{u}_{p}"])  
-               
-    print(f"{time.strftime('%Y-%m-%d %H:%M:%S')}"+"- conservation cnstr defined")
-     
-    h.minimize(objtransport +objproduction+objstorage+ objslack)
-    print(f"{time.strftime('%Y-%m-%d %H:%M:%S')}"+"obj defined")
-    
-    print(f"{time.strftime('%Y-%m-%d %H:%M:%S')}"+ "- crossed check point")
+    return demand
+
+def build_static_lp():
+    """
+    Demand-independent part of the daily LP as plain arrays, built once and shared by every period.
+
+    Columns are laid out in blocks [flow | storage | production] with the product as the minor
+    index, e.g. flow column a*|P| + p is product p on arc ARCS[a]. Rows are capacity, milk
+    conversion and flow conservation, in that order.
+    """
+    n_products = len(PRODUCTS)
+    unit_pos = {u: k for k, u in enumerate(UNITS)}
+    product_pos = {p: k for k, p in enumerate(PRODUCTS)}
+    storage_pos = {u: k for k, u in enumerate(STORAGE_UNITS)}
+    plant_pos = {u: k for k, u in enumerate(PLANTS)}
+    arc_source = np.array([unit_pos[i] for i, _ in ARCS])
+    arc_target = np.array([unit_pos[j] for _, j in ARCS])
+    n_arcs, n_units = len(ARCS), len(UNITS)
+    identity = sp.identity(n_products, format='csr')
+
+    def selector(rows, cols, shape):
+        return sp.csr_matrix((np.ones(len(rows)), (rows, cols)), shape=shape)
+
+    # (unit, product) x (arc, product) inflow/outflow and the unit -> storage/production column maps
+    arc_ids = np.arange(n_arcs)
+    inflow = sp.kron(selector(arc_target, arc_ids, (n_units, n_arcs)), identity, format='csr')
+    outflow = sp.kron(selector(arc_source, arc_ids, (n_units, n_arcs)), identity, format='csr')
+    storage_units = np.array([unit_pos[u] for u in STORAGE_UNITS], dtype=int)
+    storage_of = sp.kron(selector(storage_units, np.arange(len(storage_units)), (n_units, len(storage_units))),
+                         identity, format='csr')
+    plant_units = np.array([unit_pos[u] for u in PLANTS], dtype=int)
+    production_of = sp.kron(selector(plant_units, np.arange(len(plant_units)), (n_units, len(plant_units))),
+                            identity, format='csr')
+
+    def unit_rows(unit_list, products):
+        return np.array([unit_pos[u] * n_products + product_pos[p] for u in unit_list for p in products], dtype=int)
+
+    # Capacity: total storage of each unit with a capacity
+    capacity_units = np.array([storage_pos[u] for u in CAPACITY_UNITS], dtype=int)
+    capacity_rows = sp.kron(selector(np.arange(len(capacity_units)), capacity_units,
+                                     (len(capacity_units), len(STORAGE_UNITS))),
+                            sp.csr_matrix(np.ones((1, n_products))), format='csr')
+    capacity_block = sp.hstack([sp.csr_matrix((len(capacity_units), n_arcs * n_products)), capacity_rows,
+                                sp.csr_matrix((len(capacity_units), len(PLANTS) * n_products))])
+
+    # Milk conversion: milk used by a plant's production <= milk flowing into it
+    milk_use = sp.kron(sp.identity(len(PLANTS)), sp.csr_matrix([[milk_required[p] for p in PRODUCTS]]), format='csr')
+    milk_block = sp.hstack([-inflow[unit_rows(PLANTS, ['Milk'])],
+                            sp.csr_matrix((len(PLANTS), len(STORAGE_UNITS) * n_products)), milk_use])
+
+    # Conservation: plants ship what they produce, other intermediate units store the difference
+    plant_rows = unit_rows([u for u in Intermediate_Units if u in plant_pos], [p for p in PRODUCTS if p != 'Milk'])
+    other_rows = unit_rows([u for u in Intermediate_Units if u not in plant_pos], PRODUCTS)
+    plant_block = sp.hstack([-outflow[plant_rows], sp.csr_matrix((len(plant_rows), len(STORAGE_UNITS) * n_products)),
+                             production_of[plant_rows]])
+    other_block = sp.hstack([(inflow - outflow)[other_rows], -storage_of[other_rows], production_of[other_rows]])
+
+    A = sp.vstack([capacity_block, milk_block, plant_block, other_block], format='csr')
+    n_equality = len(plant_rows) + len(other_rows)
+    row_lower = np.concatenate([np.full(len(capacity_units) + len(PLANTS), -inf), np.zeros(n_equality)])
+    row_upper = np.concatenate([[capacity[u] for u in CAPACITY_UNITS], np.zeros(len(PLANTS) + n_equality)])
+
+    col_cost = np.concatenate([
+        np.repeat([distance[a] * transport_cost_per_km_kg for a in ARCS], n_products),
+        np.repeat([storage_cost[u] for u in STORAGE_UNITS], n_products),
+        np.tile([processing_cost[p] for p in PRODUCTS], len(PLANTS)),
+    ])
+
+    return {
+        'A': A, 'row_lower': row_lower, 'row_upper': row_upper, 'col_cost': col_cost,
+        'inflow': inflow, 'unit_pos': unit_pos, 'product_pos': product_pos,
+        'n_flow': n_arcs * n_products, 'n_storage': len(STORAGE_UNITS) * n_products,
+        'n_production': len(PLANTS) * n_products,
+    }
+
+def assemble_period_lp(static, demand):
+    """Add one slack column and one demand row per demand line to the static LP. Solver-agnostic."""
+    n_products = len(PRODUCTS)
+    n_static_cols = static['n_flow'] + static['n_storage'] + static['n_production']
+    n_demand = len(demand)
+
+    demand_rows = (demand['Retail_Unit_ID'].map(static['unit_pos']).to_numpy() * n_products +
+                   demand['Product'].map(static['product_pos']).to_numpy())
+    demand_block = sp.hstack([static['inflow'][demand_rows],
+                              sp.csr_matrix((n_demand, n_static_cols - static['n_flow'])),
+                              sp.identity(n_demand, format='csr')])
+    A = sp.vstack([sp.hstack([static['A'], sp.csr_matrix((static['A'].shape[0], n_demand))]), demand_block],
+                  format='csc')
+
+    return {
+        'A': A,
+        'col_cost': np.concatenate([static['col_cost'], np.full(n_demand, Big_M, dtype=float)]),
+        'col_lower': np.zeros(A.shape[1]),
+        'col_upper': np.full(A.shape[1], inf),
+        'row_lower': np.concatenate([static['row_lower'], demand['Demand'].to_numpy() * 1000]),  #  its metric ton to kgs cnvrsn
+        'row_upper': np.concatenate([static['row_upper'], np.full(n_demand, inf)]),
+    }
+
+def solve_lp_highs(lp):
+    """Solve an assembled LP in a fresh HiGHS instance, which is released when this returns."""
+    model = hs.HighsLp()
+    model.num_col_, model.num_row_ = lp['A'].shape[1], lp['A'].shape[0]
+    model.sense_ = hs.ObjSense.kMinimize
+    model.col_cost_ = lp['col_cost']
+    model.col_lower_ = lp['col_lower']
+    model.col_upper_ = lp['col_upper']
+    model.row_lower_ = lp['row_lower']
+    model.row_upper_ = lp['row_upper']
+    model.a_matrix_.format_ = hs.MatrixFormat.kColwise
+    model.a_matrix_.start_ = lp['A'].indptr
+    model.a_matrix_.index_ = lp['A'].indices
+    model.a_matrix_.value_ = lp['A'].data
+    model.a_matrix_.num_col_, model.a_matrix_.num_row_ = model.num_col_, model.num_row_
+
+    h = hs.Highs()
+    h.passModel(model)
     h.run()
-    solution = h.getSolution()
-    print("Optimal solution:", solution) 
-    decision_vars = solution.col_value
-     
-    print(f"{time.strftime('%Y-%m-%d %H:%M:%S')}"+"collection of solution as df started") 
-     
-    all_values= h.allVariableValues()
-    all_names= h.allVariableNames()
+    status = h.getModelStatus()
+    values = np.array(h.getSolution().col_value)
+    objective = h.getInfo().objective_function_value
+    return status, objective, values
+
+def period_results(static, demand, values):
+    """Split a solution vector into flow/storage/production/slack tables using index arithmetic."""
+    n_products = len(PRODUCTS)
+    products = np.array(PRODUCTS, dtype=object)
+    arc_ids = np.array(ARCS)
+    flow_end = static['n_flow']
+    storage_end = flow_end + static['n_storage']
+    production_end = storage_end + static['n_production']
+
+    flow_x, storage_x = values[:flow_end], values[flow_end:storage_end]
+    production_x, slack_x = values[storage_end:production_end], values[production_end:]
+
+    k = np.flatnonzero(flow_x)
+    flow_df = pd.DataFrame({'SourceID': arc_ids[k // n_products, 0], 'TargetID': arc_ids[k // n_products, 1],
+                            'Product': products[k % n_products], 'Value': flow_x[k]})
+    k = np.flatnonzero(storage_x)
+    storage_df = pd.DataFrame({'UnitID': np.array(STORAGE_UNITS)[k // n_products],
+                               'Product': products[k % n_products], 'Value': storage_x[k]})
+    k = np.flatnonzero(production_x)
+    production_df = pd.DataFrame({'PlantID': np.array(PLANTS)[k // n_products],
+                                  'Product': products[k % n_products], 'Value': production_x[k]})
+    k = np.flatnonzero(slack_x)
+    slack_df = demand.iloc[k][['Date', 'Retail_Unit_ID', 'Product']].assign(Value=slack_x[k])
+    return flow_df, storage_df, production_df, slack_df
+
+def solve_period(start_date, end_date, static=None):
+    log_message(f"Solving for period: {start_date} to {end_date}")
     
-    soln_dfs= pd.DataFrame({   "Variable" : all_names,
-                                "Value"   : all_values  })
- 
-    flow_df= soln_dfs.loc[:flow_end]
-    storage_df=soln_dfs.loc[flow_end+1 :storage_end]
-    production_df= soln_dfs.loc[storage_end+1 : production_end]
-    slack_df= soln_dfs.loc[production_end+1:]
+    demand = load_period_demand(start_date, end_date)
+    validate_data(demand, "demand")
     
-    flow_df= flow_df[flow_df["Value"] !=0]
-    storage_df= storage_df[storage_df["Value"]!=0]
-    production_df= production_df[production_df["Value"] != 0]
-    slack_df= slack_df[slack_df["Value"] != 0]
-
-     
+    static = static if static is not None else build_static_lp()
+    lp = assemble_period_lp(static, demand)
+    log_message(f"LP assembled: {lp['A'].shape[1]} columns, {lp['A'].shape[0]} rows, {lp['A'].nnz} nonzeros")
+    
+    status, objective, values = solve_lp_highs(lp)
+    log_message(f"HiGHS finished with status {status}, objective {objective}")
+    if status != hs.HighsModelStatus.kOptimal:
+        return None, None
+    return objective, period_results(static, demand, values)
 
-    excel_path = r"C:\\Users\\hp\\Downloads\\OR work\\AmulSCopt_Highys\\Solution_files\\Amul_1day_modelSoln3.xlsx"
-    with pd.ExcelWriter(excel_path) as writer:
-        flow_df.to_excel(writer, sheet_name="flow soln", index=False)
-        storage_df.to_excel(writer, sheet_name="storage soln", index=False)
-        production_df.to_excel(writer, sheet_name="production soln", index=False)
-        slack_df.to_excel(writer, sheet_name="slack soln", index=False)
+def solve_days(start_date, end_date, output_dir='data/output/1day'):
+    """
+    Solve each day separately, appending its results to CSV so memory does not grow with the horizon.
+    The CSV files of a previous run in `output_dir` are replaced.
+    """
+    os.makedirs(output_dir, exist_ok=True)
+    static = build_static_lp()
+    names = ['flow', 'storage', 'production', 'slack']
+    for name in names:
+        path = os.path.join(output_dir, f'{name}.csv')
+        if os.path.exists(path):
+            os.remove(path)
+    day = start_date
+    while day <= end_date:
+        objective, results = solve_period(day, day, static)
+        if results is not None:
+            for name, df in zip(names, results):
+                path = os.path.join(output_dir, f'{name}.csv')
+                df.insert(0, 'Day', day)
+                df.to_csv(path, mode='a', header=not os.path.exists(path), index=False)
+        else:
+            log_message(f"Failed to find optimal solution for {day}")
+        day += timedelta(days=1)
 
+if __name__ == "__main__":
+    start_date = datetime(2025, 1, 1)    
+    end_date = datetime(2025, 1, 1)
+    objective, results = solve_period(start_date, end_date)
+    
+    if results is not None:
+        flow_df, storage_df, production_df, slack_df = results
+        excel_path = r"C:\\Users\\hp\\Downloads\\OR work\\AmulSCopt_Highys\\Solution_files\\Amul_1day_modelSoln3.xlsx"
+        with pd.ExcelWriter(excel_path) as writer:
+            flow_df.to_excel(writer, sheet_name="flow soln", index=False)
+            storage_df.to_excel(writer, sheet_name="storage soln", index=False)
+            production_df.to_excel(writer, sheet_name="production soln", index=False)
+            slack_df.to_excel(writer, sheet_name="slack soln", index=False)
     
     print(f"{time.strftime('%Y-%m-%d %H:%M:%S')}"+"Completed all tasks")
-    print()   
-start_date = datetime(2025, 1, 1)    
-end_date = datetime(2025, 1, 1)
-solve_period(start_date, end_date)   
@@ -4,6 +4,9 @@ import random
 import math
 from ortools.sat.python import cp_model
 import pandas as pd
+from concurrent.futures import ThreadPoolExecutor
+from routing import solve_routing, distance_matrix
+from cluster_routing import plan_clustered
 
 
 # Define trucks
@@ -115,27 +118,25 @@ def create_cp_model(orders, trucks):
         model.AddCircuit(circuit_arcs)
 
     # Objective: Minimize total Haversine distance traveled by all trucks
+    dist = distance_matrix([order["destination"]["latitude"] for order in orders],
+                           [order["destination"]["longitude"] for order in orders])
     total_distance = []
     for j in range(num_trucks):
         for i in range(num_orders):
             for k in range(num_orders):
                 if i != k:
-                    dist = haversine(
-                        orders[i]["destination"]["latitude"], orders[i]["destination"]["longitude"],
-                        orders[k]["destination"]["latitude"], orders[k]["destination"]["longitude"]
-                    )
-                    total_distance.append(Z[j, i, k] * dist)
+                    total_distance.append(Z[j, i, k] * dist[i, k])
     model.Minimize(sum(total_distance))
 
     return model, X, Y, Z, S
 
 
 
-def solve_model(model, X, Y, Z, S, num_orders, num_trucks, num_solutions=1):
+def solve_model(model, X, Y, Z, S, num_orders, num_trucks, num_solutions=1, max_time_in_seconds=20):
     solver = cp_model.CpSolver()
     solutions = []
 
-    solver.parameters.max_time_in_seconds = 20
+    solver.parameters.max_time_in_seconds = max_time_in_seconds
 
     class VarArraySolutionPrinter(cp_model.CpSolverSolutionCallback):
         def __init__(self, X, Y, Z, S, num_orders, num_trucks, solutions, num_solutions):
@@ -165,14 +166,12 @@ def solve_model(model, X, Y, Z, S, num_orders, num_trucks, num_solutions=1):
                         if truck_load:
                             current_order = truck_load[0]  # Start with the first order in the list
                             truck_path.append(current_order)
-                            visited = {current_order}
-                            while len(visited) < len(truck_load):
-                                for k in truck_load:
-                                    if k not in visited and self.Value(self._Z[j, current_order, k]) == 1:
-                                        visited.add(k)
-                                        truck_path.append(k)
-                                        current_order = k
-                                        break
+                            # Each truck's circuit runs through every order, so follow it and keep the truck's own
+                            while len(truck_path) < len(truck_load):
+                                current_order = next(k for k in range(self._num_orders) if k != current_order and
+                                                     self.Value(self._Z[j, current_order, k]) == 1)
+                                if current_order in truck_load:
+                                    truck_path.append(current_order)
 
                         # Stacking information
                         stacking_info = []
@@ -194,7 +193,7 @@ def solve_model(model, X, Y, Z, S, num_orders, num_trucks, num_solutions=1):
 
 
     solution_printer = VarArraySolutionPrinter(X, Y, Z, S, num_orders, num_trucks, solutions, num_solutions)
-    solver.SolveWithSolutionCallback(model, solution_printer)
+    solver.Solve(model, solution_printer)
 
     return solutions
 
@@ -203,8 +202,13 @@ def solve_model(model, X, Y, Z, S, num_orders, num_trucks, num_solutions=1):
 st.title("Logistics Optimization for HarmonyHub")
 
 st.sidebar.header("Simulation Parameters")
-num_orders = st.sidebar.slider("Number of Orders", 10, 100, 50)
-num_solutions = st.sidebar.slider("Number of Solutions", 1, 10, 1)
+num_orders = st.sidebar.slider("Number of Orders", 10, 500, 50)
+solver_backend = st.sidebar.selectbox("Solver", ["Routing (OR-Tools)", "Cluster-first (by city)",
+                                                 "CP-SAT (up to ~15 orders)"])
+if solver_backend.startswith("Routing"):
+    time_limit = st.sidebar.slider("Time Limit (s)", 1, 60, 5)
+elif solver_backend.startswith("CP-SAT"):
+    num_solutions = st.sidebar.slider("Number of Solutions", 1, 10, 1)
 
 # Load instrument and warehouse data (simulated here)
 instruments = [
@@ -276,14 +280,40 @@ def display_solutions(solutions, orders, trucks):
                 st.write(f"Total Orders: {total_orders}")
                 st.write(f"Average Distance per Order: {total_distance/total_orders:.2f} km")
 
+@st.cache_resource
+def planning_executor():
+    # Shared by all sessions; the routing backends run here so the page stays usable while they plan
+    return ThreadPoolExecutor(max_workers=2)
+
 # In the "Run Optimization" button callback
 if st.button("Run Optimization"):
     if 'orders' in st.session_state:
         orders = st.session_state['orders']
         num_trucks = len(trucks)
-        model, X, Y, Z, S = create_cp_model(orders, trucks)
-        solutions = solve_model(model, X, Y, Z, S, num_orders, num_trucks, num_solutions)
-        st.session_state['solutions'] = solutions
-        display_solutions(solutions, orders, trucks)
+        if solver_backend.startswith("CP-SAT"):
+            model, X, Y, Z, S = create_cp_model(orders, trucks)
+            solutions = solve_model(model, X, Y, Z, S, len(orders), num_trucks, num_solutions)
+            st.session_state['solutions'] = solutions
+            display_solutions(solutions, orders, trucks)
+        elif solver_backend.startswith("Routing"):
+            st.session_state['planning'] = (orders, planning_executor().submit(
+                solve_routing, orders, trucks, warehouses, time_limit_seconds=time_limit))
+        else:
+            st.session_state['planning'] = (orders, planning_executor().submit(plan_clustered, orders, trucks, warehouses))
     else:
         st.error("Please simulate data first by clicking 'Simulate Data'.")
+
+# Plans running in the background
+if 'planning' in st.session_state:
+    planned_orders, planning = st.session_state['planning']
+    if planning.done():
+        del st.session_state['planning']
+        solution, unserved = planning.result()
+        solutions = [solution] if solution else []
+        st.session_state['solutions'] = solutions
+        if unserved:
+            st.warning(f"No truck could take orders {unserved}.")
+        display_solutions(solutions, planned_orders, trucks)
+    else:
+        st.info("Planning in the background. You can keep using the app; refresh to see the result.")
+        st.button("Refresh")
@@ -0,0 +1,61 @@
+import sys
+import time
+import random
+import pandas as pd
+from app import create_cp_model, solve_model, simulate_orders, trucks, instruments, warehouses, parameters
+from routing import solve_routing, route_distance, truck_depots
+from cluster_routing import plan_clustered
+from packing import packing_cache
+
+# Distance and wall time of the monolithic CP-SAT model, the routing backend and the
+# cluster-first, route-second decomposition on simulated orders. Distances include each
+# truck's legs from and back to its warehouse. The CP-SAT model is only run up to
+# MAX_CP_ORDERS orders. The routing backend's loads are checked again against the 3D
+# packing that the clustered planner's loads come from, and those without a placement
+# are counted as unplaceable.
+# Usage (from music-shipping-optimization): python benchmark_shipping.py [time_limit] [workers]
+
+ORDER_COUNTS = [8, 12, 15, 50, 100, 300, 500]
+MAX_CP_ORDERS = 15
+
+
+def unplaceable_loads(solution, orders):
+    """Number of trucks in a solution whose orders have no 3D placement in them."""
+    cache = packing_cache()
+    return sum(not cache.fits(trucks[int(truck_id.split('_')[1]) - 1], [orders[i] for i in data["orders"]])
+               for truck_id, data in solution.items())
+
+
+def benchmark_shipping(num_orders, time_limit_seconds, workers, seed=0):
+    random.seed(seed)
+    orders = simulate_orders(num_orders, instruments, warehouses, parameters)
+    depots = truck_depots(trucks, warehouses)
+    row = {'orders': num_orders}
+
+    if num_orders <= MAX_CP_ORDERS:
+        started = time.perf_counter()
+        model, X, Y, Z, S = create_cp_model(orders, trucks)
+        solutions = solve_model(model, X, Y, Z, S, num_orders, len(trucks), 1, time_limit_seconds)
+        row['cp-sat (s)'] = time.perf_counter() - started
+        row['cp-sat (km)'] = route_distance(solutions[-1], orders, warehouses, depots) if solutions else None
+
+    started = time.perf_counter()
+    solution, unserved = solve_routing(orders, trucks, warehouses, time_limit_seconds=time_limit_seconds)
+    row['routing (s)'] = time.perf_counter() - started
+    row['routing (km)'] = route_distance(solution, orders, warehouses, depots) if solution else None
+    row['routing unserved'] = len(unserved)
+    row['routing unplaceable'] = unplaceable_loads(solution, orders) if solution else None
+
+    started = time.perf_counter()
+    solution, unserved = plan_clustered(orders, trucks, warehouses, workers=workers)
+    row['clustered (s)'] = time.perf_counter() - started
+    row['clustered (km)'] = route_distance(solution, orders, warehouses, depots)
+    row['clustered unserved'] = len(unserved)
+    return row
+
+
+if __name__ == "__main__":
+    time_limit_seconds = float(sys.argv[1]) if len(sys.argv) > 1 else 20
+    workers = int(sys.argv[2]) if len(sys.argv) > 2 else None
+    rows = [benchmark_shipping(num_orders, time_limit_seconds, workers) for num_orders in ORDER_COUNTS]
+    print(pd.DataFrame(rows).to_string(index=False, float_format=lambda v: f"{v:.1f}"))
@@ -0,0 +1,90 @@
+import os
+import math
+from concurrent.futures import ProcessPoolExecutor
+from routing import solve_routing, truck_depots
+from packing import order_volume, first_fit_decreasing, packing_cache, stacking
+
+# Cluster-first, route-second planning for the shipping model: orders are grouped by the
+# warehouse of their destination city, each group is packed into that warehouse's trucks
+# with first fit decreasing, and each loaded truck's route is then solved on its own, in
+# parallel processes.
+
+
+def cluster_orders(orders, warehouses):
+    """Order indices per warehouse index, by destination city."""
+    city_depot = {warehouse["city"]: w for w, warehouse in enumerate(warehouses)}
+    clusters = {w: [] for w in range(len(warehouses))}
+    for i, order in enumerate(orders):
+        clusters[city_depot[order["destination"]["city"]]].append(i)
+    return clusters
+
+
+def sweep_sectors(orders, items, warehouse, num_sectors):
+    """Split orders into `num_sectors` sectors around the warehouse of about equal volume."""
+    items = sorted(items, key=lambda i: math.atan2(orders[i]["destination"]["latitude"] - warehouse["latitude"],
+                                                   orders[i]["destination"]["longitude"] - warehouse["longitude"]))
+    total = sum(order_volume(orders[i]) for i in items)
+    sectors, volume = [[] for _ in range(num_sectors)], 0
+    for i in items:
+        sectors[min(int(volume * num_sectors / total), num_sectors - 1)].append(i)
+        volume += order_volume(orders[i])
+    return [sector for sector in sectors if sector]
+
+
+def _route_truck(args):
+    """The delivery order of one loaded truck, as positions in its list of orders."""
+    truck_orders, truck, warehouse, time_limit_seconds, metaheuristic = args
+    solution, _ = solve_routing(truck_orders, [truck], [warehouse], [0], time_limit_seconds, metaheuristic,
+                                check_packing=False)
+    return solution["Truck_1"]["path"]
+
+
+def plan_clustered(orders, trucks, warehouses, depots=None, workers=None, time_limit_seconds=1,
+                   metaheuristic="GREEDY_DESCENT"):
+    """
+    Plan with the cluster-first, route-second decomposition.
+
+    Takes and returns the same as solve_routing. Each warehouse's orders are split into
+    sweep sectors, one per truck that first fit decreasing needs for the whole city,
+    and each sector is packed on its own. Orders left over go to whatever space is left,
+    and if that still leaves more unserved than packing the whole city at once, the
+    whole-city packing is used. Each truck's route is searched until a local optimum by
+    default, or with `metaheuristic` for at most `time_limit_seconds`.
+    """
+    depots = truck_depots(trucks, warehouses) if depots is None else depots
+    loads, unserved = [], []
+    for w, items in cluster_orders(orders, warehouses).items():
+        available = [j for j, depot in enumerate(depots) if depot == w]
+        city_bins, city_unpacked = first_fit_decreasing(orders, items, trucks, available)
+        free, sector_bins, leftover = available, [], []
+        for sector in sweep_sectors(orders, items, warehouses[w], len(city_bins)) if city_bins else []:
+            bins, unpacked = first_fit_decreasing(orders, sector, trucks, free)
+            free = [j for j in free if j not in {truck for truck, _ in bins}]
+            sector_bins += bins
+            leftover += unpacked
+        # Orders a sector had no room for go to the space left in any of the warehouse's trucks
+        if leftover:
+            sector_bins, leftover = first_fit_decreasing(orders, leftover, trucks, free, loads=sector_bins)
+        # Sectors keep routes compact but must not leave more orders behind than packing the whole city
+        if len(leftover) > len(city_unpacked):
+            sector_bins, leftover = city_bins, city_unpacked
+        loads += sector_bins
+        unserved += leftover
+    packing_cache().save()
+
+    tasks = [([orders[i] for i in items], trucks[j], warehouses[depots[j]], time_limit_seconds, metaheuristic)
+             for j, items in loads]
+    if len(tasks) > 1:
+        with ProcessPoolExecutor(max_workers=min(workers or os.cpu_count(), len(tasks))) as executor:
+            paths = list(executor.map(_route_truck, tasks))
+    else:
+        paths = [_route_truck(task) for task in tasks]
+
+    solution = {}
+    for (j, items), path in sorted(zip(loads, paths)):
+        solution[f'Truck_{j+1}'] = {
+            "orders": sorted(items),
+            "path": [items[k] for k in path],
+            "stacking": stacking(trucks[j], orders, items),
+        }
+    return solution, sorted(unserved)
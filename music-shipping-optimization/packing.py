@@ -0,0 +1,270 @@
+import os
+import pickle
+import threading
+from collections import Counter, OrderedDict
+
+# Truck loading for the shipping model.
+# Nothing may be stacked on an instrument that is fragile or not stackable (the same rule
+# as the stacking variables of create_cp_model). Instruments stay upright but may be
+# turned on the floor. Whether a set of instruments fits a truck only depends on the
+# truck type and the multiset of instrument types, so 3D placements are computed once
+# per combination and cached, in memory and on disk.
+
+PACKING_CACHE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), ".packing_cache", "placements.pkl")
+MAX_CACHED_PLACEMENTS = 100000  # Combinations kept, most recently used first
+
+
+def order_volume(order):
+    """Volume of an order's instrument in cm³."""
+    dimensions = order["dimensions"]
+    return dimensions["length"] * dimensions["width"] * dimensions["height"]
+
+
+def fits_in_truck(order, truck):
+    """Whether an instrument fits through the truck's dimensions, turned on the floor if needed."""
+    length, width, height = (order["dimensions"][d] for d in ("length", "width", "height"))
+    size = truck["dimensions"]
+    return height <= size["height"] and max(length, width) <= max(size["length"], size["width"]) and \
+        min(length, width) <= min(size["length"], size["width"])
+
+
+def instrument_type(order):
+    """What an order's placement depends on: (instrument, length, width, height, stackable, fragile)."""
+    dimensions = order["dimensions"]
+    return (order["instrument"], dimensions["length"], dimensions["width"], dimensions["height"],
+            order["stackable"], order["fragile"])
+
+
+def carries_load(instrument):
+    """Whether other instruments may be stacked on top of an instrument type."""
+    _, _, _, _, stackable, fragile = instrument
+    return stackable and not fragile
+
+
+def truck_type(truck):
+    return truck["type"], truck["dimensions"]["length"], truck["dimensions"]["width"], truck["dimensions"]["height"]
+
+
+def load_key(truck, orders):
+    """Cache key of a truck type and a multiset of instrument types."""
+    return truck_type(truck), tuple(sorted(Counter(instrument_type(order) for order in orders).items()))
+
+
+def _overlap(a_start, a_size, b_start, b_size):
+    return max(0, min(a_start + a_size, b_start + b_size) - max(a_start, b_start))
+
+
+def place_boxes(types, size):
+    """
+    Extreme-point placement of instrument types in a truck of the given (length, width, height).
+
+    Instruments that carry load go first, each type largest footprint first. Every box
+    takes the lowest, then rearmost, then leftmost free point where it fits either way
+    round. Free points are the corners of placed boxes and their projections onto the
+    truck's walls. A box above the floor must rest entirely on the tops of load-carrying
+    boxes.
+    Returns [(type, x, y, z, length, width, height, supporting box or None)] in the
+    order of placement, or None if some box has no place.
+    """
+    boxes = sorted(types, key=lambda t: (not carries_load(t), -t[1] * t[2], -t[3]))
+    placed, points = [], {(0, 0, 0)}
+    for t in boxes:
+        _, length, width, height, _, _ = t
+        position = None
+        for x, y, z in sorted(points, key=lambda p: (p[2], p[0], p[1])):
+            for l, w in [(length, width)] + ([(width, length)] if width != length else []):
+                if x + l > size[0] or y + w > size[1] or z + height > size[2]:
+                    continue
+                if any(_overlap(x, l, p[1], p[4]) and _overlap(y, w, p[2], p[5]) and _overlap(z, height, p[3], p[6])
+                       for p in placed):
+                    continue
+                support = None
+                if z > 0:
+                    below = [(k, _overlap(x, l, p[1], p[4]) * _overlap(y, w, p[2], p[5]))
+                             for k, p in enumerate(placed) if p[3] + p[6] == z and carries_load(p[0])]
+                    if sum(area for _, area in below) < l * w:
+                        continue
+                    support = max(below, key=lambda b: b[1])[0]
+                position = (x, y, z, l, w, support)
+                break
+            if position:
+                break
+        if position is None:
+            return None
+
+        x, y, z, l, w, support = position
+        placed.append((t, x, y, z, l, w, height, support))
+        points.discard((x, y, z))
+        points.update([(x + l, y, z), (x, y + w, z), (x + l, 0, z), (0, y + w, z)])
+        if carries_load(t):
+            points.add((x, y, z + height))
+    return placed
+
+
+class PackingCache:
+    """
+    3D placements keyed by truck type and multiset of instrument types.
+
+    Lookups are dict lookups; a combination seen for the first time is placed with
+    place_boxes and remembered, including when it does not fit. At most `max_entries`
+    combinations are kept, dropping the least recently used. `save` appends new entries
+    to `path` (PACKING_CACHE_PATH by default, none if empty), from which later processes
+    load them; the file is rewritten with only the kept entries once it holds twice as
+    many. A lock makes one cache safe to share between threads.
+    """
+
+    def __init__(self, path=None, max_entries=MAX_CACHED_PLACEMENTS):
+        self.path = PACKING_CACHE_PATH if path is None else path
+        self.max_entries = max_entries
+        self._placements = OrderedDict()
+        self._unsaved = []
+        self._saved_entries = 0
+        self._lock = threading.Lock()
+        if self.path and os.path.exists(self.path):
+            with open(self.path, 'rb') as f:
+                while True:
+                    try:
+                        record = pickle.load(f)
+                    except (EOFError, pickle.UnpicklingError):
+                        break  # End of file, or a record cut short by an interrupted save
+                    self._remember(*record)
+                    self._saved_entries += 1
+
+    def _remember(self, key, placed):
+        self._placements[key] = placed
+        self._placements.move_to_end(key)
+        if len(self._placements) > self.max_entries:
+            self._placements.popitem(last=False)
+
+    def placements(self, truck, orders):
+        """The placement of the orders' instruments in this truck type, or None if they do not fit."""
+        key = load_key(truck, orders)
+        with self._lock:
+            if key in self._placements:
+                self._placements.move_to_end(key)
+                return self._placements[key]
+        # Placed outside the lock; a thread placing the same combination meanwhile finds the same result
+        size = key[0][1:]
+        types = [t for t, count in key[1] for _ in range(count)]
+        fits = sum(t[1] * t[2] * t[3] for t in types) <= size[0] * size[1] * size[2]
+        placed = place_boxes(types, size) if fits else None
+        with self._lock:
+            if key not in self._placements:
+                self._unsaved.append(key)
+            self._remember(key, placed)
+        return placed
+
+    def fits(self, truck, orders):
+        """Whether the orders' instruments can be loaded into this truck type."""
+        return self.placements(truck, orders) is not None
+
+    def save(self):
+        with self._lock:
+            self._save()
+
+    def _save(self):
+        if not self.path or not self._unsaved:
+            return
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        if self._saved_entries + len(self._unsaved) > 2 * self.max_entries:
+            temporary_path = self.path + '.tmp'
+            with open(temporary_path, 'wb') as f:
+                for record in self._placements.items():
+                    pickle.dump(record, f)
+            os.replace(temporary_path, self.path)
+            self._saved_entries = len(self._placements)
+        else:
+            with open(self.path, 'ab') as f:
+                for key in self._unsaved:
+                    if key in self._placements:
+                        pickle.dump((key, self._placements[key]), f)
+                        self._saved_entries += 1
+        self._unsaved = []
+
+
+_default_cache = None
+_default_cache_lock = threading.Lock()
+
+
+def packing_cache():
+    """The process's cache, loaded from PACKING_CACHE_PATH on first use."""
+    global _default_cache
+    with _default_cache_lock:
+        if _default_cache is None:
+            _default_cache = PackingCache()
+    return _default_cache
+
+
+def stacking(truck, orders, items, cache=None):
+    """The "stacking" entries of a solution for a truck loaded with the orders at indices `items`."""
+    placed = (cache or packing_cache()).placements(truck, [orders[i] for i in items])
+    if placed is None:
+        raise ValueError(f"Orders {sorted(items)} have no 3D placement in a {truck['type']} truck")
+
+    # Boxes of the same type are interchangeable, so hand them to the orders of that type in turn
+    remaining = {}
+    for i in sorted(items):
+        remaining.setdefault(instrument_type(orders[i]), []).append(i)
+    box_order = [remaining[p[0]].pop(0) for p in placed]
+    return sorted(({"Order": box_order[k], "Stacked On": "None" if p[7] is None else box_order[p[7]]}
+                   for k, p in enumerate(placed)), key=lambda entry: entry["Order"])
+
+
+def truck_capacity(truck):
+    """A truck's (volume in cm³, weight in kg)."""
+    return int(truck["max_volume"] * 1000000), truck["max_weight"]
+
+
+def order_load(order):
+    """An order's (volume in cm³, weight in kg)."""
+    return order_volume(order), order["weight"]
+
+
+def first_fit_decreasing(orders, items, trucks, available, cache=None, loads=()):
+    """
+    Pack the orders with indices `items` into trucks from `available`, first fit decreasing.
+
+    Orders go in order of decreasing volume into the first open truck with room for their
+    weight and a 3D placement from `cache` (the process's packing_cache by default); a
+    new truck is opened, largest first, when none has room. Trucks already loaded with
+    `loads`, as (truck index, order indices), are open from the start. Each load then
+    moves to the smallest free truck that holds it. Returns ([(truck index, order
+    indices)], unpacked order indices).
+    """
+    cache = cache or packing_cache()
+
+    def holds(truck, load, contents):
+        return all(x <= cap for x, cap in zip(load, truck_capacity(truck))) and \
+            cache.fits(truck, [orders[i] for i in contents])
+
+    available = sorted(available, key=lambda j: truck_capacity(trucks[j]), reverse=True)
+    bins = [{"truck": j, "orders": list(contents),
+             "load": [sum(x) for x in zip(*(order_load(orders[i]) for i in contents))]} for j, contents in loads]
+    unpacked = []
+    for i in sorted(items, key=lambda i: order_volume(orders[i]), reverse=True):
+        load = order_load(orders[i])
+        for b in bins:
+            new_load = [used + x for used, x in zip(b["load"], load)]
+            if holds(trucks[b["truck"]], new_load, b["orders"] + [i]):
+                b["orders"].append(i)
+                b["load"] = new_load
+                break
+        else:
+            truck = next((j for j in available if fits_in_truck(orders[i], trucks[j]) and
+                          holds(trucks[j], load, [i])), None)
+            if truck is None:
+                unpacked.append(i)
+                continue
+            available.remove(truck)
+            bins.append({"truck": truck, "orders": [i], "load": list(load)})
+
+    # Downsize: smallest loads first, each onto the smallest free truck that holds it
+    for b in sorted(bins, key=lambda b: b["load"]):
+        smaller = [j for j in available if truck_capacity(trucks[j]) < truck_capacity(trucks[b["truck"]]) and
+                   holds(trucks[j], b["load"], b["orders"])]
+        if smaller:
+            truck = min(smaller, key=lambda j: truck_capacity(trucks[j]))
+            available.remove(truck)
+            available.append(b["truck"])
+            b["truck"] = truck
+    return [(b["truck"], b["orders"]) for b in bins], unpacked
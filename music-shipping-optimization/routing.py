@@ -0,0 +1,293 @@
+import numpy as np
+from ortools.constraint_solver import pywrapcp, routing_enums_pb2
+from packing import order_volume, order_load, truck_capacity, packing_cache, first_fit_decreasing, stacking
+
+# Routing backend for the shipping model, on the OR-Tools vehicle routing solver.
+# Every truck is based at a warehouse and drives from it to its orders' destinations and
+# back. An order can only go on a truck of the warehouse in its destination city, which
+# holds the instrument. Trucks have volume and weight capacity dimensions, and each
+# truck's load is then checked against the 3D placements of packing.py.
+
+EARTH_RADIUS_KM = 6371
+UNSERVED_PENALTY = 10 ** 9  # Metres; far above any route, so orders are only dropped when nothing fits
+
+
+def distance_matrix(latitudes, longitudes):
+    """Haversine distances in km between every pair of points, computed at once."""
+    lat = np.radians(np.asarray(latitudes, dtype=float))
+    lon = np.radians(np.asarray(longitudes, dtype=float))
+    dlat = lat[:, None] - lat[None, :]
+    dlon = lon[:, None] - lon[None, :]
+    a = np.sin(dlat / 2) ** 2 + np.cos(lat)[:, None] * np.cos(lat)[None, :] * np.sin(dlon / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * np.arctan2(np.sqrt(a), np.sqrt(1 - a))
+
+
+def truck_depots(trucks, warehouses):
+    """The warehouse index of each truck: the fleet is spread over the warehouses in turn."""
+    return [j % len(warehouses) for j in range(len(trucks))]
+
+
+def savings_routes(distances, depot, nodes, demands, capacities):
+    """
+    Clarke-Wright savings routes from `depot` through `nodes`.
+
+    Starting from one route per node, routes are joined end to end in decreasing order
+    of the distance saved, d(depot, a) + d(b, depot) - d(a, b), as long as every demand
+    (one array per dimension, indexed by node) stays within the largest capacity of that
+    dimension. Returns the routes as lists of nodes.
+    """
+    if not nodes:
+        return []
+    nodes = np.asarray(nodes)
+    savings = distances[depot, nodes][:, None] + distances[nodes, depot][None, :] - distances[np.ix_(nodes, nodes)]
+    first, second = np.triu_indices(len(nodes), 1)
+    order = np.argsort(-savings[first, second], kind="stable")
+    limits = [max(capacity) for capacity in capacities]
+
+    routes = {int(n): [int(n)] for n in nodes}
+    route_of = {int(n): int(n) for n in nodes}
+    loads = {int(n): [demand[n] for demand in demands] for n in nodes}
+    for k in order:
+        if savings[first[k], second[k]] <= 0:
+            break
+        a, b = int(nodes[first[k]]), int(nodes[second[k]])
+        ra, rb = route_of[a], route_of[b]
+        if ra == rb:
+            continue
+        load = [x + y for x, y in zip(loads[ra], loads[rb])]
+        if any(x > limit for x, limit in zip(load, limits)):
+            continue
+
+        route_a, route_b = routes[ra], routes[rb]
+        if route_a[-1] == a and route_b[0] == b:
+            merged = route_a + route_b
+        elif route_a[0] == a and route_b[-1] == b:
+            merged = route_b + route_a
+        elif route_a[-1] == a and route_b[-1] == b:
+            merged = route_a + route_b[::-1]
+        elif route_a[0] == a and route_b[0] == b:
+            merged = route_a[::-1] + route_b
+        else:
+            continue  # a or b is inside its route
+
+        del routes[rb], loads[rb]
+        routes[ra], loads[ra] = merged, load
+        for n in route_b:
+            route_of[n] = ra
+    return [(routes[r], loads[r]) for r in routes]
+
+
+def initial_routes(distances, orders, trucks, depots, num_depots, demands, capacities, city_depot):
+    """
+    One savings route per truck, as routing nodes, to seed the search.
+
+    Each warehouse's orders are joined into savings routes, which go to its trucks
+    largest load first, each on the smallest free truck that holds it. Routes no free
+    truck can hold are left out, for the search to insert.
+    """
+    seed = [[] for _ in trucks]
+    for w in range(num_depots):
+        nodes = [num_depots + i for i, order in enumerate(orders) if city_depot[order["destination"]["city"]] == w]
+        free = sorted((j for j, depot in enumerate(depots) if depot == w),
+                      key=lambda j: [capacity[j] for capacity in capacities])
+        routes = savings_routes(distances, w, nodes, demands, capacities)
+        for route, load in sorted(routes, key=lambda r: r[1], reverse=True):
+            truck = next((j for j in free if all(x <= capacity[j] for x, capacity in zip(load, capacities))), None)
+            if truck is not None:
+                free.remove(truck)
+                seed[truck] = route
+    return seed
+
+
+def insert_cheapest(distances, depot, route, node):
+    """`route` from and back to `depot` with `node` inserted where it adds the least distance."""
+    stops = [depot] + route + [depot]
+    k = min(range(len(stops) - 1),
+            key=lambda k: distances[stops[k], node] + distances[node, stops[k + 1]] - distances[stops[k], stops[k + 1]])
+    return route[:k] + [node] + route[k:]
+
+
+def repair_loads(routes, orders, trucks, depots, distances, cache):
+    """
+    Make every route's load placeable in 3D, which the capacity dimensions do not ensure.
+
+    `routes` maps truck indices to their orders in delivery sequence and is changed in
+    place. A route whose load has no placement is cut into consecutive stretches: its
+    truck keeps the longest start of the route it holds, and each further stretch goes
+    to the largest unused truck of the same warehouse. Orders left when those run out
+    go to the space left in the warehouse's trucks, packed first fit decreasing, each
+    inserted into its truck's route where it adds the least distance. Returns the
+    orders that found no truck.
+    """
+    num_depots = distances.shape[0] - len(orders)
+
+    def holds(truck, path):
+        load = [sum(x) for x in zip(*(order_load(orders[i]) for i in path))]
+        return all(x <= cap for x, cap in zip(load, truck_capacity(truck))) and \
+            cache.fits(truck, [orders[i] for i in path])
+
+    removed = {}
+    for j in [j for j, path in routes.items() if path and not cache.fits(trucks[j], [orders[i] for i in path])]:
+        unused = sorted((k for k, depot in enumerate(depots) if depot == depots[j] and not routes[k]),
+                        key=lambda k: truck_capacity(trucks[k]), reverse=True)
+        path, truck = routes[j], j
+        routes[j] = []
+        while path and truck is not None:
+            size = 0
+            while size < len(path) and holds(trucks[truck], path[:size + 1]):
+                size += 1
+            routes[truck], path = path[:size], path[size:]
+            truck = unused.pop(0) if unused else None
+        removed.setdefault(depots[j], []).extend(path)
+
+    unplaced = []
+    for w, items in removed.items():
+        if not items:
+            continue
+        trucks_at_depot = [j for j, depot in enumerate(depots) if depot == w]
+        loads = [(j, routes[j]) for j in trucks_at_depot if routes[j]]
+        unused = [j for j in trucks_at_depot if not routes[j]]
+        # Loads keep their position in the result but may move to a smaller truck
+        bins, unpacked = first_fit_decreasing(orders, items, trucks, unused, cache, loads)
+        for j in trucks_at_depot:
+            routes[j] = []
+        for k, (j, load) in enumerate(bins):
+            path = [num_depots + i for i in loads[k][1]] if k < len(loads) else []
+            for i in load[len(path):]:
+                path = insert_cheapest(distances, w, path, num_depots + i)
+            routes[j] = [n - num_depots for n in path]
+        unplaced += unpacked
+    return unplaced
+
+
+def search_routes(distances, demands, capacities, depots, allowed, seed, time_limit_seconds, metaheuristic):
+    """
+    One run of the vehicle routing solver from the `seed` routes, as routing nodes.
+
+    Order k (node num_depots + k) may only go on the trucks in allowed[k], or stay
+    unserved at UNSERVED_PENALTY. Returns {truck index: nodes in delivery sequence}, or
+    None when no solution was found.
+    """
+    num_depots = len(distances) - len(allowed)
+    arc_lengths = distances.tolist()
+    manager = pywrapcp.RoutingIndexManager(len(distances), len(depots), depots, depots)
+    routing = pywrapcp.RoutingModel(manager)
+
+    def distance_callback(from_index, to_index):
+        return arc_lengths[manager.IndexToNode(from_index)][manager.IndexToNode(to_index)]
+
+    routing.SetArcCostEvaluatorOfAllVehicles(routing.RegisterTransitCallback(distance_callback))
+
+    for name, demand, capacity in zip(["Volume", "Weight"], demands, capacities):
+        callback = routing.RegisterUnaryTransitCallback(lambda index, demand=demand: demand[manager.IndexToNode(index)])
+        routing.AddDimensionWithVehicleCapacity(callback, 0, capacity, True, name)
+
+    for k, trucks_allowed in enumerate(allowed):
+        index = manager.NodeToIndex(num_depots + k)
+        routing.AddDisjunction([index], UNSERVED_PENALTY)
+        routing.VehicleVar(index).SetValues([-1] + trucks_allowed)
+
+    parameters = pywrapcp.DefaultRoutingSearchParameters()
+    parameters.local_search_metaheuristic = getattr(routing_enums_pb2.LocalSearchMetaheuristic, metaheuristic)
+    parameters.time_limit.FromMilliseconds(int(time_limit_seconds * 1000))
+    routing.CloseModelWithParameters(parameters)
+
+    initial = routing.ReadAssignmentFromRoutes([[manager.NodeToIndex(n) for n in route] for route in seed], True)
+    if initial is None:
+        assignment = routing.SolveWithParameters(parameters)
+    else:
+        assignment = routing.SolveFromAssignmentWithParameters(initial, parameters)
+    if assignment is None:
+        return None
+
+    routes = {}
+    for j in range(len(depots)):
+        path = []
+        index = assignment.Value(routing.NextVar(routing.Start(j)))
+        while not routing.IsEnd(index):
+            path.append(manager.IndexToNode(index))
+            index = assignment.Value(routing.NextVar(index))
+        routes[j] = path
+    return routes
+
+
+def solve_routing(orders, trucks, warehouses, depots=None, time_limit_seconds=5, metaheuristic="GUIDED_LOCAL_SEARCH",
+                  check_packing=True):
+    """
+    Assign orders to trucks and sequence each truck's deliveries to minimise distance.
+
+    Nodes are the warehouses followed by the orders. The search starts from the savings
+    routes of initial_routes and improves them with `metaheuristic` (guided local search
+    by default, which runs until the time limit). `depots` gives each truck's warehouse index (truck_depots by default).
+    The loads found are checked against the process's packing_cache and fixed with
+    repair_loads; if that changed any route, a second search of the same kind
+    re-sequences the repaired routes with every order pinned to its truck. The two
+    searches get half of `time_limit_seconds` each. Each truck's
+    stacking comes from its placement. With `check_packing` False, for orders already
+    packed into their trucks, loads are not checked and the solution has no stacking.
+    Returns (solution, unserved) where solution has the form of solve_model's solutions
+    and unserved lists the orders no truck could take, or (None, orders) when no
+    solution was found.
+    """
+    depots = truck_depots(trucks, warehouses) if depots is None else depots
+    num_depots = len(warehouses)
+    city_depot = {warehouse["city"]: w for w, warehouse in enumerate(warehouses)}
+
+    latitudes = [warehouse["latitude"] for warehouse in warehouses] + \
+        [order["destination"]["latitude"] for order in orders]
+    longitudes = [warehouse["longitude"] for warehouse in warehouses] + \
+        [order["destination"]["longitude"] for order in orders]
+    distances = np.rint(distance_matrix(latitudes, longitudes) * 1000).astype(np.int64)  # Metres
+
+    # Volume in cm³ and weight in kg
+    demands = [[0] * num_depots + [order_volume(order) for order in orders],
+               [0] * num_depots + [order["weight"] for order in orders]]
+    capacities = [[int(truck["max_volume"] * 1000000) for truck in trucks],
+                  [truck["max_weight"] for truck in trucks]]
+    allowed = [[j for j, depot in enumerate(depots) if depot == city_depot[order["destination"]["city"]]]
+               for order in orders]
+
+    seed = initial_routes(distances, orders, trucks, depots, num_depots, demands, capacities, city_depot)
+    nodes = search_routes(distances, demands, capacities, depots, allowed, seed, time_limit_seconds / 2, metaheuristic)
+    if nodes is None:
+        return None, list(range(len(orders)))
+    routes = {j: [n - num_depots for n in path] for j, path in nodes.items()}
+
+    if check_packing:
+        cache = packing_cache()
+        searched = {j: list(path) for j, path in routes.items()}
+        repair_loads(routes, orders, trucks, depots, distances, cache)
+        cache.save()
+        if routes != searched:
+            pinned = [[] for _ in orders]
+            for j, path in routes.items():
+                for i in path:
+                    pinned[i] = [j]
+            seed = [[num_depots + i for i in routes[j]] for j in range(len(trucks))]
+            nodes = search_routes(distances, demands, capacities, depots, pinned, seed, time_limit_seconds / 2,
+                                  metaheuristic)
+            if nodes is not None:
+                routes = {j: [n - num_depots for n in path] for j, path in nodes.items()}
+
+    solution, served = {}, set()
+    for j, path in routes.items():
+        if path:
+            served.update(path)
+            solution[f'Truck_{j+1}'] = {"orders": sorted(path), "path": path}
+            if check_packing:
+                solution[f'Truck_{j+1}']["stacking"] = stacking(trucks[j], orders, path, cache)
+    return solution, [i for i in range(len(orders)) if i not in served]
+
+
+def route_distance(solution, orders, warehouses, depots):
+    """Total km of a solution's routes, from each truck's warehouse and back."""
+    total = 0.0
+    for truck_id, data in solution.items():
+        warehouse = warehouses[depots[int(truck_id.split('_')[1]) - 1]]
+        stops = [(warehouse["latitude"], warehouse["longitude"])] + \
+            [(orders[i]["destination"]["latitude"], orders[i]["destination"]["longitude"]) for i in data["path"]] + \
+            [(warehouse["latitude"], warehouse["longitude"])]
+        latitudes, longitudes = zip(*stops)
+        distances = distance_matrix(latitudes, longitudes)
+        total += sum(distances[k, k + 1] for k in range(len(stops) - 1))
+    return total
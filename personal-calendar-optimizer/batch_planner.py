@@ -0,0 +1,257 @@
+import os
+import sys
+import json
+import time
+from collections import OrderedDict, deque
+from concurrent.futures import ProcessPoolExecutor
+from datetime import timedelta
+from ortools.sat.python import cp_model
+
+from pcop_solver import (load_pcop_data, planning_days, activity_bounds, activity_weight, add_day, weekly_targets,
+                         day_variants, solve_day_model, plan_weeks, create_pcop_model, solve_pcop_model)
+
+# Nightly batch planning for many users with the day decomposition of solve_pcop_decomposed.
+# Users whose inputs share an activity schema (activities, precedences, breaks and which
+# activities have weekly goals) share one compiled day model; each user only patches the
+# variable bounds and objective weights of a copy of it.
+# Usage (from the repository root):
+#   python personal-calendar-optimizer/batch_planner.py <users> <output.parquet|output.csv> [workers] [time_limit]
+# where <users> is a directory of pcop.json-style files (one per user, named by user id)
+# or a .jsonl file with a `user_id` field on every line.
+
+MAX_TEMPLATES = 32  # Compiled schemas each worker keeps
+CHUNK_SIZE = 50  # Users per task
+
+COLUMNS = ['user_id', 'date', 'activity', 'start_minute', 'duration_minutes']
+
+
+def activity_schema(pcop_data):
+    """Key of everything in an input that shapes the day model, as opposed to its bounds and weights."""
+    data = pcop_data['pcop_data']
+    return json.dumps({
+        'activities': [activity['name'] for activity in data['activities']],
+        'weekly_goals': sorted(weekly_targets(pcop_data)),
+        'precedence': data['constraints']['precedence'],
+        'breaks': data['constraints']['breaks'],
+    }, sort_keys=True)
+
+
+def _set_bounds(variable, lower, upper):
+    """Overwrite the domain of a variable created with NewIntVar in the model proto."""
+    variable.domain[0] = lower
+    variable.domain[1] = upper
+
+
+class DayTemplate:
+    """
+    The day model of one activity schema, built once with add_day.
+
+    For each user and candidate day plan, `instance` clones the model, overwrites the
+    domains of the start, duration and end variables from the user's duration bounds and
+    sets the objective from the user's weights.
+    """
+
+    def __init__(self, pcop_data):
+        self.model = cp_model.CpModel()
+        intervals, _ = add_day(self.model, pcop_data, 0)
+        self.names = list(intervals)
+        self.indices = {name: (interval['start'].Index(), interval['duration'].Index(), interval['end'].Index())
+                        for name, interval in intervals.items()}
+
+    def instance(self, pcop_data, maximised=(), prices=None, minimums=None):
+        """
+        The day model for one user, with the `maximised` activities at their daily maximum,
+        `prices` added to the objective weights of those activities and `minimums` as lower
+        bounds on their durations.
+        """
+        prices, minimums = prices or {}, minimums or {}
+        model = self.model.Clone()
+        variables = model.Proto().variables
+        objective_terms = []
+        for activity in pcop_data['pcop_data']['activities']:
+            min_duration, max_duration = activity_bounds(activity)
+            if activity['name'] in maximised:
+                min_duration = max_duration
+            min_duration = max(min_duration, minimums.get(activity['name'], 0))
+            start, duration, end = self.indices[activity['name']]
+            _set_bounds(variables[start], 0, 24 * 60 - min_duration)
+            _set_bounds(variables[duration], min_duration, max_duration)
+            _set_bounds(variables[end], min_duration, 24 * 60)
+            weight = activity_weight(pcop_data, activity) + prices.get(activity['name'], 0)
+            objective_terms.append(weight * model.GetIntVarFromProtoIndex(duration))
+        model.Maximize(sum(objective_terms))
+
+        intervals = {name: {'start': model.GetIntVarFromProtoIndex(self.indices[name][0]),
+                            'duration': model.GetIntVarFromProtoIndex(self.indices[name][1])}
+                     for name in self.names}
+        return model, intervals
+
+
+_templates = OrderedDict()
+
+
+def day_template(pcop_data):
+    """The worker's compiled template for this input's schema, keeping the most recently used."""
+    key = activity_schema(pcop_data)
+    if key in _templates:
+        _templates.move_to_end(key)
+    else:
+        _templates[key] = DayTemplate(pcop_data)
+        if len(_templates) > MAX_TEMPLATES:
+            _templates.popitem(last=False)
+    return _templates[key]
+
+
+def plan_user(pcop_data, time_limit_seconds, template=None):
+    """
+    One user's schedule, in the same form as solve_pcop_decomposed, or None.
+
+    The day models are copies of `template`, by default the worker's day_template.
+    """
+    template = template or day_template(pcop_data)
+    targets = weekly_targets(pcop_data)
+    maximum = {activity['name']: activity_bounds(activity)[1] for activity in pcop_data['pcop_data']['activities']}
+    candidates = []
+    for variant in day_variants(targets):
+        # The unconstrained plan also solves a variant whose activities it already has at their maximum
+        if variant and all(duration == maximum[name] for name, _, duration in candidates[0][0] if name in variant):
+            continue
+        result = solve_day_model(*template.instance(pcop_data, variant), time_limit_seconds)
+        if result is None and not variant:
+            return None
+        if result is not None:
+            candidates.append(result)
+    _, num_days = planning_days(pcop_data)
+    schedule = plan_weeks(candidates, targets, num_days, time_limit_seconds,
+                          lambda prices, minimums: solve_day_model(
+                              *template.instance(pcop_data, prices=prices, minimums=minimums), time_limit_seconds))
+    if schedule is None:
+        # As in solve_pcop_decomposed, the full model decides when no combination of day plans meets the goals
+        model, activity_intervals, num_days = create_pcop_model(pcop_data, debug=False)
+        schedule = solve_pcop_model(model, activity_intervals, num_days,
+                                    {'time_limit_seconds': time_limit_seconds, 'log_search_progress': False},
+                                    debug=False)
+    return schedule
+
+
+def _plan_chunk(users, time_limit_seconds):
+    """Plan a chunk of (user_id, pcop_data), returning the schedules as columns and the failed user ids."""
+    columns = {name: [] for name in COLUMNS}
+    failed = []
+    for user_id, pcop_data in users:
+        schedule = plan_user(pcop_data, time_limit_seconds)
+        if schedule is None:
+            failed.append(user_id)
+            continue
+        start_date, _ = planning_days(pcop_data)
+        for day, day_schedule in enumerate(schedule):
+            date = (start_date + timedelta(days=day)).strftime('%Y-%m-%d')
+            for activity, start, duration in day_schedule:
+                columns['user_id'].append(user_id)
+                columns['date'].append(date)
+                columns['activity'].append(activity)
+                columns['start_minute'].append(start)
+                columns['duration_minutes'].append(duration)
+    return columns, failed
+
+
+def load_users(path):
+    """Yield (user_id, pcop_data) from a directory of JSON files or a JSON Lines file, one user at a time."""
+    if os.path.isdir(path):
+        for name in sorted(os.listdir(path)):
+            if name.endswith('.json'):
+                yield os.path.splitext(name)[0], load_pcop_data(os.path.join(path, name))
+    else:
+        with open(path, 'r') as file:
+            for line in file:
+                if line.strip():
+                    pcop_data = json.loads(line)
+                    yield str(pcop_data.pop('user_id')), pcop_data
+
+
+class ScheduleWriter:
+    """Append column chunks to one Parquet file (.parquet) or CSV file (anything else)."""
+
+    def __init__(self, path):
+        self.path = path
+        self._parquet_writer = None
+        self._rows_written = False
+
+    def write(self, columns):
+        if not columns['user_id']:
+            return
+        if self.path.endswith('.parquet'):
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+            table = pa.table(columns)
+            if self._parquet_writer is None:
+                self._parquet_writer = pq.ParquetWriter(self.path, table.schema)
+            self._parquet_writer.write_table(table)
+        else:
+            import pandas as pd
+            pd.DataFrame(columns).to_csv(self.path, mode='a' if self._rows_written else 'w',
+                                         header=not self._rows_written, index=False)
+        self._rows_written = True
+
+    def close(self):
+        if self._parquet_writer is not None:
+            self._parquet_writer.close()
+
+
+def _chunks(users, size):
+    chunk = []
+    for user in users:
+        chunk.append(user)
+        if len(chunk) == size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+def plan_batch(users, output_path, workers=None, time_limit_seconds=10, chunk_size=CHUNK_SIZE,
+               tasks_per_worker=20):
+    """
+    Plan every user and write all schedules to `output_path`.
+
+    Users are read lazily and sent to worker processes in chunks of `chunk_size`, with
+    at most two chunks per worker in flight, and results are written as they arrive, so
+    memory stays bounded however many users there are. Workers are replaced after
+    `tasks_per_worker` chunks. Returns (users planned, failed user ids, seconds).
+    """
+    workers = workers or os.cpu_count()
+    writer = ScheduleWriter(output_path)
+    planned, failed = 0, []
+    started = time.perf_counter()
+
+    def write_next():
+        nonlocal planned
+        size, future = pending.popleft()
+        columns, chunk_failed = future.result()
+        writer.write(columns)
+        planned += size - len(chunk_failed)
+        failed.extend(chunk_failed)
+
+    pending = deque()
+    try:
+        with ProcessPoolExecutor(max_workers=workers, max_tasks_per_child=tasks_per_worker) as executor:
+            for chunk in _chunks(users, chunk_size):
+                pending.append((len(chunk), executor.submit(_plan_chunk, chunk, time_limit_seconds)))
+                while len(pending) >= 2 * workers or (pending and pending[0][1].done()):
+                    write_next()
+            while pending:
+                write_next()
+    finally:
+        writer.close()
+    return planned, failed, time.perf_counter() - started
+
+
+if __name__ == "__main__":
+    users_path, output_path = sys.argv[1], sys.argv[2]
+    workers = int(sys.argv[3]) if len(sys.argv) > 3 else None
+    time_limit_seconds = float(sys.argv[4]) if len(sys.argv) > 4 else 10
+
+    planned, failed, seconds = plan_batch(load_users(users_path), output_path, workers, time_limit_seconds)
+    print(f"Planned {planned} users in {seconds:.1f}s ({60 * (planned + len(failed)) / seconds:.0f} users/minute)")
+    if failed:
+        print(f"No feasible schedule for {len(failed)} users: {', '.join(failed[:20])}")
@@ -0,0 +1,59 @@
+import sys
+import copy
+import json
+import random
+import time
+import pandas as pd
+from pcop_solver import load_pcop_data
+from batch_planner import DayTemplate, plan_user, plan_batch
+from benchmark_pcop import with_horizon, WEEKLY_GOALS
+
+# Users per minute of the batch planner against solving each user on its own in this
+# process (parsing its JSON and building its day model from scratch, then the same
+# solves as the batch planner), for synthetic users that share pcop.json's activities
+# but have their own duration bounds and objective weights.
+# Usage (from the repository root):
+#   python personal-calendar-optimizer/benchmark_batch.py [num_users] [workers] [output.parquet]
+
+
+def synthetic_users(pcop_data, num_users, num_days=31, seed=0):
+    """Yield (user_id, JSON text) for users with randomly scaled daily bounds and weights."""
+    rng = random.Random(seed)
+    base = with_horizon(pcop_data, num_days, WEEKLY_GOALS)
+    for user in range(num_users):
+        user_data = copy.deepcopy(base)
+        for activity in user_data['pcop_data']['activities']:
+            if 'dailyMinDuration' in activity and activity['name'] != 'Sleep':
+                activity['dailyMinDuration'] = int(activity['dailyMinDuration'] * rng.uniform(0.5, 1.0))
+                activity['dailyMaxDuration'] = int(activity['dailyMaxDuration'] * rng.uniform(0.8, 1.2))
+        for weight in user_data['pcop_data']['objectiveWeights']:
+            user_data['pcop_data']['objectiveWeights'][weight] = round(rng.uniform(0.1, 1.0), 2)
+        yield f"user{user:05d}", json.dumps(user_data)
+
+
+def benchmark_batch(pcop_data, num_users, workers, output_path, time_limit_seconds=10):
+    users = list(synthetic_users(pcop_data, num_users))
+
+    started = time.perf_counter()
+    for _, text in users:
+        pcop_data = json.loads(text)
+        plan_user(pcop_data, time_limit_seconds, DayTemplate(pcop_data))
+    one_by_one_s = time.perf_counter() - started
+
+    planned, failed, batch_s = plan_batch(((user_id, json.loads(text)) for user_id, text in users), output_path,
+                                          workers, time_limit_seconds)
+    return [
+        {'planner': 'one user at a time', 'users': num_users, 'seconds': one_by_one_s,
+         'users/minute': 60 * num_users / one_by_one_s},
+        {'planner': 'batch', 'users': planned + len(failed), 'seconds': batch_s,
+         'users/minute': 60 * (planned + len(failed)) / batch_s},
+    ]
+
+
+if __name__ == "__main__":
+    pcop_data = load_pcop_data('personal-calendar-optimizer/pcop.json')
+    num_users = int(sys.argv[1]) if len(sys.argv) > 1 else 200
+    workers = int(sys.argv[2]) if len(sys.argv) > 2 else None
+    output_path = sys.argv[3] if len(sys.argv) > 3 else 'pcop_batch_schedules.parquet'
+    rows = benchmark_batch(pcop_data, num_users, workers, output_path)
+    print(pd.DataFrame(rows).to_string(index=False, float_format=lambda v: f"{v:.1f}"))
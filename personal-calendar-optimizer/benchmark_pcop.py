@@ -0,0 +1,69 @@
+import sys
+import copy
+import time
+from datetime import datetime, timedelta
+import pandas as pd
+from pcop_solver import (load_pcop_data, create_pcop_model, solve_pcop_model, solve_pcop_decomposed,
+                         schedule_objective)
+
+# Wall time and objective of the monolithic model against the day decomposition, for
+# horizons of one to six months, without weekly goals, with goals the unconstrained day
+# plan already meets, and with goals that bind.
+# Usage (from the repository root): python personal-calendar-optimizer/benchmark_pcop.py [time_limit] [num_workers]
+
+HORIZON_DAYS = [31, 92, 184]
+WEEKLY_GOALS = {'Exercise': 180, 'Learning Japanese': 600}
+
+# With Work fixed at 800 minutes a day, both study goals need close to 100 minutes every
+# day, which no single extreme day plan gives (daily minimums are scaled by 0.7)
+BINDING_GOALS = {'Learning Japanese': 680, 'Learning Mathematics': 680}
+BINDING_BOUNDS = {'Work': {'dailyMinDuration': 1143, 'dailyMaxDuration': 800}}
+
+CASES = [('none', {}, {}), ('weekly goals', WEEKLY_GOALS, {}), ('binding goals', BINDING_GOALS, BINDING_BOUNDS)]
+
+
+def with_horizon(pcop_data, num_days, weekly_goals, bounds=None):
+    pcop_data = copy.deepcopy(pcop_data)
+    horizon = pcop_data['pcop_data']['timeHorizon']
+    start_date = datetime.strptime(horizon['startDate'], '%Y-%m-%d')
+    horizon['endDate'] = (start_date + timedelta(days=num_days - 1)).strftime('%Y-%m-%d')
+    for activity in pcop_data['pcop_data']['activities']:
+        if activity['name'] in weekly_goals:
+            activity['weeklyMinDuration'] = weekly_goals[activity['name']]
+        activity.update((bounds or {}).get(activity['name'], {}))
+    return pcop_data
+
+
+def benchmark_pcop(pcop_data, num_days, case, solver_options):
+    name, weekly_goals, bounds = case
+    pcop_data = with_horizon(pcop_data, num_days, weekly_goals, bounds)
+
+    started = time.perf_counter()
+    model, activity_intervals, num_days = create_pcop_model(pcop_data, debug=False)
+    monolithic = solve_pcop_model(model, activity_intervals, num_days, solver_options, debug=False)
+    monolithic_s = time.perf_counter() - started
+
+    started = time.perf_counter()
+    decomposed = solve_pcop_decomposed(pcop_data, solver_options, debug=False)
+    decomposed_s = time.perf_counter() - started
+
+    return {
+        'days': num_days,
+        'goals': name,
+        'monolithic (s)': monolithic_s,
+        'monolithic objective': schedule_objective(pcop_data, monolithic) if monolithic else None,
+        'decomposed (s)': decomposed_s,
+        'decomposed objective': schedule_objective(pcop_data, decomposed) if decomposed else None,
+    }
+
+
+if __name__ == "__main__":
+    pcop_data = load_pcop_data('personal-calendar-optimizer/pcop.json')
+    solver_options = {
+        'time_limit_seconds': float(sys.argv[1]) if len(sys.argv) > 1 else 30,
+        'num_workers': int(sys.argv[2]) if len(sys.argv) > 2 else 8,
+        'log_search_progress': False,
+    }
+    rows = [benchmark_pcop(pcop_data, num_days, case, solver_options)
+            for case in CASES for num_days in HORIZON_DAYS]
+    print(pd.DataFrame(rows).to_string(index=False, float_format=lambda v: f"{v:.2f}"))
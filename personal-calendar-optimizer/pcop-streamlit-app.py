@@ -5,7 +5,7 @@ import pandas as pd
 import plotly.figure_factory as ff
 
 # Import functions from your updated pcop_solver.py
-from pcop_solver import create_pcop_model, solve_pcop_model
+from pcop_solver import create_pcop_model, solve_pcop_model, solve_pcop_decomposed
 
 # Convert schedule to DataFrame for easy display
 def schedule_to_df(schedule, start_date):
@@ -48,6 +48,7 @@ def main():
                                          min_value=1, max_value=100)
         log_search = st.checkbox("Log Search Progress", 
                                  value=pcop_data['solver_options']['log_search_progress'])
+        decompose = st.checkbox("Solve days independently", value=True)
 
         # Update solver options in pcop_data
         pcop_data['solver_options']['time_limit_seconds'] = time_limit
@@ -56,8 +57,11 @@ def main():
 
         if st.button('Run Optimization'):
             with st.spinner('Optimizing schedule...'):
-                model, activity_intervals, num_days = create_pcop_model(pcop_data)
-                schedule = solve_pcop_model(model, activity_intervals, num_days, pcop_data['solver_options'])
+                if decompose:
+                    schedule = solve_pcop_decomposed(pcop_data, pcop_data['solver_options'])
+                else:
+                    model, activity_intervals, num_days = create_pcop_model(pcop_data)
+                    schedule = solve_pcop_model(model, activity_intervals, num_days, pcop_data['solver_options'])
 
             if schedule:
                 st.success("Optimization complete!")
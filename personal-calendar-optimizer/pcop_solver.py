@@ -1,9 +1,15 @@
+import os
 import json
+from concurrent.futures import ProcessPoolExecutor
 from ortools.sat.python import cp_model
+from ortools.linear_solver import pywraplp
 from datetime import datetime, timedelta
 
 from ortools.sat.python import cp_model
 
+SHORTFALL_PENALTY = 10 ** 4  # Objective lost per minute a weekly goal is missed by, in the master LP
+MAX_PRICING_ROUNDS = 20  # Day plans generated per week length at most
+
 
 class SolutionPrinter(cp_model.CpSolverSolutionCallback):
     def __init__(self, activity_intervals, num_days, solution_limit):
@@ -35,125 +41,154 @@ def load_pcop_data(file_path):
         return json.load(file)
 
 
-def create_pcop_model(pcop_data, debug=True):
-    model = cp_model.CpModel()
-
-    # Time horizon
+def planning_days(pcop_data):
+    """Start date and number of days of the time horizon."""
     start_date = datetime.strptime(pcop_data['pcop_data']['timeHorizon']['startDate'], '%Y-%m-%d')
     end_date = datetime.strptime(pcop_data['pcop_data']['timeHorizon']['endDate'], '%Y-%m-%d')
-    num_days = (end_date - start_date).days + 1
-    horizon = num_days * 24 * 60  # Total minutes in the time horizon
+    return start_date, (end_date - start_date).days + 1
 
-    if debug:
-        print(f"Planning for {num_days} days")
 
-    # Activities
-    activities = pcop_data['pcop_data']['activities']
-    activity_intervals = {}
+def activity_bounds(activity):
+    """Minimum and maximum daily duration of an activity, in minutes."""
+    # Reduce minimum durations by 30% to provide more flexibility
+    min_duration = int(activity.get('dailyMinDuration', activity.get('dailyDuration', 30)) * 0.7)
+    max_duration = activity.get('dailyMaxDuration', activity.get('dailyDuration', 120))
 
-    for day in range(num_days):
-        day_start = day * 24 * 60
-        day_end = (day + 1) * 24 * 60
-
-        for activity in activities:
-            # Reduce minimum durations by 30% to provide more flexibility
-            min_duration = int(activity.get('dailyMinDuration', activity.get('dailyDuration', 30)) * 0.7)
-            max_duration = activity.get('dailyMaxDuration', activity.get('dailyDuration', 120))
-
-            # Special handling for eating (3 occurrences)
-            if activity['name'] == 'Eating':
-                min_duration = activity['minDuration']
-                max_duration = activity['maxDuration']
-
-            # Ensure max_duration is not greater than the day length
-            max_duration = min(max_duration, 24 * 60)
-
-            start_var = model.NewIntVar(day_start, day_end - min_duration, f"{activity['name']}_start_day{day}")
-            duration_var = model.NewIntVar(min_duration, max_duration, f"{activity['name']}_duration_day{day}")
-            end_var = model.NewIntVar(day_start + min_duration, day_end, f"{activity['name']}_end_day{day}")
-            interval_var = model.NewIntervalVar(start_var, duration_var, end_var, f"{activity['name']}_interval_day{day}")
-
-            activity_intervals[day, activity['name']] = {
-                'start': start_var,
-                'duration': duration_var,
-                'end': end_var,
-                'interval': interval_var
-            }
+    # Special handling for eating (3 occurrences)
+    if activity['name'] == 'Eating':
+        min_duration = activity['minDuration']
+        max_duration = activity['maxDuration']
+
+    # Ensure max_duration is not greater than the day length
+    return min_duration, min(max_duration, 24 * 60)
+
+
+def activity_weight(pcop_data, activity):
+    if activity['name'] == 'Work':
+        return pcop_data['pcop_data']['objectiveWeights']['dailyProductivity']
+    if activity['name'] in ['Sleep', 'Exercise']:
+        return pcop_data['pcop_data']['objectiveWeights']['dailyWellbeing']
+    return 1  # Default weight
 
-    if debug:
-        print("Activity intervals created")
-        total_min_duration = sum(int(activity.get('dailyMinDuration', activity.get('dailyDuration', 30)) * 0.7) for activity in activities if activity['name'] != 'Eating')
-        total_min_duration += 3 * activities[2]['minDuration']  # Add eating durations
-        print(f"Total minimum duration of all activities: {total_min_duration} minutes")
 
-    # Constraints
+def add_day(model, pcop_data, day):
+    """
+    Add one day's activities and constraints to the model.
+
+    Nothing here refers to another day, so days only interact through weekly goals.
+    Returns the day's intervals keyed by activity name and its objective terms.
+    """
+    activities = pcop_data['pcop_data']['activities']
+    day_start = day * 24 * 60
+    day_end = (day + 1) * 24 * 60
+
+    intervals = {}
+    for activity in activities:
+        min_duration, max_duration = activity_bounds(activity)
+        start_var = model.NewIntVar(day_start, day_end - min_duration, f"{activity['name']}_start_day{day}")
+        duration_var = model.NewIntVar(min_duration, max_duration, f"{activity['name']}_duration_day{day}")
+        end_var = model.NewIntVar(day_start + min_duration, day_end, f"{activity['name']}_end_day{day}")
+        interval_var = model.NewIntervalVar(start_var, duration_var, end_var, f"{activity['name']}_interval_day{day}")
+
+        intervals[activity['name']] = {
+            'start': start_var,
+            'duration': duration_var,
+            'end': end_var,
+            'interval': interval_var
+        }
 
     # 1. Daily occurrence constraints
-    for day in range(num_days):
-        day_intervals = [interval['interval'] for (d, _), interval in activity_intervals.items() if d == day]
-        model.AddNoOverlap(day_intervals)
-    if debug:
-        print("Daily occurrence constraints added")
+    model.AddNoOverlap([interval['interval'] for interval in intervals.values()])
 
     # 2. Ensure total duration of activities doesn't exceed 24 hours
-    for day in range(num_days):
-        day_durations = [interval['duration'] for (d, _), interval in activity_intervals.items() if d == day]
-        model.Add(sum(day_durations) <= 24 * 60)
-    if debug:
-        print("Total duration constraint added")
+    model.Add(sum(interval['duration'] for interval in intervals.values()) <= 24 * 60)
 
     # 3. Time window constraints for sleep (made extremely flexible)
-    sleep_activity = next(act for act in activities if act['name'] == 'Sleep')
-    for day in range(num_days):
-        sleep_interval = activity_intervals[day, sleep_activity['name']]
-        # Allow sleep to start anytime between 6 PM and 2 AM
-        night_start = day * 24 * 60 + 18 * 60  # 6 PM
-        night_end = (day + 1) * 24 * 60 + 2 * 60  # 2 AM next day
-        model.Add(sleep_interval['start'] >= night_start)
-        model.Add(sleep_interval['start'] <= night_end)
-        
-        # Ensure sleep duration is at least 6 hours (360 minutes)
-        model.Add(sleep_interval['duration'] >= 360)
-    if debug:
-        print("Sleep time window constraints added (extremely flexible)")
+    sleep_interval = intervals['Sleep']
+    # Allow sleep to start anytime between 6 PM and 2 AM
+    night_start = day * 24 * 60 + 18 * 60  # 6 PM
+    night_end = (day + 1) * 24 * 60 + 2 * 60  # 2 AM next day
+    model.Add(sleep_interval['start'] >= night_start)
+    model.Add(sleep_interval['start'] <= night_end)
+
+    # Ensure sleep duration is at least 6 hours (360 minutes)
+    model.Add(sleep_interval['duration'] >= 360)
 
     # 4. Precedence constraints (optional)
     for constraint in pcop_data['pcop_data']['constraints']['precedence']:
-        for day in range(num_days):
-            act1 = activity_intervals[day, constraint['activity']]
-            act2 = activity_intervals[day, constraint['notAfter']]
-            min_gap = constraint['minGapMinutes']
-            precedence_bool = model.NewBoolVar(f"precedence_{constraint['activity']}_{constraint['notAfter']}_day{day}")
-            model.Add(act2['start'] >= act1['end'] + min_gap).OnlyEnforceIf(precedence_bool)
-    if debug:
-        print("Precedence constraints added (optional)")
+        act1 = intervals[constraint['activity']]
+        act2 = intervals[constraint['notAfter']]
+        min_gap = constraint['minGapMinutes']
+        precedence_bool = model.NewBoolVar(f"precedence_{constraint['activity']}_{constraint['notAfter']}_day{day}")
+        model.Add(act2['start'] >= act1['end'] + min_gap).OnlyEnforceIf(precedence_bool)
 
     # 5. Break constraints (optional and simplified)
     work_activity = pcop_data['pcop_data']['constraints']['breaks']['activity']
-    break_duration = pcop_data['pcop_data']['constraints']['breaks']['breakDurationMinutes']
     work_duration = pcop_data['pcop_data']['constraints']['breaks']['afterDurationMinutes']
+    work_interval = intervals[work_activity]
+    break_bool = model.NewBoolVar(f"break_day{day}")
+    model.Add(work_interval['duration'] <= work_duration).OnlyEnforceIf(break_bool.Not())
+    model.Add(work_interval['duration'] > work_duration).OnlyEnforceIf(break_bool)
+
+    objective_terms = [activity_weight(pcop_data, activity) * intervals[activity['name']]['duration']
+                       for activity in activities]
+    return intervals, objective_terms
+
+
+def weekly_targets(pcop_data):
+    """Minimum minutes per week of each activity with a `weeklyMinDuration`."""
+    return {activity['name']: activity['weeklyMinDuration']
+            for activity in pcop_data['pcop_data']['activities'] if 'weeklyMinDuration' in activity}
+
+
+def planning_weeks(num_days):
+    """The horizon's days in weeks of seven, the last one possibly shorter."""
+    return [range(first, min(first + 7, num_days)) for first in range(0, num_days, 7)]
+
+
+def week_target(target, week):
+    """A weekly target scaled down for a partial week."""
+    return target * len(week) // 7
+
+
+def create_pcop_model(pcop_data, debug=True):
+    model = cp_model.CpModel()
+
+    # Time horizon
+    start_date, num_days = planning_days(pcop_data)
 
-    for day in range(num_days):
-        work_interval = activity_intervals[day, work_activity]
-        break_bool = model.NewBoolVar(f"break_day{day}")
-        model.Add(work_interval['duration'] <= work_duration).OnlyEnforceIf(break_bool.Not())
-        model.Add(work_interval['duration'] > work_duration).OnlyEnforceIf(break_bool)
     if debug:
-        print("Break constraints added (optional and simplified)")
+        print(f"Planning for {num_days} days")
 
-    # Objective
+    # Activities and per-day constraints
+    activities = pcop_data['pcop_data']['activities']
+    activity_intervals = {}
     objective_terms = []
     for day in range(num_days):
-        for activity in activities:
-            interval = activity_intervals[day, activity['name']]
-            weight = 1  # Default weight
-            if activity['name'] == 'Work':
-                weight = pcop_data['pcop_data']['objectiveWeights']['dailyProductivity']
-            elif activity['name'] in ['Sleep', 'Exercise']:
-                weight = pcop_data['pcop_data']['objectiveWeights']['dailyWellbeing']
-            
-            objective_terms.append(weight * interval['duration'])
+        intervals, terms = add_day(model, pcop_data, day)
+        for name, interval in intervals.items():
+            activity_intervals[day, name] = interval
+        objective_terms += terms
 
+    if debug:
+        print("Activity intervals created")
+        total_min_duration = sum(int(activity.get('dailyMinDuration', activity.get('dailyDuration', 30)) * 0.7) for activity in activities if activity['name'] != 'Eating')
+        total_min_duration += 3 * activities[2]['minDuration']  # Add eating durations
+        print(f"Total minimum duration of all activities: {total_min_duration} minutes")
+        print("Daily occurrence constraints added")
+        print("Total duration constraint added")
+        print("Sleep time window constraints added (extremely flexible)")
+        print("Precedence constraints added (optional)")
+        print("Break constraints added (optional and simplified)")
+
+    # 6. Weekly goals, the only constraints linking days
+    for name, target in weekly_targets(pcop_data).items():
+        for week in planning_weeks(num_days):
+            model.Add(sum(activity_intervals[day, name]['duration'] for day in week) >= week_target(target, week))
+    if debug and weekly_targets(pcop_data):
+        print("Weekly goal constraints added")
+
+    # Objective
     model.Maximize(sum(objective_terms))
 
     if debug:
@@ -169,7 +204,7 @@ def solve_pcop_model(model, activity_intervals, num_days, solver_options, debug=
 
     # Apply solver options
     solver.parameters.max_time_in_seconds = solver_options['time_limit_seconds']
-    solver.parameters.num_search_workers = 1  # Required when setting solution limit
+    solver.parameters.num_workers = solver_options.get('num_workers', 1)
     solver.parameters.log_search_progress = solver_options['log_search_progress']
 
     if debug:
@@ -203,14 +238,212 @@ def solve_pcop_model(model, activity_intervals, num_days, solver_options, debug=
                 print("No specific conflict identified.")
         return None
 
+def _solve_day_variant(args):
+    """Solve a single day, with the durations of the `maximised` activities forced to their maximum."""
+    pcop_data, maximised, time_limit_seconds = args
+    model = cp_model.CpModel()
+    intervals, objective_terms = add_day(model, pcop_data, 0)
+    for activity in pcop_data['pcop_data']['activities']:
+        if activity['name'] in maximised:
+            model.Add(intervals[activity['name']]['duration'] == activity_bounds(activity)[1])
+    model.Maximize(sum(objective_terms))
+    return solve_day_model(model, intervals, time_limit_seconds)
+
+
+def solve_day_model(model, intervals, time_limit_seconds):
+    """Solve a single-day model, returning (day_schedule, objective value) or None."""
+    solver = cp_model.CpSolver()
+    solver.parameters.max_time_in_seconds = time_limit_seconds
+    solver.parameters.num_workers = 1
+    if solver.Solve(model) not in (cp_model.OPTIMAL, cp_model.FEASIBLE):
+        return None
+
+    day_schedule = sorted(((name, solver.Value(interval['start']), solver.Value(interval['duration']))
+                           for name, interval in intervals.items()), key=lambda x: x[1])
+    return day_schedule, solver.ObjectiveValue()
+
+
+def _solve_priced_day(pcop_data, prices, minimums, time_limit_seconds):
+    """
+    Solve a single day with `prices` added to the objective weight of each minute of those
+    activities and `minimums` as lower bounds on their durations.
+    """
+    model = cp_model.CpModel()
+    intervals, objective_terms = add_day(model, pcop_data, 0)
+    for name, minimum in minimums.items():
+        model.Add(intervals[name]['duration'] >= minimum)
+    model.Maximize(sum(objective_terms) + sum(price * intervals[name]['duration'] for name, price in prices.items()))
+    return solve_day_model(model, intervals, time_limit_seconds)
+
+
+def plan_minutes(plan, name):
+    return next(duration for activity, _, duration in plan if activity == name)
+
+
+def _master_prices(candidates, targets, week_length):
+    """
+    Solve the LP relaxation of the master problem for a week of `week_length` days.
+
+    Each candidate plan is used on a fractional number of days, and a goal may fall short
+    at SHORTFALL_PENALTY per minute, so the LP is always feasible. Returns the prices of
+    a minute of each goal activity and of a day, from the LP's dual values.
+    """
+    solver = pywraplp.Solver.CreateSolver('GLOP')
+    days = [solver.NumVar(0, week_length, f"days_{c}") for c in range(len(candidates))]
+    week = solver.Add(sum(days) == week_length)
+    goals = {}
+    for name, target in targets.items():
+        shortfall = solver.NumVar(0, solver.infinity(), f"shortfall_{name}")
+        goals[name] = solver.Add(sum(plan_minutes(plan, name) * days[c] for c, (plan, _) in enumerate(candidates))
+                                 + shortfall >= week_target(target, range(week_length)))
+        solver.Objective().SetCoefficient(shortfall, -SHORTFALL_PENALTY)
+    for c, (_, value) in enumerate(candidates):
+        solver.Objective().SetCoefficient(days[c], value)
+    solver.Objective().SetMaximization()
+    solver.Solve()
+    return {name: -goal.dual_value() for name, goal in goals.items()}, week.dual_value()
+
+
+def generate_day_plans(candidates, targets, week_length, solve_day):
+    """
+    Add day plans to `candidates` for a week of `week_length` days.
+
+    `solve_day(prices, minimums)` solves the day model, as solve_day_model, with `prices`
+    added to the objective weights of those activities and `minimums` as lower bounds
+    on their durations. The first plan spreads every weekly goal evenly over the week,
+    so it meets them all on its own if the day has room. Column generation then adds
+    plans for the master LP's dual prices of the goal activities, for as long as they
+    are worth more than the LP's price of a day and at most MAX_PRICING_ROUNDS times.
+    """
+    def add(result, prices):
+        if result is None or any(result[0] == plan for plan, _ in candidates):
+            return False
+        plan, priced_value = result
+        candidates.append((plan, priced_value - sum(price * plan_minutes(plan, name) for name, price in prices.items())))
+        return True
+
+    even_share = {name: -(-week_target(target, range(week_length)) // week_length) for name, target in targets.items()}
+    add(solve_day({}, even_share), {})
+    for _ in range(MAX_PRICING_ROUNDS):
+        prices, day_price = _master_prices(candidates, targets, week_length)
+        result = solve_day(prices, {})
+        if result is None or result[1] <= day_price + 1e-6 or not add(result, prices):
+            return
+
+
+def _choose_day_plans(candidates, targets, week, time_limit_seconds):
+    """Master problem: pick one candidate day plan per day of a week to meet the weekly targets."""
+    model = cp_model.CpModel()
+    chosen = {(day, c): model.NewBoolVar(f"plan_{c}_day{day}") for day in week for c in range(len(candidates))}
+    for day in week:
+        model.AddExactlyOne(chosen[day, c] for c in range(len(candidates)))
+    for name, target in targets.items():
+        minutes = [plan_minutes(plan, name) for plan, _ in candidates]
+        model.Add(sum(minutes[c] * chosen[day, c] for day in week for c in range(len(candidates)))
+                  >= week_target(target, week))
+    model.Maximize(sum(value * chosen[day, c] for day in week for c, (_, value) in enumerate(candidates)))
+
+    solver = cp_model.CpSolver()
+    solver.parameters.max_time_in_seconds = time_limit_seconds
+    if solver.Solve(model) not in (cp_model.OPTIMAL, cp_model.FEASIBLE):
+        return None
+    return [next(c for c in range(len(candidates)) if solver.Value(chosen[day, c])) for day in week]
+
+
+def solve_pcop_decomposed(pcop_data, solver_options, workers=None, debug=True):
+    """
+    Solve the horizon one day at a time instead of as one model.
+
+    Every day has the same activities and constraints and only weekly goals link days,
+    so a single day model stands for all of them. It is solved once as is and once per
+    weekly goal with that activity (and, with several goals, all of them) at its daily
+    maximum, in parallel processes. generate_day_plans adds a plan with the goals spread
+    evenly over the week and plans priced by the goals' duals, then a small master
+    problem per week picks one candidate plan for each day so that the goals are met.
+    Picking among generated plans is a heuristic: the schedule can fall short of the
+    full model's optimum, and when no combination meets the goals the full model is
+    solved instead.
+    Returns the schedule in the same form as solve_pcop_model, or None.
+    """
+    _, num_days = planning_days(pcop_data)
+    targets = weekly_targets(pcop_data)
+    variants = day_variants(targets)
+    time_limit_seconds = solver_options['time_limit_seconds']
+    tasks = [(pcop_data, variant, time_limit_seconds) for variant in variants]
+
+    if debug:
+        print(f"Solving {len(variants)} day model(s) for {num_days} days...")
+    if len(tasks) == 1 or workers == 1:
+        results = list(map(_solve_day_variant, tasks))
+    else:
+        with ProcessPoolExecutor(max_workers=min(workers or os.cpu_count(), len(tasks))) as executor:
+            results = list(executor.map(_solve_day_variant, tasks))
+
+    if results[0] is None:
+        if debug:
+            print("No feasible day plan found.")
+        return None
+    candidates = [result for result in results if result is not None]
+
+    schedule = plan_weeks(candidates, targets, num_days, time_limit_seconds,
+                          lambda prices, minimums: _solve_priced_day(pcop_data, prices, minimums, time_limit_seconds))
+    if schedule is None:
+        if debug:
+            print("Weekly goals cannot be met with the candidate day plans, solving the full model...")
+        model, activity_intervals, num_days = create_pcop_model(pcop_data, debug=False)
+        schedule = solve_pcop_model(model, activity_intervals, num_days, solver_options, debug=debug)
+    return schedule
+
+
+def day_variants(targets):
+    """The activities forced to their daily maximum in each candidate day plan."""
+    return [()] + [(name,) for name in targets] + ([tuple(targets)] if len(targets) > 1 else [])
+
+
+def plan_weeks(candidates, targets, num_days, time_limit_seconds, solve_day=None):
+    """
+    Assemble the horizon from candidate day plans, the first being the unconstrained one, or None.
+
+    With `solve_day`, generate_day_plans first adds candidates for every week length in
+    which the unconstrained plan, the best day there is, misses a goal.
+    """
+    weeks = planning_weeks(num_days)
+    if targets and solve_day is not None:
+        for week_length in sorted({len(week) for week in weeks}, reverse=True):
+            if any(plan_minutes(candidates[0][0], name) * week_length < week_target(target, range(week_length))
+                   for name, target in targets.items()):
+                generate_day_plans(candidates, targets, week_length, solve_day)
+
+    # Weeks of the same length face the same master problem
+    plans = {}
+    schedule = []
+    for week in weeks:
+        if len(week) not in plans:
+            plans[len(week)] = _choose_day_plans(candidates, targets, range(len(week)),
+                                                 time_limit_seconds) if targets else [0] * len(week)
+        if plans[len(week)] is None:
+            return None
+        schedule += [list(candidates[c][0]) for c in plans[len(week)]]
+    return schedule
+
+
+def schedule_objective(pcop_data, schedule):
+    """Objective value of a schedule, as maximised by the models."""
+    weights = {activity['name']: activity_weight(pcop_data, activity) for activity in pcop_data['pcop_data']['activities']}
+    return sum(weights[activity] * duration for day_schedule in schedule for activity, _, duration in day_schedule)
+
+
 # Modify the main function to use debug mode
 
 
-def main():
+def main(decompose=False):
     pcop_data = load_pcop_data('personal-calendar-optimizer/pcop.json')
-    
-    model, activity_intervals, num_days = create_pcop_model(pcop_data, debug=True)
-    schedule = solve_pcop_model(model, activity_intervals, num_days, pcop_data['solver_options'], debug=True)
+
+    if decompose:
+        schedule = solve_pcop_decomposed(pcop_data, pcop_data['solver_options'], debug=True)
+    else:
+        model, activity_intervals, num_days = create_pcop_model(pcop_data, debug=True)
+        schedule = solve_pcop_model(model, activity_intervals, num_days, pcop_data['solver_options'], debug=True)
 
     if schedule:
         print("\nFeasible solution found!")
@@ -284,4 +517,5 @@ def main():
         print("\nNo feasible solution found.")
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    import sys
+    main(decompose='--decompose' in sys.argv[1:])
\ No newline at end of file
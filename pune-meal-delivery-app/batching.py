@@ -0,0 +1,88 @@
+import numpy as np
+from matching import EARTH_RADIUS
+
+SPEED_KMPH = 20  # Average rider speed, as in simulate.generate_orders
+KM_PER_DEGREE = 111.2
+
+def haversine_pairs(lat1, lon1, lat2, lon2):
+    """Distances in km between (lat1[k], lon1[k]) and (lat2[k], lon2[k]) for every k."""
+    lat1, lon1, lat2, lon2 = map(np.radians, [lat1, lon1, lat2, lon2])
+    a = np.sin((lat2 - lat1) / 2)**2 + np.cos(lat1) * np.cos(lat2) * np.sin((lon2 - lon1) / 2)**2
+    return EARTH_RADIUS * 2 * np.arctan2(np.sqrt(a), np.sqrt(1 - a))
+
+def grid_cells(lat, lon, cell_km):
+    """Integer (row, column) of each point on a grid of roughly cell_km x cell_km squares."""
+    row = np.floor(lat * KM_PER_DEGREE / cell_km)
+    col = np.floor(lon * KM_PER_DEGREE * np.cos(np.radians(lat)) / cell_km)
+    return row.astype(np.int64), col.astype(np.int64)
+
+def bundle_orders(zones, restaurant_lat, restaurant_lon, customer_lat, customer_lon, max_bundle, cell_km):
+    """
+    Group orders of the same zone whose restaurants share a grid cell and whose customers
+    share a grid cell into bundles of at most `max_bundle`, keeping the input order inside
+    each group.
+
+    Returns (members, offsets): bundle b is members[offsets[b]:offsets[b + 1]], given as
+    positions into the input arrays.
+    """
+    if len(zones) == 0:
+        return np.empty(0, dtype=int), np.zeros(1, dtype=int)
+
+    keys = np.column_stack([zones, *grid_cells(restaurant_lat, restaurant_lon, cell_km),
+                            *grid_cells(customer_lat, customer_lon, cell_km)])
+    _, group = np.unique(keys, axis=0, return_inverse=True)
+    members = np.argsort(group.ravel(), kind='stable')
+
+    # Rank of each order inside its group; a new bundle starts every max_bundle orders
+    group_sorted = group.ravel()[members]
+    group_start = np.flatnonzero(np.r_[True, group_sorted[1:] != group_sorted[:-1]])
+    rank = np.arange(len(members)) - np.repeat(group_start, np.diff(np.r_[group_start, len(members)]))
+    offsets = np.r_[np.flatnonzero(rank % max_bundle == 0), len(members)]
+    return members, offsets
+
+def plan_routes(members, offsets, restaurant_lat, restaurant_lon, customer_lat, customer_lon,
+                preparation_time, delivery_time):
+    """
+    Route every bundle: pick up at its restaurants in order, then drop at the nearest
+    remaining customer each time. Single orders keep their own estimated delivery time.
+
+    Returns (route_km, busy_minutes, last_stop) per bundle and drop_minutes per member, where
+    drop_minutes is the time from dispatch to that member's drop-off and last_stop is the
+    position of the bundle's final customer.
+    """
+    sizes = np.diff(offsets)
+    first = members[offsets[:-1]]
+    route_km = haversine_pairs(restaurant_lat[first], restaurant_lon[first], customer_lat[first], customer_lon[first])
+    busy_minutes = delivery_time[first].astype(float)
+    last_stop = first.copy()
+    drop_minutes = delivery_time[members].astype(float)
+
+    # Bundles of equal size are routed together, one drop-off per step
+    for size in np.unique(sizes[sizes > 1]):
+        bundles = np.flatnonzero(sizes == size)
+        slots = offsets[bundles][:, None] + np.arange(size)
+        bundle = members[slots]
+        pickups = haversine_pairs(restaurant_lat[bundle[:, :-1]], restaurant_lon[bundle[:, :-1]],
+                                  restaurant_lat[bundle[:, 1:]], restaurant_lon[bundle[:, 1:]]).sum(axis=1)
+
+        # Nearest-neighbour drop sequence from the last restaurant
+        km = pickups
+        at_lat, at_lon = restaurant_lat[bundle[:, -1]], restaurant_lon[bundle[:, -1]]
+        visited = np.zeros(bundle.shape, dtype=bool)
+        drops = np.empty(bundle.shape)
+        rows = np.arange(len(bundles))
+        for _ in range(size):
+            legs = haversine_pairs(at_lat[:, None], at_lon[:, None], customer_lat[bundle], customer_lon[bundle])
+            nearest = np.where(visited, np.inf, legs).argmin(axis=1)
+            km = km + legs[rows, nearest]
+            drops[rows, nearest] = km
+            visited[rows, nearest] = True
+            at_lat, at_lon = customer_lat[bundle[rows, nearest]], customer_lon[bundle[rows, nearest]]
+
+        ready = preparation_time[bundle].max(axis=1)
+        route_km[bundles] = km
+        drop_minutes[slots] = ready[:, None] + drops / SPEED_KMPH * 60
+        busy_minutes[bundles] = ready + km / SPEED_KMPH * 60
+        last_stop[bundles] = bundle[rows, nearest]
+
+    return route_km, busy_minutes, last_stop, drop_minutes
@@ -0,0 +1,59 @@
+import sys
+import time
+import numpy as np
+import pandas as pd
+from datetime import datetime
+from simulate import generate_restaurants, generate_agents, generate_orders
+from dispatch_simulator import DispatchSimulator
+
+# Replay one generate_orders stream through the dispatch simulator with the 1:1 matcher and
+# with batch-window bundling, and compare throughput, delivery time and dispatch latency.
+# Usage: python benchmark_batching.py [orders_per_minute] [agents] [minutes]
+
+# (label, window_minutes, max_bundle, cell_km)
+DISPATCH_MODES = [
+    ('1:1', 1, 1, 1.0),
+    ('window 2, bundle 3, 1 km', 2, 3, 1.0),
+    ('window 3, bundle 3, 1 km', 3, 3, 1.0),
+    ('window 3, bundle 3, 2 km', 3, 3, 2.0),
+]
+
+def replay(orders, agents, start_time, minutes, window_minutes, max_bundle, cell_km):
+    simulator = DispatchSimulator(orders, agents, start_time, window_minutes, max_bundle, cell_km)
+    step_ms = []
+    for minute in range(minutes):
+        started = time.perf_counter()
+        simulator.step(minute)
+        if (minute + 1) % window_minutes == 0:
+            step_ms.append((time.perf_counter() - started) * 1000)
+
+    assignments = simulator.assignments()
+    return {
+        'assigned': len(assignments),
+        'pending': len(simulator.pending),
+        'orders/agent-hour': len(assignments) / (simulator.busy_minutes / 60) if simulator.busy_minutes else 0,
+        'avg delivery (min)': assignments['time_to_deliver'].mean(),
+        'p90 delivery (min)': assignments['time_to_deliver'].quantile(0.9),
+        'dispatch p50 (ms)': np.median(step_ms),
+        'dispatch max (ms)': np.max(step_ms),
+    }
+
+def benchmark_batching(orders_per_minute=200, num_agents=3000, minutes=120, seed=0):
+    np.random.seed(seed)
+    start_time = datetime(2023, 7, 16, 12, 0, 0)
+    restaurants = generate_restaurants()
+    agents = generate_agents(num_agents=num_agents, start_time=start_time)
+    orders = generate_orders(restaurants, start_time, duration_minutes=minutes, orders_per_minute=orders_per_minute)
+
+    rows = []
+    for label, window_minutes, max_bundle, cell_km in DISPATCH_MODES:
+        rows.append({'mode': label, **replay(orders, agents, start_time, minutes, window_minutes, max_bundle, cell_km)})
+    return pd.DataFrame(rows)
+
+if __name__ == "__main__":
+    orders_per_minute = int(sys.argv[1]) if len(sys.argv) > 1 else 200
+    num_agents = int(sys.argv[2]) if len(sys.argv) > 2 else 3000
+    minutes = int(sys.argv[3]) if len(sys.argv) > 3 else 120
+    results = benchmark_batching(orders_per_minute, num_agents, minutes)
+    print(f"{orders_per_minute} orders/minute, {num_agents} agents, {minutes} minutes")
+    print(results.to_string(index=False, float_format=lambda v: f"{v:.2f}"))
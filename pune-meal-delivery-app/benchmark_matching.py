@@ -0,0 +1,58 @@
+import os
+import sys
+import time
+import platform
+import scipy
+import logging
+import numpy as np
+import pandas as pd
+from datetime import datetime, timedelta
+from simulate import generate_restaurants, generate_agents, generate_orders
+from matching import optimize_assignments, update_agent_status
+
+# Per-minute latency of the zone-filtered assignment matcher, at our current volume
+# (1,000 agents, 20 orders/minute) and multiples of it. Timings depend on the machine, so
+# the run prints the CPU, core count and library versions it was measured with.
+# Usage: python benchmark_matching.py [minutes] [scale ...]
+
+def benchmark_matching(scale, minutes=30, seed=0):
+    np.random.seed(seed)
+    start_time = datetime(2023, 7, 16, 12, 0, 0)
+    restaurants = generate_restaurants()
+    agents = generate_agents(num_agents=1000 * scale, start_time=start_time)
+
+    match_ms, tick_ms, assigned, total = [], [], 0, 0
+    for minute in range(minutes):
+        current_time = pd.Timestamp(start_time + timedelta(minutes=minute))
+        orders = generate_orders(restaurants, current_time, orders_per_minute=20 * scale)
+
+        started = time.perf_counter()
+        assignments = optimize_assignments(orders, agents, current_time)
+        matched = time.perf_counter()
+        agents, orders = update_agent_status(agents, assignments, current_time, orders)
+        finished = time.perf_counter()
+
+        match_ms.append((matched - started) * 1000)
+        tick_ms.append((finished - started) * 1000)
+        assigned += len(assignments)
+        total += len(orders)
+
+    return {
+        'scale': scale,
+        'agents': len(agents),
+        'orders/min': 20 * scale,
+        'match p50 (ms)': np.median(match_ms),
+        'match max (ms)': np.max(match_ms),
+        'tick p50 (ms)': np.median(tick_ms),
+        'tick max (ms)': np.max(tick_ms),
+        'assigned': assigned / total,
+    }
+
+if __name__ == "__main__":
+    logging.disable(logging.INFO)
+    minutes = int(sys.argv[1]) if len(sys.argv) > 1 else 30
+    scales = [int(s) for s in sys.argv[2:]] or [1, 10]
+    print(f"{platform.processor() or platform.machine()}, {os.cpu_count()} CPUs, Python {platform.python_version()}, "
+          f"NumPy {np.__version__}, SciPy {scipy.__version__}, pandas {pd.__version__}")
+    results = pd.DataFrame([benchmark_matching(scale, minutes) for scale in scales])
+    print(results.to_string(index=False, float_format=lambda v: f"{v:.2f}"))
@@ -0,0 +1,229 @@
+import csv
+import heapq
+import logging
+import numpy as np
+import pandas as pd
+from matching import COST_WEIGHTS, order_costs, assign_by_zone
+from batching import haversine_pairs, bundle_orders, plan_routes
+
+# Columns of the per-minute KPI stream, in order
+KPI_FIELDS = ['minute', 'new_orders', 'assigned_orders', 'bundles', 'pending_orders', 'order_fulfillment_rate',
+              'average_wait', 'average_delivery_time', 'average_distance', 'agent_utilization', 'revenue']
+
+class DispatchSimulator:
+    """
+    Minute-by-minute dispatch simulation over array-backed state.
+
+    Agents and orders live in NumPy arrays indexed by position (agents in the order given,
+    orders sorted by time). Busy agents sit in a heap keyed on the minute they finish their
+    delivery and are released back into the pool when the clock passes it. Orders that
+    find no free agent in their zone stay in the pending queue and are offered again the
+    next minute. `run` yields one KPI row per simulated minute.
+
+    With `window_minutes` > 1 orders are collected and only dispatched at the end of each
+    window. With `max_bundle` > 1 orders whose restaurants and customers share a grid cell
+    of `cell_km` are bundled and a single agent picks up and delivers the whole bundle
+    (see batching.py); the defaults reproduce one-order-per-agent matching every minute.
+    """
+
+    def __init__(self, orders, agents, start_time, window_minutes=1, max_bundle=1, cell_km=1.0):
+        self.start_time = pd.Timestamp(start_time)
+        self.window_minutes = window_minutes
+        self.max_bundle = max_bundle
+        self.cell_km = cell_km
+
+        orders = orders.sort_values('time', kind='stable')
+        self.order_id = orders['order_id'].to_numpy()
+        self.order_minute_exact = ((orders['time'] - self.start_time) / pd.Timedelta(minutes=1)).to_numpy()
+        self.order_minute = np.floor(self.order_minute_exact).astype(int)
+        zone_codes, self.zones = pd.factorize(pd.concat([orders['zone'], agents['zone']], ignore_index=True))
+        self.order_zone = zone_codes[:len(orders)]
+        self.restaurant_lat = orders['restaurant_latitude'].to_numpy()
+        self.restaurant_lon = orders['restaurant_longitude'].to_numpy()
+        self.customer_lat = orders['customer_latitude'].to_numpy()
+        self.customer_lon = orders['customer_longitude'].to_numpy()
+        self.delivery_time = orders['estimated_delivery_time'].to_numpy()
+        self.preparation_time = orders['preparation_time'].to_numpy()
+        self.earning = orders['agent_earning'].to_numpy()
+        self.order_cost = order_costs(orders)
+        self.assigned_agent = np.full(len(orders), -1)
+        self.assigned_minute = np.full(len(orders), -1)
+        self.distance = np.full(len(orders), np.nan)
+        self.delivered_minute = np.full(len(orders), np.nan)
+
+        self.agent_id = agents['agent_id'].to_numpy()
+        self.agent_zone = zone_codes[len(orders):]
+        self.agent_lat = agents['current_latitude'].to_numpy(dtype=float).copy()
+        self.agent_lon = agents['current_longitude'].to_numpy(dtype=float).copy()
+        self.daily_orders = agents['daily_orders'].to_numpy().copy()
+        self.daily_earnings = agents['daily_earnings'].to_numpy(dtype=float).copy()
+        free_at = (agents['next_available_time'] - self.start_time) / pd.Timedelta(minutes=1)
+        self.free_at = free_at.to_numpy(dtype=float).copy()
+        self.available = self.free_at <= 0
+        self.busy_minutes = 0.0
+
+        # (release minute, agent position) of every busy agent
+        self.busy = [(self.free_at[k], k) for k in np.flatnonzero(~self.available)]
+        heapq.heapify(self.busy)
+        self.pending = np.empty(0, dtype=int)
+
+        # Orders are sorted by time, so each minute's arrivals are a contiguous slice
+        self.minute_start = np.searchsorted(self.order_minute, np.arange(self.order_minute.max(initial=-1) + 2))
+
+    def step(self, minute):
+        """Advance the clock to `minute`, dispatch what can be dispatched and return its KPI row."""
+        while self.busy and self.busy[0][0] <= minute:
+            _, k = heapq.heappop(self.busy)
+            self.available[k] = True
+
+        if minute + 1 < len(self.minute_start):
+            arrivals = np.arange(self.minute_start[minute], self.minute_start[minute + 1])
+        else:
+            arrivals = np.empty(0, dtype=int)
+        pending = np.concatenate([self.pending, arrivals])
+        self.pending = pending
+        if (minute + 1) % self.window_minutes != 0 or len(pending) == 0:
+            return self.kpis(minute, arrivals, pending, np.empty(0, dtype=int), np.empty(0), 0)
+
+        # Every pending order is its own bundle unless bundling is switched on
+        if self.max_bundle > 1:
+            members, offsets = bundle_orders(self.order_zone[pending], self.restaurant_lat[pending],
+                                             self.restaurant_lon[pending], self.customer_lat[pending],
+                                             self.customer_lon[pending], self.max_bundle, self.cell_km)
+            members = pending[members]
+        else:
+            members, offsets = pending, np.arange(len(pending) + 1)
+        sizes = np.diff(offsets)
+        first = members[offsets[:-1]]
+        route_km, busy_minutes, last_stop, drop_minutes = plan_routes(
+            members, offsets, self.restaurant_lat, self.restaurant_lon, self.customer_lat, self.customer_lon,
+            self.preparation_time, self.delivery_time)
+
+        # Cost per order delivered, including how far the bundle's route detours from direct deliveries
+        direct_km = np.add.reduceat(haversine_pairs(self.restaurant_lat[members], self.restaurant_lon[members],
+                                                    self.customer_lat[members], self.customer_lon[members]),
+                                    offsets[:-1])
+        bundle_cost = (np.add.reduceat(self.order_cost[members], offsets[:-1]) +
+                       COST_WEIGHTS['distance'] * (route_km - direct_km)) / sizes
+
+        free = np.flatnonzero(self.available)
+        bundle_rows, agent_rows, distances = assign_by_zone(
+            self.order_zone[first], self.restaurant_lat[first], self.restaurant_lon[first],
+            bundle_cost, self.agent_zone[free], self.agent_lat[free], self.agent_lon[free])
+        agents = free[agent_rows]
+
+        # Spread each matched bundle's agent, distance and drop times over its orders
+        bundle_of = np.repeat(np.arange(len(sizes)), sizes)
+        agent_of = np.full(len(sizes), -1)
+        agent_of[bundle_rows] = agents
+        distance_of = np.zeros(len(sizes))
+        distance_of[bundle_rows] = distances
+        matched = agent_of[bundle_of] >= 0
+        orders = members[matched]
+
+        self.assigned_agent[orders] = agent_of[bundle_of[matched]]
+        self.assigned_minute[orders] = minute
+        self.distance[orders] = distance_of[bundle_of[matched]]
+        self.delivered_minute[orders] = minute + drop_minutes[matched]
+
+        # Agents end at their last customer and are busy until the route is done
+        self.available[agents] = False
+        self.agent_lat[agents] = self.customer_lat[last_stop[bundle_rows]]
+        self.agent_lon[agents] = self.customer_lon[last_stop[bundle_rows]]
+        self.free_at[agents] = minute + busy_minutes[bundle_rows]
+        self.busy_minutes += busy_minutes[bundle_rows].sum()
+        np.add.at(self.daily_orders, self.assigned_agent[orders], 1)
+        np.add.at(self.daily_earnings, self.assigned_agent[orders], self.earning[orders])
+        for k in agents:
+            heapq.heappush(self.busy, (self.free_at[k], k))
+
+        self.pending = members[~matched]
+        return self.kpis(minute, arrivals, pending, orders, distances, len(bundle_rows))
+
+    def kpis(self, minute, arrivals, offered, orders, distances, bundles):
+        assigned = len(orders)
+        return {
+            'minute': self.start_time + pd.Timedelta(minutes=minute),
+            'new_orders': len(arrivals),
+            'assigned_orders': assigned,
+            'bundles': bundles,
+            'pending_orders': len(self.pending),
+            'order_fulfillment_rate': assigned / len(offered) if len(offered) else 0,
+            'average_wait': float(np.mean(minute - self.order_minute[orders])) if assigned else 0,
+            'average_delivery_time': float(np.mean(self.delivered_minute[orders] - minute)) if assigned else 0,
+            'average_distance': float(np.mean(distances)) if bundles else 0,
+            'agent_utilization': 1 - self.available.mean(),
+            'revenue': float(self.earning[orders].sum()),
+        }
+
+    def run(self, minutes):
+        """Simulate `minutes` minutes from the start time, yielding each minute's KPI row as it completes."""
+        for minute in range(minutes):
+            yield self.step(minute)
+
+    def assignments(self):
+        """Every assignment made so far, one row per assigned order."""
+        orders = np.flatnonzero(self.assigned_agent >= 0)
+        agents = self.assigned_agent[orders]
+        return pd.DataFrame({
+            'order_id': self.order_id[orders],
+            'agent_id': self.agent_id[agents],
+            'assigned_time': self.start_time + pd.to_timedelta(self.assigned_minute[orders], unit='min'),
+            'estimated_delivery_time': self.delivery_time[orders],
+            'time_to_deliver': self.delivered_minute[orders] - self.order_minute_exact[orders],
+            'distance': self.distance[orders],
+            'agent_earning': self.earning[orders],
+            'delivered_time': self.start_time + pd.to_timedelta(self.delivered_minute[orders], unit='min'),
+            'order_zone': self.zones[self.order_zone[orders]],
+            'agent_zone': self.zones[self.agent_zone[agents]],
+        })
+
+    def update_agents(self, agents):
+        """Copy the simulated agent state back onto the agents frame it was built from."""
+        agents = agents.copy()
+        agents['current_latitude'] = self.agent_lat
+        agents['current_longitude'] = self.agent_lon
+        agents['daily_orders'] = self.daily_orders
+        agents['daily_earnings'] = self.daily_earnings
+        agents['next_available_time'] = (self.start_time + pd.to_timedelta(self.free_at, unit='min')).round('s')
+        agents['status'] = np.where(self.available, 'available', 'busy')
+        return agents
+
+def stream_kpis(kpis, path):
+    """Write KPI rows to CSV as they are produced, flushing after each minute."""
+    with open(path, 'w', newline='') as f:
+        writer = csv.DictWriter(f, fieldnames=KPI_FIELDS)
+        writer.writeheader()
+        for row in kpis:
+            writer.writerow(row)
+            f.flush()
+            yield row
+
+if __name__ == "__main__":
+    import sys
+    import time
+    from datetime import datetime
+    from simulate import generate_restaurants, generate_agents, generate_orders
+
+    # Simulate a full day: python dispatch_simulator.py [orders_per_minute] [agents]
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+    orders_per_minute = int(sys.argv[1]) if len(sys.argv) > 1 else 21
+    num_agents = int(sys.argv[2]) if len(sys.argv) > 2 else 1000
+    start_time = datetime(2023, 7, 16, 0, 0, 0)
+
+    restaurants = generate_restaurants()
+    agents = generate_agents(num_agents=num_agents, start_time=start_time)
+    orders = generate_orders(restaurants, start_time, duration_minutes=24 * 60, orders_per_minute=orders_per_minute)
+    logging.info(f"Generated {len(orders)} orders for {num_agents} agents")
+
+    started = time.perf_counter()
+    simulator = DispatchSimulator(orders, agents, start_time)
+    for kpis in stream_kpis(simulator.run(24 * 60), 'daily_kpis.csv'):
+        pass
+    elapsed = time.perf_counter() - started
+
+    assignments = simulator.assignments()
+    assignments.to_csv('daily_assignments.csv', index=False)
+    simulator.update_agents(agents).to_csv('daily_updated_agents.csv', index=False)
+    logging.info(f"Simulated the day in {elapsed:.2f}s: {len(assignments)} of {len(orders)} orders assigned, "
+                 f"{len(simulator.pending)} still pending")
@@ -3,58 +3,27 @@ import numpy as np
 from datetime import datetime, timedelta
 import logging
 from simulate import generate_restaurants, generate_agents, generate_orders
-from model_pulp import optimize_assignments, update_agent_status
+from dispatch_simulator import DispatchSimulator
 import matplotlib.pyplot as plt
 import seaborn as sns
 
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 
-def calculate_kpis(assignments, all_orders, agents, minute):
-    total_orders = len(all_orders[all_orders['time'].dt.floor('min') == minute])
-    assigned_orders = len(assignments)
-    
-    kpis = {
-        'minute': minute,
-        'order_fulfillment_rate': assigned_orders / total_orders if total_orders > 0 else 0,
-        'average_delivery_time': np.mean([a['estimated_delivery_time'] for a in assignments]) if assignments else 0,
-        'average_distance': np.mean([a['distance'] for a in assignments]) if assignments else 0,
-        'agent_utilization': len(agents[agents['status'] == 'busy']) / len(agents),
-        'revenue': sum([a['agent_earning'] for a in assignments])
-    }
-    return kpis
-
-def run_hourly_optimization(restaurants, agents, start_time):
-    all_assignments = []
-    all_orders = pd.DataFrame()
-    current_time = start_time
-    kpis_list = []
-
-    for minute in range(60):
-        logging.info(f"Optimizing for minute {minute + 1}, time: {current_time}")
-
-        new_orders = generate_orders(restaurants, current_time, duration_minutes=1, orders_per_minute=20)
-        all_orders = pd.concat([all_orders, new_orders], ignore_index=True)
+def run_hourly_optimization(restaurants, agents, start_time, orders_per_minute=20, minutes=60):
+    all_orders = generate_orders(restaurants, start_time, duration_minutes=minutes, orders_per_minute=orders_per_minute)
+    simulator = DispatchSimulator(all_orders, agents, start_time)
 
-        assignments = optimize_assignments(all_orders, agents, current_time)
-
-        if assignments:
-            all_assignments.extend(assignments)
-            try:
-                agents, all_orders = update_agent_status(agents, assignments, current_time, all_orders)
-                logging.info(f"Minute {minute + 1}: Assigned {len(assignments)} orders")
-            except Exception as e:
-                logging.error(f"Error updating agent status: {str(e)}")
-                logging.info("Continuing to next minute...")
-        else:
-            logging.info(f"Minute {minute + 1}: No assignments made")
-
-        # Calculate and store KPIs
-        kpis = calculate_kpis(assignments, all_orders, agents, current_time)
+    kpis_list = []
+    for kpis in simulator.run(minutes):
+        logging.info(f"Minute {kpis['minute']}: Assigned {kpis['assigned_orders']} orders, "
+                     f"{kpis['pending_orders']} pending")
         kpis_list.append(kpis)
 
-        current_time += timedelta(minutes=1)
+    assignments = simulator.assignments()
+    all_orders = all_orders.sort_values('time', kind='stable').reset_index(drop=True)
+    all_orders['status'] = np.where(simulator.assigned_agent >= 0, 'assigned', 'pending')
 
-    return all_assignments, agents, all_orders, pd.DataFrame(kpis_list)
+    return assignments.to_dict('records'), simulator.update_agents(agents), all_orders, pd.DataFrame(kpis_list)
 
 def create_dashboard(kpis_df):
     plt.figure(figsize=(20, 15))
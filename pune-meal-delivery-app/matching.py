@@ -0,0 +1,143 @@
+import pandas as pd
+import numpy as np
+from scipy.optimize import linear_sum_assignment
+import logging
+
+EARTH_RADIUS = 6371  # Earth's radius in kilometers
+
+# Weights of the per-pair assignment cost, as in the Gurobi model
+COST_WEIGHTS = {
+    'estimated_delivery_time': 0.3,
+    'customer_rating': 0.2,
+    'distance': 0.3,
+    'agent_earning': 0.2,
+}
+
+def pending_orders(orders, current_time):
+    minute = current_time.floor('min')
+    return orders[(orders['time'].dt.floor('min') == minute) & (orders['status'] == 'pending')]
+
+def available_agents(agents, current_time):
+    return agents[agents['next_available_time'] <= current_time]
+
+def order_costs(orders):
+    """Order-only terms of the assignment cost, which do not depend on the agent."""
+    return (COST_WEIGHTS['estimated_delivery_time'] * orders['estimated_delivery_time'].to_numpy() +
+            COST_WEIGHTS['customer_rating'] / orders['customer_rating'].to_numpy() +
+            COST_WEIGHTS['agent_earning'] / orders['agent_earning'].to_numpy())
+
+def unit_vectors(lat, lon):
+    """Points on the unit sphere, as an (n, 3) array, for degrees of latitude and longitude."""
+    lat, lon = np.radians(lat), np.radians(lon)
+    return np.column_stack((np.cos(lat) * np.cos(lon), np.cos(lat) * np.sin(lon), np.sin(lat)))
+
+def nearest_candidates(chords):
+    """
+    Positions of the agents that are among the n nearest of some order, for n orders, from
+    the (orders, agents) matrix of squared chord lengths between them.
+
+    The matching cost of a pair is its distance plus a term of the order alone, so an
+    optimal matching never gives an order an agent beyond its n nearest: one of those is
+    always left free for it.
+    """
+    n, num_agents = chords.shape
+    if num_agents <= n:
+        return np.arange(num_agents)
+    return np.unique(np.argpartition(chords, n - 1, axis=1)[:, :n])
+
+def assign_by_zone(order_zones, order_lat, order_lon, order_cost, agent_zones, agent_lat, agent_lon):
+    """
+    Min-cost one-to-one matching of orders to agents of the same zone, on plain arrays.
+
+    Distances come from one matrix product of unit vectors per zone, as squared chord
+    lengths, which convert exactly to great-circle distances; only the agents of
+    nearest_candidates are costed. Returns (order_rows, agent_rows, distances): positions
+    into the order and agent arrays of every matched pair and the restaurant-agent
+    distance of each pair.
+    """
+    order_points, agent_points = unit_vectors(order_lat, order_lon), unit_vectors(agent_lat, agent_lon)
+    zone_codes, _ = pd.factorize(np.concatenate([order_zones, agent_zones]))
+    order_codes, agent_codes = zone_codes[:len(order_zones)], zone_codes[len(order_zones):]
+
+    order_rows, agent_rows, pair_distances = [np.empty(0, dtype=int)], [np.empty(0, dtype=int)], [np.empty(0)]
+    for zone in np.unique(order_codes):
+        zone_orders = np.flatnonzero(order_codes == zone)
+        zone_agents = np.flatnonzero(agent_codes == zone)
+        if len(zone_agents) == 0:
+            continue
+
+        chords = 2 - 2 * order_points[zone_orders] @ agent_points[zone_agents].T
+        candidates = nearest_candidates(chords)
+        zone_agents = zone_agents[candidates]
+        distances = EARTH_RADIUS * 2 * np.arcsin(np.sqrt(np.clip(chords[:, candidates], 0, 4)) / 2)
+        cost = COST_WEIGHTS['distance'] * distances + order_cost[zone_orders, None]
+        rows, cols = linear_sum_assignment(cost)
+        order_rows.append(zone_orders[rows])
+        agent_rows.append(zone_agents[cols])
+        pair_distances.append(distances[rows, cols])
+
+    return np.concatenate(order_rows), np.concatenate(agent_rows), np.concatenate(pair_distances)
+
+def optimize_assignments(orders, agents, current_time):
+    """
+    Assign this minute's pending orders to available agents of the same zone.
+
+    Drop-in replacement for the MIP matchers in model.py and model_pulp.py. Only same-zone
+    pairs are ever costed, and each zone is an independent rectangular assignment problem,
+    solved exactly with the Hungarian algorithm. As many orders as the zone has free agents
+    are served, at minimum total weighted cost.
+    """
+    relevant_orders = pending_orders(orders, current_time)
+    free_agents = available_agents(agents, current_time)
+
+    if relevant_orders.empty or free_agents.empty:
+        logging.warning(f"No relevant orders or agents at {current_time}")
+        return []
+
+    logging.info(f"Matching {len(relevant_orders)} orders against {len(free_agents)} available agents")
+
+    order_rows, agent_rows, distances = assign_by_zone(
+        relevant_orders['zone'].to_numpy(), relevant_orders['restaurant_latitude'].to_numpy(),
+        relevant_orders['restaurant_longitude'].to_numpy(), order_costs(relevant_orders),
+        free_agents['zone'].to_numpy(), free_agents['current_latitude'].to_numpy(),
+        free_agents['current_longitude'].to_numpy())
+
+    if len(order_rows) == 0:
+        logging.warning(f"No available agents in the zones of the orders at {current_time}")
+        return []
+
+    assigned_orders, assigned_agents = relevant_orders.iloc[order_rows], free_agents.iloc[agent_rows]
+    columns = {
+        'order_id': assigned_orders['order_id'].tolist(),
+        'agent_id': assigned_agents['agent_id'].tolist(),
+        'estimated_delivery_time': assigned_orders['estimated_delivery_time'].tolist(),
+        'customer_rating': assigned_orders['customer_rating'].tolist(),
+        'distance': distances.tolist(),
+        'agent_earning': assigned_orders['agent_earning'].tolist(),
+        'order_zone': assigned_orders['zone'].tolist(),
+        'agent_zone': assigned_agents['zone'].tolist(),
+        'order_index': assigned_orders.index.tolist(),
+        'agent_index': assigned_agents.index.tolist(),
+    }
+    assignments = [dict(zip(columns, row)) for row in zip(*columns.values())]
+    logging.info(f"Found {len(assignments)} assignments")
+    return assignments
+
+def update_agent_status(agents, assignments, current_time, orders):
+    """Same updates as model.update_agent_status, applied to all assignments at once by row label."""
+    if not assignments:
+        return agents, orders
+
+    agent_index = [assignment['agent_index'] for assignment in assignments]
+    order_index = [assignment['order_index'] for assignment in assignments]
+
+    # Agents move to the delivery location and are busy until the delivery is done
+    agents.loc[agent_index, ['current_latitude', 'current_longitude']] = \
+        orders.loc[order_index, ['customer_latitude', 'customer_longitude']].to_numpy()
+    busy_for = pd.to_timedelta([assignment['estimated_delivery_time'] for assignment in assignments], unit='min')
+    agents.loc[agent_index, 'next_available_time'] = (current_time + busy_for).round('s')
+    agents.loc[agent_index, 'daily_orders'] += 1
+    agents.loc[agent_index, 'daily_earnings'] += [assignment['agent_earning'] for assignment in assignments]
+
+    orders.loc[order_index, 'status'] = 'assigned'
+    return agents, orders
@@ -4,6 +4,9 @@ from gurobipy import Model, GRB, quicksum
 from datetime import datetime, timedelta
 from math import radians, sin, cos, sqrt, atan2
 
+# Reference MIP formulation of the per-minute matching, with one variable per (order, agent)
+# pair. The simulations use the assignment matcher in matching.py instead.
+
 def haversine_distance(lat1, lon1, lat2, lon2):
     R = 6371  # Earth's radius in kilometers
     lat1, lon1, lat2, lon2 = map(radians, [lat1, lon1, lat2, lon2])
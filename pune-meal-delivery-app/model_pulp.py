@@ -5,6 +5,9 @@ from math import radians, sin, cos, sqrt, atan2
 from pulp import *
 import logging
 
+# Reference MIP formulation of the per-minute matching, with one variable per (order, agent)
+# pair. The simulations use the assignment matcher in matching.py instead.
+
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 
 def haversine_distance(lat1, lon1, lat2, lon2):
@@ -16,6 +16,20 @@ CHEFS = ["Sanjeev Kapoor", "Vikas Khanna", "Ranveer Brar", "Kunal Kapur", "Shipr
 CUISINES = ["North Indian", "South Indian", "Chinese", "Italian", "Continental", "Fast Food"]
 RESTAURANT_TYPES = ['Delight', 'Cuisine', 'Kitchen', 'Eatery', 'Bistro', 'Cafe', 'Restaurant']
 
+# Relative order volume by hour of day, with lunch and dinner peaks; averages 1 over the day
+HOURLY_DEMAND = np.array([0.3, 0.2, 0.1, 0.1, 0.1, 0.2, 0.4, 0.7, 0.9, 1.0, 1.1, 1.5,
+                          2.2, 2.4, 1.6, 1.0, 0.9, 1.0, 1.3, 1.9, 2.4, 2.2, 1.4, 0.7])
+HOURLY_DEMAND = HOURLY_DEMAND / HOURLY_DEMAND.mean()
+
+# Share of orders placed in each zone
+ZONE_DEMAND = {
+    "Central Pune": 0.30,
+    "East Pune": 0.20,
+    "West Pune": 0.20,
+    "North Pune": 0.15,
+    "South Pune": 0.15
+}
+
 def haversine_distance(lat1, lon1, lat2, lon2):
     R = 6371  # Earth's radius in kilometers
 
@@ -29,6 +43,11 @@ def haversine_distance(lat1, lon1, lat2, lon2):
 
     return distance
 
+def haversine_distances(lat1, lon1, lat2, lon2):
+    lat1, lon1, lat2, lon2 = map(np.radians, [lat1, lon1, lat2, lon2])
+    a = np.sin((lat2 - lat1) / 2)**2 + np.cos(lat1) * np.cos(lat2) * np.sin((lon2 - lon1) / 2)**2
+    return 6371 * 2 * np.arctan2(np.sqrt(a), np.sqrt(1 - a))
+
 def generate_restaurants(num_restaurants=1000):
     zones = list(ZONES.keys())
     zone_indices = np.random.randint(0, len(zones), num_restaurants)
@@ -45,11 +64,11 @@ def generate_restaurants(num_restaurants=1000):
     cuisines = np.random.choice(CUISINES, num_restaurants)
     types = np.random.choice(RESTAURANT_TYPES, num_restaurants)
     
-    names = [f"{chef}'s {cuisine} {type}" for chef, cuisine, type in zip(chefs, cuisines, types)]
+    names = pd.Series(chefs) + "'s " + pd.Series(cuisines) + " " + pd.Series(types)
     
     return pd.DataFrame({
         'zone': [zones[i] for i in zone_indices],
-        'name': names,
+        'name': names.to_numpy(),
         'latitude': lats,
         'longitude': lons
     })
@@ -85,8 +104,7 @@ def generate_orders(restaurants, start_time, duration_minutes=1, orders_per_minu
     num_orders = duration_minutes * orders_per_minute
     end_time = start_time + timedelta(minutes=duration_minutes)
     
-    order_times = [start_time + timedelta(seconds=np.random.randint(0, duration_minutes * 60)) for _ in range(num_orders)]
-    order_times.sort()
+    order_times = pd.Timestamp(start_time) + pd.to_timedelta(np.sort(np.random.randint(0, duration_minutes * 60, num_orders)), unit='s')
     
     restaurant_sample = restaurants.sample(n=num_orders, replace=True)
     
@@ -112,8 +130,8 @@ def generate_orders(restaurants, start_time, duration_minutes=1, orders_per_minu
     preparation_times = np.random.randint(10, 31, num_orders)  # Preparation time in minutes
     
     # Calculate actual distances using Haversine formula
-    distances = [haversine_distance(restaurant_sample.iloc[i]['latitude'], restaurant_sample.iloc[i]['longitude'],
-                                    customer_lats[i], customer_lons[i]) for i in range(num_orders)]
+    distances = haversine_distances(restaurant_sample['latitude'].to_numpy(), restaurant_sample['longitude'].to_numpy(),
+                                    customer_lats, customer_lons)
     distances = np.round(distances, 2)
     
     # Estimate delivery times based on actual distances
@@ -151,6 +169,150 @@ def generate_orders(restaurants, start_time, duration_minutes=1, orders_per_minu
         'status': 'pending'
     })
 
+def order_rates(start_time, duration_minutes, orders_per_minute=20):
+    """Expected orders per minute for every (minute, zone), shaped by HOURLY_DEMAND and ZONE_DEMAND."""
+    hours = (pd.Timestamp(start_time).hour * 60 + pd.Timestamp(start_time).minute + np.arange(duration_minutes)) // 60 % 24
+    shares = np.array([ZONE_DEMAND[zone] for zone in ZONES])
+    return orders_per_minute * HOURLY_DEMAND[hours][:, None] * shares[None, :]
+
+def generate_order_arrays(restaurants, start_time, duration_minutes, orders_per_minute=20, rng=None, first_order_id=1):
+    """
+    Vectorised generate_orders with Poisson arrivals whose rate varies by hour and zone.
+
+    Returns a dict of NumPy arrays with the same columns as generate_orders, sorted by time.
+    Every random draw comes from `rng` (a numpy Generator), so runs are reproducible.
+    """
+    rng = rng if rng is not None else np.random.default_rng()
+    zones = list(ZONES)
+    counts = rng.poisson(order_rates(start_time, duration_minutes, orders_per_minute))
+    num_orders = int(counts.sum())
+
+    minute = np.repeat(np.tile(np.arange(duration_minutes), len(zones)), counts.T.ravel())
+    zone_index = np.repeat(np.repeat(np.arange(len(zones)), duration_minutes), counts.T.ravel())
+    second = rng.integers(0, 60, num_orders)
+    order = np.lexsort((second, minute))
+    minute, zone_index, second = minute[order], zone_index[order], second[order]
+
+    # Restaurant of each order, drawn among the restaurants of its zone
+    restaurant_zone = pd.Categorical(restaurants['zone'], categories=zones).codes
+    by_zone = np.argsort(restaurant_zone, kind='stable')
+    zone_start = np.searchsorted(restaurant_zone[by_zone], np.arange(len(zones) + 1))
+    zone_size = np.diff(zone_start)
+    if (zone_size[np.unique(zone_index)] == 0).any():
+        raise ValueError("Every zone with orders needs at least one restaurant")
+    picked = by_zone[zone_start[zone_index] + (rng.random(num_orders) * zone_size[zone_index]).astype(int)]
+
+    lat_low = np.array([ZONES[zone]["lat_range"][0] for zone in zones])[zone_index]
+    lat_high = np.array([ZONES[zone]["lat_range"][1] for zone in zones])[zone_index]
+    lon_low = np.array([ZONES[zone]["lon_range"][0] for zone in zones])[zone_index]
+    lon_high = np.array([ZONES[zone]["lon_range"][1] for zone in zones])[zone_index]
+    customer_lats = rng.uniform(lat_low, lat_high)
+    customer_lons = rng.uniform(lon_low, lon_high)
+    restaurant_lats = restaurants['latitude'].to_numpy()[picked]
+    restaurant_lons = restaurants['longitude'].to_numpy()[picked]
+
+    # Order details, as in generate_orders
+    food_costs = np.round(rng.uniform(300, 400, num_orders), 2)
+    delivery_charges = np.round(rng.uniform(20, 50, num_orders), 2)
+    packaging_charges = np.round(rng.uniform(10, 30, num_orders), 2)
+    service_fees = np.round(food_costs * rng.uniform(0.05, 0.10, num_orders), 2)
+    gst = np.round((food_costs + delivery_charges + packaging_charges + service_fees) * 0.05, 2)
+    total_costs = np.round(food_costs + delivery_charges + packaging_charges + service_fees + gst, 2)
+    customer_ratings = np.round(rng.uniform(1.0, 5.0, num_orders), 1)
+    tips = np.round(rng.exponential(scale=20, size=num_orders), 2)
+    preparation_times = rng.integers(10, 31, num_orders)
+    distances = np.round(haversine_distances(restaurant_lats, restaurant_lons, customer_lats, customer_lons), 2)
+    speed = 20  # Average speed in km/h
+    delivery_times = np.round(distances / speed * 60 + preparation_times, 2)
+    base_fees = np.round(rng.uniform(20, 40, num_orders), 2)
+    incentives = np.round(rng.uniform(10, 50, num_orders), 2)
+
+    return {
+        'order_id': np.arange(first_order_id, first_order_id + num_orders),
+        'time': np.datetime64(pd.Timestamp(start_time), 's') + (minute * 60 + second).astype('timedelta64[s]'),
+        'zone': np.array(zones, dtype=object)[zone_index],
+        'restaurant': restaurants['name'].to_numpy()[picked],
+        'restaurant_latitude': restaurant_lats,
+        'restaurant_longitude': restaurant_lons,
+        'customer_latitude': customer_lats,
+        'customer_longitude': customer_lons,
+        'food_cost': food_costs,
+        'delivery_charges': delivery_charges,
+        'packaging_charges': packaging_charges,
+        'service_fees': service_fees,
+        'gst': gst,
+        'total_cost': total_costs,
+        'customer_rating': customer_ratings,
+        'tip': tips,
+        'preparation_time': preparation_times,
+        'distance': distances,
+        'estimated_delivery_time': delivery_times,
+        'base_fee': base_fees,
+        'incentive': incentives,
+        'agent_earning': np.round(base_fees + incentives, 2),
+        'status': np.full(num_orders, 'pending', dtype=object),
+    }
+
+def order_schema():
+    """Arrow schema of the order columns, so that chunks without orders still get the same types."""
+    import pyarrow as pa
+    text = {'zone', 'restaurant', 'status'}
+    integer = {'order_id', 'preparation_time'}
+    columns = ['order_id', 'time', 'zone', 'restaurant', 'restaurant_latitude', 'restaurant_longitude',
+               'customer_latitude', 'customer_longitude', 'food_cost', 'delivery_charges', 'packaging_charges',
+               'service_fees', 'gst', 'total_cost', 'customer_rating', 'tip', 'preparation_time', 'distance',
+               'estimated_delivery_time', 'base_fee', 'incentive', 'agent_earning', 'status']
+    return pa.schema([(name, pa.timestamp('s') if name == 'time' else pa.string() if name in text
+                       else pa.int64() if name in integer else pa.float64()) for name in columns])
+
+def iter_order_chunks(restaurants, start_time, duration_minutes, orders_per_minute=20, chunk_minutes=60,
+                      seed=None, as_arrow=False):
+    """
+    Stream generate_order_arrays over a long horizon, `chunk_minutes` at a time.
+
+    Yields dicts of NumPy arrays, or pyarrow RecordBatches of order_schema with `as_arrow`
+    (chunks without orders included). Order ids keep counting across chunks and the whole
+    stream is determined by `seed`.
+    """
+    rng = np.random.default_rng(seed)
+    next_order_id = 1
+    for offset in range(0, duration_minutes, chunk_minutes):
+        chunk_start = pd.Timestamp(start_time) + pd.Timedelta(minutes=offset)
+        chunk = generate_order_arrays(restaurants, chunk_start, min(chunk_minutes, duration_minutes - offset),
+                                      orders_per_minute, rng, next_order_id)
+        next_order_id += len(chunk['order_id'])
+        if as_arrow:
+            import pyarrow as pa
+            yield pa.RecordBatch.from_pydict(chunk, schema=order_schema())
+        else:
+            yield chunk
+
+def write_orders(path, restaurants, start_time, duration_minutes, orders_per_minute=20, chunk_minutes=60, seed=None):
+    """
+    Stream synthetic orders to a Parquet (.parquet) or Arrow IPC (.arrow) file one chunk
+    at a time, so memory stays bounded by the chunk size. Returns the number of orders.
+    """
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    writer, num_orders = None, 0
+    try:
+        for batch in iter_order_chunks(restaurants, start_time, duration_minutes, orders_per_minute,
+                                       chunk_minutes, seed, as_arrow=True):
+            if writer is None:
+                if path.endswith('.parquet'):
+                    writer = pq.ParquetWriter(path, batch.schema)
+                elif path.endswith('.arrow'):
+                    writer = pa.ipc.new_file(path, batch.schema)
+                else:
+                    raise ValueError(f"Unsupported order file type: {path}")
+            writer.write_batch(batch)
+            num_orders += batch.num_rows
+    finally:
+        if writer is not None:
+            writer.close()
+    return num_orders
+
 if __name__ == "__main__":
     import time
     start = time.time()
@@ -0,0 +1,69 @@
+import sys
+import time
+import random
+import pandas as pd
+from model import build_timetable_model, solve_diverse, solve_district
+
+# Solve time against section count on synthetic district data: every cluster of
+# sections shares its own pool of teachers, so the district decomposes into one
+# independent timetable per cluster. Compares one CP-SAT model for the whole district
+# with solve_district, which solves the clusters in parallel processes.
+# Usage: python benchmark_timetable.py [workers] [section counts ...]
+
+DAYS = ['Monday', 'Tuesday', 'Wednesday', 'Thursday', 'Friday']
+PERIODS_PER_DAY = 6
+SUBJECT_PERIODS = {'Mathematics': 6, 'Physics': 5, 'Chemistry': 5, 'Biology': 4, 'English': 5, 'History': 5}
+SECTIONS_PER_CLUSTER = 4
+TEACHER_LOAD = 15  # Periods a week we plan for each teacher, out of 30
+
+
+def generate_school(num_sections, unavailable=0.1, seed=0):
+    """Synthetic (days, periods_per_day, teachers, sections) for `num_sections` sections."""
+    rng = random.Random(seed)
+    periods_per_day = {day: PERIODS_PER_DAY for day in DAYS}
+    teachers, sections = [], []
+
+    for cluster, first in enumerate(range(0, num_sections, SECTIONS_PER_CLUSTER)):
+        cluster_sections = range(first, min(first + SECTIONS_PER_CLUSTER, num_sections))
+        names = []
+        for subject, periods in SUBJECT_PERIODS.items():
+            for k in range(-(-len(cluster_sections) * periods // TEACHER_LOAD)):
+                availability = {day: [int(rng.random() >= unavailable) for _ in range(PERIODS_PER_DAY)]
+                                for day in DAYS}
+                teachers.append({'name': f'{subject} {cluster}.{k}', 'subjects': [subject],
+                                 'availability': availability})
+                names.append(teachers[-1]['name'])
+        sections += [{'name': f'Section {s}', 'subject_periods': dict(SUBJECT_PERIODS), 'teachers': names}
+                     for s in cluster_sections]
+
+    return DAYS, periods_per_day, teachers, sections
+
+
+def benchmark_timetable(num_sections, workers, max_time_in_seconds=60):
+    days, periods_per_day, teachers, sections = generate_school(num_sections)
+
+    started = time.perf_counter()
+    model, assignments = build_timetable_model(days, periods_per_day, teachers, sections)
+    single = solve_diverse(model, assignments, days, num_solutions=1, max_time_in_seconds=max_time_in_seconds)
+    single_s = time.perf_counter() - started
+
+    started = time.perf_counter()
+    district = solve_district(days, periods_per_day, teachers, sections, workers, max_time_in_seconds)
+    district_s = time.perf_counter() - started
+
+    return {
+        'sections': num_sections,
+        'teachers': len(teachers),
+        'variables': len(assignments),
+        'single model (s)': single_s,
+        'single solved': len(single),
+        'decomposed (s)': district_s,
+        'decomposed solved': len(district),
+    }
+
+
+if __name__ == "__main__":
+    workers = int(sys.argv[1]) if len(sys.argv) > 1 else None
+    section_counts = [int(n) for n in sys.argv[2:]] or [4, 8, 16, 32, 48]
+    results = pd.DataFrame([benchmark_timetable(n, workers) for n in section_counts])
+    print(results.to_string(index=False, float_format=lambda v: f"{v:.2f}"))
@@ -1,5 +1,8 @@
+import os
 import json
 import csv
+from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor
 from ortools.sat.python import cp_model
 from colorama import Fore, Style, init
 from tabulate import tabulate
@@ -7,174 +10,250 @@ from tabulate import tabulate
 # Initialize colorama
 init(autoreset=True)
 
-# Load the JSON data
-with open('school-time-table/input_data.json') as f:
-    data = json.load(f)
+# A subject may be taught at most this many periods per day in a section
+MAX_SUBJECT_PERIODS_PER_DAY = 2
 
-# Extract data
-days = list(data['class_schedule'].keys())
-periods_per_day = data['periods_per_day']
-subjects = list(set(subject for day in days for subject in data['class_schedule'][day]))
-teachers = data['teachers']
 
-# Create model
-model = cp_model.CpModel()
+def load_timetable_data(path):
+    """
+    Read a timetable input file into (days, periods_per_day, teachers, sections).
 
-# Variables
-assignments = {}
-for day in days:
-    for period in range(periods_per_day[day]):
+    A file with a `sections` list describes several classes sharing the same teachers; each
+    section has a `name`, its `subject_periods` and optionally the `teachers` allowed to
+    teach it. A file without one is a single class using every teacher.
+    """
+    with open(path) as f:
+        data = json.load(f)
+
+    days = list(data['periods_per_day'].keys())
+    sections = data.get('sections') or [{'name': 'Class', 'subject_periods': data['subject_periods']}]
+    return days, data['periods_per_day'], data['teachers'], sections
+
+
+def interchangeable_teachers(teachers, sections):
+    """Groups of teachers with identical subjects, availability and sections, in input order."""
+    groups = defaultdict(list)
+    for teacher in teachers:
+        allowed = tuple(section['name'] for section in sections
+                        if teacher['name'] in section.get('teachers', [t['name'] for t in teachers]))
+        key = (tuple(sorted(teacher['subjects'])), json.dumps(teacher['availability'], sort_keys=True), allowed)
+        groups[key].append(teacher['name'])
+    return [names for names in groups.values() if len(names) > 1]
+
+
+def build_timetable_model(days, periods_per_day, teachers, sections):
+    """
+    Build the CP-SAT timetable for every section at once.
+
+    Only (section, day, period, subject, teacher) slots where the teacher is available and
+    teaches the subject get a variable. Each (section, day, subject) is taught by one
+    teacher, chosen through a teacher-choice variable, and a teacher is in at most one
+    section per period. Returns (model, assignments) with assignments keyed by
+    (section, day, period, subject, teacher).
+    """
+    model = cp_model.CpModel()
+    teacher_names = [teacher['name'] for teacher in teachers]
+
+    # Variables, only for available slots
+    assignments = {}
+    for section in sections:
+        section_teachers = set(section.get('teachers', teacher_names))
         for teacher in teachers:
+            if teacher['name'] not in section_teachers:
+                continue
             for subject in teacher['subjects']:
-                assignments[(day, period, subject, teacher['name'])] = model.NewBoolVar(
-                    f'assign_{day}_{period}_{subject}_{teacher["name"]}')
-
-# Constraints
-# # Each period must have exactly one subject assigned, taught by an available teacher
-for day in days:
-    for period in range(periods_per_day[day]):
-        model.Add(sum(assignments[(day, period, subject, teacher['name'])]
-                  for teacher in teachers for subject in teacher['subjects'] if teacher['availability'][day][period]) == 1)
-
-# Ensure teachers' availability
-for teacher in teachers:
-    for day in days:
-        for period in range(periods_per_day[day]):
-            for subject in teacher['subjects']:
-                if not teacher['availability'][day][period]:
-                    model.Add(assignments[(day, period, subject, teacher['name'])] == 0)
-
-# Ensure each subject is assigned at most once per day
-for day in days:
-    for subject in subjects:
-        model.Add(sum(assignments[(day, period, subject, teacher['name'])] for period in range(periods_per_day[day])
-                  for teacher in teachers if subject in teacher['subjects'] and teacher['availability'][day][period]) <= 2)
-
-# Ensure consecutive assignments of the same subject on the same day are handled by the same teacher
-for day in days:
-    for subject in subjects:
-        for period in range(periods_per_day[day] - 1):
-            for teacher1 in teachers:
-                if subject in teacher1['subjects']:
-                    for teacher2 in teachers:
-                        if teacher1 != teacher2:
-                            if subject in teacher2['subjects']:
-                                model.Add(assignments[(day, period, subject, teacher1['name'])] +
-                                          assignments[(day, period + 1, subject, teacher2['name'])] <= 1)
-
-# Ensure each subject is assigned the required number of periods per week
-for subject, required_periods in data['subject_periods'].items():
-    model.Add(sum(assignments[(day, period, subject, teacher['name'])] for day in days for period in range(periods_per_day[day])
-              for teacher in teachers if subject in teacher['subjects'] and teacher['availability'][day][period]) == required_periods)
-
-# # Ensure teachers' workloads are balanced within a range
-# total_periods = sum(periods_per_day[day] for day in days)
-# average_workload = total_periods * len(subjects) // len(teachers)
-# min_workload = average_workload - 20
-# max_workload = average_workload + 20
-
-# for teacher in teachers:
-#     model.AddLinearConstraint(
-#         sum(assignments[(day, period, subject, teacher['name'])]
-#             for day in days for period in range(periods_per_day[day]) for subject in teacher['subjects']),
-#         min_workload,
-#         max_workload
-    # )
-
-# # Seniority preference
-# for subject in subjects:
-#     senior_teachers = sorted(teachers, key=lambda t: -t["seniority_level"])
-#     for day in days:
-#         for period in range(periods_per_day[day]):
-#             for i, senior_teacher in enumerate(senior_teachers):
-#                 if subject in senior_teacher['subjects']:
-#                     for junior_teacher in senior_teachers[i+1:]:
-#                         if subject in junior_teacher['subjects']:
-#                             model.Add(assignments[(day, period, subject, senior_teacher['name'])] >= assignments[(day, period, subject, junior_teacher['name'])])
-
-# Solver
-solver = cp_model.CpSolver()
-solver.parameters.log_search_progress = False
-solver.parameters.max_time_in_seconds = 10
-
-
-class SolutionPrinter(cp_model.CpSolverSolutionCallback):
-    def __init__(self, assignments, limit=3):
-        cp_model.CpSolverSolutionCallback.__init__(self)
-        self.assignments = assignments
-        self.solution_count = 0
-        self.solutions = []
-        self.limit = limit
-
-    def OnSolutionCallback(self):
-        if self.solution_count >= self.limit:
-            return
-        self.solution_count += 1
-        solution = {'solution_number': self.solution_count}
+                if subject not in section['subject_periods']:
+                    continue
+                for day in days:
+                    for period in range(periods_per_day[day]):
+                        if teacher['availability'][day][period]:
+                            key = (section['name'], day, period, subject, teacher['name'])
+                            assignments[key] = model.NewBoolVar('assign_' + '_'.join(map(str, key)))
+
+    by_period = defaultdict(list)
+    by_section_day_subject = defaultdict(list)
+    by_section_subject = defaultdict(list)
+    by_teacher_period = defaultdict(list)
+    by_teacher = defaultdict(list)
+    for (section, day, period, subject, teacher), assigned in assignments.items():
+        by_period[(section, day, period)].append(assigned)
+        by_section_day_subject[(section, day, subject)].append((teacher, assigned))
+        by_section_subject[(section, subject)].append(assigned)
+        by_teacher_period[(teacher, day, period)].append(assigned)
+        by_teacher[teacher].append(assigned)
+
+    # Constraints
+    # Each period of each section has exactly one subject, taught by an available teacher
+    for section in sections:
         for day in days:
-            solution[day] = []
             for period in range(periods_per_day[day]):
-                for teacher in teachers:
-                    for subject in teacher['subjects']:
-                        if self.Value(assignments[(day, period, subject, teacher['name'])]):
-                            solution[day].append({"period": period + 1, "subject": subject, "teacher": teacher['name']})
-        self.solutions.append(solution)
+                model.AddExactlyOne(by_period[(section['name'], day, period)])
 
+    # Each subject is taught at most MAX_SUBJECT_PERIODS_PER_DAY periods a day, all by the same teacher
+    for (section, day, subject), options in by_section_day_subject.items():
+        model.Add(sum(assigned for _, assigned in options) <= MAX_SUBJECT_PERIODS_PER_DAY)
+        choice = {}
+        for teacher, assigned in options:
+            if teacher not in choice:
+                choice[teacher] = model.NewBoolVar(f'teaches_{section}_{day}_{subject}_{teacher}')
+            model.AddImplication(assigned, choice[teacher])
+        model.AddAtMostOne(choice.values())
 
-class ElegantSolutionPrinter(cp_model.CpSolverSolutionCallback):
-    def __init__(self, assignments, limit=3):
-        cp_model.CpSolverSolutionCallback.__init__(self)
-        self.assignments = assignments
-        self.solution_count = 0
-        self.limit = limit
+    # Each subject is assigned the required number of periods per week
+    for section in sections:
+        for subject, required_periods in section['subject_periods'].items():
+            model.Add(sum(by_section_subject[(section['name'], subject)]) == required_periods)
 
-    def OnSolutionCallback(self):
-        if self.solution_count >= self.limit:
-            return
-        self.solution_count += 1
+    # A teacher is in at most one section at a time
+    if len(sections) > 1:
+        for options in by_teacher_period.values():
+            if len(options) > 1:
+                model.AddAtMostOne(options)
 
-        print(f"\n{Fore.CYAN}{Style.BRIGHT}Solution {self.solution_count}:{Style.RESET_ALL}")
-        print(f"{'-' * 70}")
+    # Interchangeable teachers are ordered by workload, so swapped timetables are not revisited
+    for names in interchangeable_teachers(teachers, sections):
+        for first, second in zip(names, names[1:]):
+            model.Add(sum(by_teacher[first]) >= sum(by_teacher[second]))
 
-        headers = ["Period"] + days
-        max_periods = max(periods_per_day.values())
-        
-        table = []
-        for period in range(max_periods):
-            row = [f"Period {period + 1}"]
-            for day in days:
-                if period < periods_per_day[day]:
-                    period_assignment = [
-                        (subject[:3], teacher['name'][:3])  # Use first 3 letters for both subject and teacher
-                        for teacher in teachers
-                        for subject in teacher['subjects']
-                        if self.Value(assignments[(day, period, subject, teacher['name'])])
-                    ]
-                    if period_assignment:
-                        row.append(f"{period_assignment[0][0]}-{period_assignment[0][1]}")
-                    else:
-                        row.append("")
-                else:
-                    row.append("")
-            table.append(row)
+    return model, assignments
+
+
+def extract_solution(solver, assignments, days, solution_number):
+    """Read one solution into the solutions.json layout, one entry per section."""
+    solutions = {}
+    for (section, day, period, subject, teacher), assigned in assignments.items():
+        if solver.Value(assigned):
+            solution = solutions.setdefault(section, {'solution_number': solution_number, 'section': section,
+                                                      **{d: [] for d in days}})
+            solution[day].append({"period": period + 1, "subject": subject, "teacher": teacher})
+    for solution in solutions.values():
+        for day in days:
+            solution[day].sort(key=lambda a: a['period'])
+    return list(solutions.values())
+
+
+def solve_diverse(model, assignments, days, num_solutions=3, max_time_in_seconds=10, num_workers=8):
+    """
+    Find up to `num_solutions` timetables that differ as much as possible.
+
+    Instead of enumerating solutions (which turns off presolve and parallel search), each
+    timetable is a full parallel solve that maximises its smallest distance, in changed
+    assignments, to the timetables already found.
+    """
+    solver = cp_model.CpSolver()
+    solver.parameters.log_search_progress = False
+    solver.parameters.max_time_in_seconds = max_time_in_seconds
+    solver.parameters.num_workers = num_workers
+
+    solutions, previous = [], []
+    for solution_number in range(1, num_solutions + 1):
+        if previous:
+            min_distance = model.NewIntVar(1, len(assignments), f'min_distance_{solution_number}')
+            for chosen in previous:
+                model.Add(min_distance <= len(chosen) - sum(chosen))
+            model.Maximize(min_distance)
+
+        status = solver.Solve(model)
+        if status not in (cp_model.OPTIMAL, cp_model.FEASIBLE):
+            break
+        previous.append([assigned for assigned in assignments.values() if solver.Value(assigned)])
+        solutions.extend(extract_solution(solver, assignments, days, solution_number))
 
-        print(tabulate(table, headers, tablefmt="grid"))
-        print(f"{'-' * 70}")
+    return solutions
 
 
-# Instantiate and solve the model with the solution printer
-solution_printer = SolutionPrinter(assignments, limit=3)
-solver.SearchForAllSolutions(model, solution_printer)
+def teacher_components(teachers, sections):
+    """
+    Split the sections into groups that share no teacher, as (teachers, sections) pairs.
 
-# Save solutions to JSON with solution number
-with open('school-time-table/solutions.json', 'w') as f:
-    json.dump(solution_printer.solutions, f, indent=4)
+    Two sections are in the same group when some teacher may teach a subject in both,
+    directly or through a chain of other sections. Groups are independent timetables.
+    """
+    teacher_names = [teacher['name'] for teacher in teachers]
+    parent = list(range(len(sections)))
 
-print(f'Number of solutions found: {solution_printer.solution_count}')
+    def find(i):
+        while parent[i] != i:
+            parent[i] = parent[parent[i]]
+            i = parent[i]
+        return i
 
-# Generate CSV calendar for each solution
-for solution in solution_printer.solutions:
-    csv_filename = f'school-time-table/calendar_solution_{solution["solution_number"]}.csv'
+    eligible = []
+    first_section = {}
+    for i, section in enumerate(sections):
+        allowed = set(section.get('teachers', teacher_names))
+        names = {teacher['name'] for teacher in teachers
+                 if teacher['name'] in allowed and set(teacher['subjects']) & set(section['subject_periods'])}
+        eligible.append(names)
+        for name in names:
+            parent[find(i)] = find(first_section.setdefault(name, i))
+
+    groups = defaultdict(list)
+    for i in range(len(sections)):
+        groups[find(i)].append(i)
+
+    components = []
+    for members in groups.values():
+        names = set().union(*(eligible[i] for i in members))
+        components.append(([teacher for teacher in teachers if teacher['name'] in names],
+                           [sections[i] for i in members]))
+    return components
+
+
+def solve_timetable(days, periods_per_day, teachers, sections, max_time_in_seconds=60, num_workers=8):
+    """Solve one timetable for all the given sections; returns [] if none was found in time."""
+    model, assignments = build_timetable_model(days, periods_per_day, teachers, sections)
+    return solve_diverse(model, assignments, days, num_solutions=1,
+                         max_time_in_seconds=max_time_in_seconds, num_workers=num_workers)
+
+
+def _solve_component(args):
+    return solve_timetable(*args)
+
+
+def solve_district(days, periods_per_day, teachers, sections, workers=None, max_time_in_seconds=60):
+    """
+    Solve a timetable for many sections by solving each teacher-connected group of
+    sections on its own, in `workers` parallel processes.
+
+    Each process runs CP-SAT with an equal share of the CPU cores. Returns one solution
+    per section; sections of a group that could not be solved in time are missing.
+    """
+    components = teacher_components(teachers, sections)
+    if not components:
+        return []
+    workers = min(workers or os.cpu_count(), len(components))
+    num_workers = max(1, os.cpu_count() // workers)
+    tasks = [(days, periods_per_day, component_teachers, component_sections, max_time_in_seconds, num_workers)
+             for component_teachers, component_sections in components]
+
+    if workers == 1:
+        results = map(_solve_component, tasks)
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            results = list(executor.map(_solve_component, tasks))
+    return [solution for solutions in results for solution in solutions]
+
+
+def print_timetable(solution, days, periods_per_day):
+    print(f"\n{Fore.CYAN}{Style.BRIGHT}Solution {solution['solution_number']} - {solution['section']}:{Style.RESET_ALL}")
+    print(f"{'-' * 70}")
+
+    headers = ["Period"] + days
+    table = []
+    for period in range(1, max(periods_per_day.values()) + 1):
+        row = [f"Period {period}"]
+        for day in days:
+            assignment = next((a for a in solution[day] if a['period'] == period), None)
+            # Use first 3 letters for both subject and teacher
+            row.append(f"{assignment['subject'][:3]}-{assignment['teacher'][:3]}" if assignment else "")
+        table.append(row)
+
+    print(tabulate(table, headers, tablefmt="grid"))
+    print(f"{'-' * 70}")
+
+
+def write_calendar(solution, days, periods_per_day, csv_filename):
     with open(csv_filename, 'w', newline='') as csvfile:
         fieldnames = ['Period'] + days
         writer = csv.DictWriter(csvfile, fieldnames=fieldnames)
@@ -194,4 +273,25 @@ for solution in solution_printer.solutions:
                     row[day] = ''
             writer.writerow(row)
 
-    print(f'CSV calendar for Solution {solution["solution_number"]} generated: {csv_filename}')
+
+if __name__ == "__main__":
+    days, periods_per_day, teachers, sections = load_timetable_data('school-time-table/input_data.json')
+
+    model, assignments = build_timetable_model(days, periods_per_day, teachers, sections)
+    solutions = solve_diverse(model, assignments, days, num_solutions=3)
+
+    # Save solutions to JSON with solution number
+    with open('school-time-table/solutions.json', 'w') as f:
+        json.dump(solutions, f, indent=4)
+
+    print(f'Number of solutions found: {len({solution["solution_number"] for solution in solutions})}')
+
+    # Generate CSV calendar for each solution
+    for solution in solutions:
+        print_timetable(solution, days, periods_per_day)
+        if len(sections) > 1:
+            csv_filename = f'school-time-table/calendar_{solution["section"]}_solution_{solution["solution_number"]}.csv'
+        else:
+            csv_filename = f'school-time-table/calendar_solution_{solution["solution_number"]}.csv'
+        write_calendar(solution, days, periods_per_day, csv_filename)
+        print(f'CSV calendar for Solution {solution["solution_number"]} generated: {csv_filename}')